@@ -0,0 +1,11 @@
+from typing import Any
+
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings: Any) -> None:
+    # tests don't need redis, every test starts with an empty cache
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    cache.clear()
@@ -3,8 +3,10 @@
 from __future__ import absolute_import, unicode_literals
 
 import os
+from typing import Any
 
 from celery import Celery
+from celery.signals import celeryd_after_setup
 
 
 # Set the default Django settings module for Celery
@@ -18,3 +20,15 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # Load task modules from all registered Django app configs.
 app.autodiscover_tasks()
+
+
+@celeryd_after_setup.connect  # type: ignore[misc]
+def warm_up_worker(**kwargs: Any) -> None:
+    """Warm up the main worker process after logging is set up, pool processes are forked from it later."""
+    # Django is set up by the Celery fixup on `worker_init`
+    from django.conf import settings
+
+    if settings.WARM_UP_WORKERS:
+        from example.warmup import warm_up
+
+        warm_up()
@@ -0,0 +1,286 @@
+"""
+Per-request SQL and latency instrumentation.
+
+`RequestMetricsMiddleware` counts queries and database time of every request with an execute wrapper installed on
+every connection, times response rendering and reports them in `Server-Timing` header and in a log line.
+Serialization runs in views before responses are rendered, it's timed separately by `measure_serialization` blocks
+(`.data` of question API serializers and question representations). Totals are
+aggregated per route in process memory and exposed in Prometheus text format by `metrics_view`, every worker process
+reports its own totals.
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpRequest, HttpResponse, HttpResponseBase
+from django.template.response import SimpleTemplateResponse
+from django.utils.crypto import constant_time_compare
+
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""Upper bounds of request duration histogram in seconds."""
+
+SLOWEST_SQL_LENGTH = 300
+REQUEST_ATTRIBUTE = 'request_metrics'
+UNRESOLVED_ROUTE = 'unresolved'
+METRICS_ROUTE = 'metrics'
+
+
+@dataclass
+class RequestMetrics:
+    """Measurements of a single request."""
+
+    started: float = field(default_factory=time.perf_counter)
+    queries: int = 0
+    db_time: float = 0.0
+    slowest_sql: str = ''
+    slowest_time: float = 0.0
+    render_started: float | None = None
+    render_time: float = 0.0
+    serialize_time: float = 0.0
+    serializing: bool = False
+
+    def record_query(self, sql: str, duration: float) -> None:
+        self.queries += 1
+        self.db_time += duration
+        if duration > self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_sql = sql
+
+    def render_finished(self, response: HttpResponseBase) -> HttpResponseBase:
+        if self.render_started is not None:
+            self.render_time = time.perf_counter() - self.render_started
+        return response
+
+
+# context variables are copied to `sync_to_async` threads, so ORM calls of async views are measured too
+current_metrics: ContextVar[RequestMetrics | None] = ContextVar('current_metrics', default=None)
+
+
+@contextmanager
+def measure_serialization() -> Iterator[None]:
+    """Add time of the block to serialization time of the current request, nested blocks are counted once."""
+    metrics = current_metrics.get()
+    if metrics is None or metrics.serializing:
+        yield
+        return
+    metrics.serializing = True
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializing = False
+        metrics.serialize_time += time.perf_counter() - started
+
+
+def record_query(execute: Callable[..., Any], sql: str, params: Any, many: bool, context: dict[str, Any]) -> Any:
+    """Execute wrapper which is installed on every connection, records queries run during a measured request."""
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.record_query(sql, time.perf_counter() - started)
+
+
+def instrument(connection: BaseDatabaseWrapper) -> None:
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver(connection_created)
+def instrument_new_connection(sender: Any, connection: BaseDatabaseWrapper, **kwargs: Any) -> None:
+    instrument(connection)
+
+
+class RouteTotals:
+    """Totals of requests to a route."""
+
+    def __init__(self) -> None:
+        self.requests: dict[tuple[str, int], int] = defaultdict(int)
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.count = 0
+        self.duration = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.serialize_time = 0.0
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.routes: dict[str, RouteTotals] = defaultdict(RouteTotals)
+
+    def observe(self, route: str, method: str, status: int, duration: float, metrics: RequestMetrics) -> None:
+        with self.lock:
+            totals = self.routes[route]
+            totals.requests[(method, status)] += 1
+            totals.count += 1
+            totals.duration += duration
+            totals.queries += metrics.queries
+            totals.db_time += metrics.db_time
+            totals.render_time += metrics.render_time
+            totals.serialize_time += metrics.serialize_time
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    totals.buckets[index] += 1
+
+    def render(self) -> str:
+        lines = [
+            '# HELP http_requests_total Requests by route, method and status.',
+            '# TYPE http_requests_total counter',
+        ]
+        with self.lock:
+            routes = sorted(self.routes.items())
+            for route, totals in routes:
+                for (method, status), count in sorted(totals.requests.items()):
+                    lines.append(f'http_requests_total{{route="{route}",method="{method}",status="{status}"}} {count}')
+
+            lines += [
+                '# HELP http_request_duration_seconds Request duration by route.',
+                '# TYPE http_request_duration_seconds histogram',
+            ]
+            for route, totals in routes:
+                for bound, count in zip(DURATION_BUCKETS, totals.buckets, strict=True):
+                    lines.append(f'http_request_duration_seconds_bucket{{route="{route}",le="{bound}"}} {count}')
+                lines.append(f'http_request_duration_seconds_bucket{{route="{route}",le="+Inf"}} {totals.count}')
+                lines.append(f'http_request_duration_seconds_sum{{route="{route}"}} {totals.duration:.6f}')
+                lines.append(f'http_request_duration_seconds_count{{route="{route}"}} {totals.count}')
+
+            for name, help_text, attribute in (
+                ('db_queries_total', 'Database queries by route.', 'queries'),
+                ('db_duration_seconds_total', 'Database time by route.', 'db_time'),
+                (
+                    'serialize_duration_seconds_total',
+                    'Serialization time by route, with its queries.',
+                    'serialize_time',
+                ),
+                ('render_duration_seconds_total', 'Response rendering time by route.', 'render_time'),
+            ):
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+                lines += [f'{name}{{route="{route}"}} {getattr(totals, attribute)}' for route, totals in routes]
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+class RequestMetricsMiddleware:
+    """
+    Measure queries, database time, serialization and rendering time of requests.
+
+    Should be the first middleware, so timings include all other middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponseBase | Awaitable[HttpResponseBase]:
+        if self.is_async:
+            return self.__acall__(request)
+        # connections opened before the middleware was loaded
+        for connection in connections.all(initialized_only=True):
+            instrument(connection)
+        metrics = RequestMetrics()
+        setattr(request, REQUEST_ATTRIBUTE, metrics)
+        token = current_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponseBase:
+        metrics = RequestMetrics()
+        setattr(request, REQUEST_ATTRIBUTE, metrics)
+        token = current_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    def process_template_response(self, request: HttpRequest, response: SimpleTemplateResponse) -> HttpResponseBase:
+        # template and DRF responses are rendered after this hook, serializers already ran in the view
+        metrics: RequestMetrics | None = getattr(request, REQUEST_ATTRIBUTE, None)
+        if metrics is not None:
+            metrics.render_started = time.perf_counter()
+            response.add_post_render_callback(metrics.render_finished)
+        return response
+
+    def finish(self, request: HttpRequest, response: HttpResponseBase, metrics: RequestMetrics) -> HttpResponseBase:
+        duration = time.perf_counter() - metrics.started
+        match = request.resolver_match
+        route = (match.view_name if match else None) or UNRESOLVED_ROUTE
+        if route == METRICS_ROUTE:
+            return response
+
+        registry.observe(route, request.method or '', response.status_code, duration, metrics)
+        response['Server-Timing'] = ', '.join(
+            (
+                f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+                f'serialize;dur={metrics.serialize_time * 1000:.1f}',
+                f'render;dur={metrics.render_time * 1000:.1f}',
+                f'total;dur={duration * 1000:.1f}',
+            )
+        )
+        logger.info(
+            'route=%s method=%s status=%s duration_ms=%.1f queries=%d db_ms=%.1f serialize_ms=%.1f render_ms=%.1f '
+            'slowest_ms=%.1f',
+            route,
+            request.method,
+            response.status_code,
+            duration * 1000,
+            metrics.queries,
+            metrics.db_time * 1000,
+            metrics.serialize_time * 1000,
+            metrics.render_time * 1000,
+            metrics.slowest_time * 1000,
+            extra={
+                'route': route,
+                'method': request.method,
+                'status': response.status_code,
+                'duration_ms': round(duration * 1000, 1),
+                'queries': metrics.queries,
+                'db_ms': round(metrics.db_time * 1000, 1),
+                'serialize_ms': round(metrics.serialize_time * 1000, 1),
+                'render_ms': round(metrics.render_time * 1000, 1),
+                'slowest_sql': metrics.slowest_sql[:SLOWEST_SQL_LENGTH],
+                'slowest_ms': round(metrics.slowest_time * 1000, 1),
+            },
+        )
+        return response
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """Prometheus text exposition of request totals for staff users and holders of `METRICS_TOKEN` bearer token."""
+    token = settings.METRICS_TOKEN
+    # without a configured token only staff users can read per-route traffic
+    has_token = bool(token) and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    if not has_token and not request.user.is_staff:
+        return HttpResponse(status=401)
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
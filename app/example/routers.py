@@ -0,0 +1,158 @@
+"""
+Read replica routing.
+
+`ReplicaRoutingMiddleware` routes reads of views which opt in with `replica_actions` (DRF actions like `list` or
+`retrieve` for viewsets, lowercase HTTP methods for other views) to a random replica from
+`DATABASE_REPLICAS`. Writes always go to `default`. A request which writes gets a short-lived cookie and requests
+with that cookie read from `default` as well, so users see their own writes while replicas catch up.
+"""
+
+import random
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpRequest, HttpResponseBase
+
+
+PRIMARY_COOKIE = 'db_primary'
+"""Cookie set after writes, reads of requests carrying it aren't routed to replicas."""
+
+REQUEST_ATTRIBUTE = 'db_routing'
+REPLICA_METHODS = ('GET', 'HEAD')
+
+
+@dataclass
+class RoutingState:
+    """Routing of a single request."""
+
+    pinned: bool = False
+    replica: str | None = None
+    wrote: bool = False
+
+
+# the state is mutated rather than replaced, so reads and writes of `sync_to_async` threads are routed and seen too
+current_routing: ContextVar[RoutingState | None] = ContextVar('current_routing', default=None)
+
+
+def allows_replica_reads(view_func: Callable[..., Any], method: str) -> bool:
+    """Whether the view opted in to replica reads for the method of the request."""
+    view = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None) or view_func
+    actions: dict[str, str] | None = getattr(view_func, 'actions', None)
+    action = actions.get(method.lower()) if actions is not None else method.lower()
+    return action in getattr(view, 'replica_actions', ())
+
+
+@contextmanager
+def primary_reads() -> Iterator[None]:
+    """Read from `default` within the block, for data which is cached under versions bumped on the primary."""
+    state = current_routing.get()
+    if state is None or state.replica is None:
+        yield
+        return
+    replica, state.replica = state.replica, None
+    try:
+        yield
+    finally:
+        state.replica = replica
+
+
+def reads_from_replica() -> bool:
+    state = current_routing.get()
+    return state is not None and state.replica is not None
+
+
+class ReplicaRouter:
+    """Reads of requests routed by `ReplicaRoutingMiddleware` go to their replica, everything else to `default`."""
+
+    def db_for_read(self, model: type[Any], **hints: Any) -> str | None:
+        state = current_routing.get()
+        # reads within a transaction must see its writes
+        if state is None or state.replica is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return state.replica
+
+    def db_for_write(self, model: type[Any], **hints: Any) -> str:
+        state = current_routing.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Any, obj2: Any, **hints: Any) -> bool:
+        # replicas are copies of the primary
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, model_name: str | None = None, **hints: Any) -> bool:
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Pick a replica for reads of views with `replica_actions` and keep users who wrote on the primary.
+
+    Should come right after `RequestMetricsMiddleware`, so session and user lookups of routed views are routed too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponseBase | Awaitable[HttpResponseBase]:
+        if self.is_async:
+            return self.__acall__(request)
+        state = self.start(request)
+        token = current_routing.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        return self.finish(response, state)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponseBase:
+        state = self.start(request)
+        token = current_routing.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        return self.finish(response, state)
+
+    def process_view(
+        self, request: HttpRequest, view_func: Callable[..., Any], view_args: Any, view_kwargs: Any
+    ) -> None:
+        state: RoutingState | None = getattr(request, REQUEST_ATTRIBUTE, None)
+        replicas: list[str] = settings.DATABASE_REPLICAS
+        if (
+            state is not None
+            and replicas
+            and not state.pinned
+            and request.method in REPLICA_METHODS
+            and allows_replica_reads(view_func, request.method)
+        ):
+            state.replica = random.choice(replicas)
+
+    def start(self, request: HttpRequest) -> RoutingState:
+        state = RoutingState(pinned=PRIMARY_COOKIE in request.COOKIES)
+        setattr(request, REQUEST_ATTRIBUTE, state)
+        return state
+
+    def finish(self, response: HttpResponseBase, state: RoutingState) -> HttpResponseBase:
+        if state.wrote and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                PRIMARY_COOKIE,
+                '1',
+                max_age=settings.DATABASE_REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
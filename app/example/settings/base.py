@@ -35,6 +35,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'users',
     'questions',
@@ -42,6 +43,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'example.metrics.RequestMetricsMiddleware',
+    'example.routers.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -71,6 +74,9 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'example.wsgi.application'
 
+WARM_UP_WORKERS = Env.WARM_UP_WORKERS
+"""Warm up Celery worker processes with `example.warmup` before forking the pool, gunicorn reads it in its config."""
+
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
@@ -89,6 +95,25 @@ DATABASES = {
     }
 }
 
+DATABASE_REPLICAS: list[str] = []
+"""Aliases of replicas which `example.routers.ReplicaRouter` routes reads of opted in views to."""
+
+for index, replica in enumerate(Env.DB_REPLICAS):
+    replica_host, _, replica_port = replica.partition(':')
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'HOST': replica_host,
+        'PORT': int(replica_port) if replica_port else Env.DB_PORT,
+        # tests run against `default` only
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{index}')
+
+DATABASE_ROUTERS = ['example.routers.ReplicaRouter']
+
+DATABASE_REPLICA_STICKY_SECONDS = Env.DB_REPLICA_STICKY_SECONDS
+"""Reads of a client stay on `default` for this long after its last write, longer than the usual replication lag."""
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
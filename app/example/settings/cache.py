@@ -0,0 +1,10 @@
+from .environment import Env
+
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': f'redis://{Env.REDIS_HOST}:{Env.REDIS_PORT}/{Env.REDIS_CACHE_DB}',
+        'KEY_PREFIX': 'example',
+    }
+}
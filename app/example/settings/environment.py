@@ -21,10 +21,19 @@ class Environment(BaseSettings):
     DB_PASSWORD: str
     DB_HOST: str
     DB_PORT: int
+    # `host` or `host:port` of streaming replicas of the database, JSON list
+    DB_REPLICAS: list[str] = []
+    DB_REPLICA_STICKY_SECONDS: int = 10
 
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
+    REDIS_CACHE_DB: int = 1
+
+    METRICS_TOKEN: str = ''
+
+    # warm up gunicorn and celery worker processes before forking them
+    WARM_UP_WORKERS: bool = True
 
 
 Env = Environment()
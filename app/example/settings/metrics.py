@@ -0,0 +1,5 @@
+from .environment import Env
+
+
+# bearer token of scrapers of /metrics endpoint, without it only staff users can read the endpoint
+METRICS_TOKEN = Env.METRICS_TOKEN
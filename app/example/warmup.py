@@ -0,0 +1,71 @@
+"""
+Warm-up of worker processes before they are forked.
+
+`warm_up` does the lazy work of first requests and tasks once in the parent process, so every forked gunicorn or
+Celery worker inherits it: imports of URL confs with views and of DRF classes named in settings, populated URL
+resolver, compiled templates, model metadata, cached content types and the registry of question permission ids.
+Connections and connection pools opened by the warm-up are closed, sockets and pool threads can't be shared with
+forked workers.
+"""
+
+import logging
+import time
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import reverse
+from questions.registry import load_question_permissions
+from rest_framework.settings import api_settings
+
+
+logger = logging.getLogger(__name__)
+
+WARM_DRF_SETTINGS = (
+    'DEFAULT_RENDERER_CLASSES',
+    'DEFAULT_PARSER_CLASSES',
+    'DEFAULT_AUTHENTICATION_CLASSES',
+    'DEFAULT_PERMISSION_CLASSES',
+    'DEFAULT_THROTTLE_CLASSES',
+    'DEFAULT_CONTENT_NEGOTIATION_CLASS',
+    'DEFAULT_METADATA_CLASS',
+    'DEFAULT_VERSIONING_CLASS',
+    'DEFAULT_PAGINATION_CLASS',
+    'DEFAULT_FILTER_BACKENDS',
+    'EXCEPTION_HANDLER',
+    'UNAUTHENTICATED_USER',
+)
+"""DRF settings with import strings which are imported on first use of every request."""
+
+WARM_TEMPLATES = ('questions/question_list.html', 'questions/question_item.html')
+
+
+def warm_up() -> float:
+    """Prepare the process for serving requests and tasks, returns seconds spent."""
+    started = time.perf_counter()
+    # populates resolvers of every URL conf, which imports all views
+    reverse('questions-list')
+    for name in WARM_DRF_SETTINGS:
+        getattr(api_settings, name)
+    models = apps.get_models()
+    for model in models:
+        model._meta.get_fields()
+    for template in WARM_TEMPLATES:
+        get_template(template)
+    try:
+        ContentType.objects.get_for_models(*models)
+        load_question_permissions()
+    finally:
+        close_connections()
+    duration = time.perf_counter() - started
+    logger.info('Warmed up in %.1f ms', duration * 1000)
+    return duration
+
+
+def close_connections() -> None:
+    for connection in connections.all(initialized_only=True):
+        connection.close()
+        close_pool = getattr(connection, 'close_pool', None)
+        if close_pool is not None:
+            close_pool()
@@ -0,0 +1,22 @@
+"""
+Gunicorn settings, read from the working directory (`app/`).
+
+With `WARM_UP_WORKERS` (on by default) the application is loaded and warmed up by `example.warmup.warm_up` in the
+master process, workers are forked from it with imports, URL resolvers and caches ready. Code changes need a restart
+of the master then, `HUP` reloads fork workers from the already loaded code.
+"""
+
+from typing import Any
+
+from example.settings.environment import Env
+
+
+preload_app = Env.WARM_UP_WORKERS
+
+
+def when_ready(server: Any) -> None:
+    if preload_app:
+        # Django is set up by the preloaded application
+        from example.warmup import warm_up
+
+        warm_up()
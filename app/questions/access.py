@@ -0,0 +1,245 @@
+from collections import defaultdict
+from collections.abc import Collection, Iterable
+from itertools import chain
+from typing import Any
+
+from django.contrib.auth.models import AnonymousUser, Group
+from django.db import transaction
+from django.http import HttpRequest
+from rest_framework.request import Request
+from users.models import ExampleUser
+
+from .cache import bump_user_access_versions
+from .models import (
+    QUESTION_PERM_BITS,
+    Question,
+    QuestionAccessEntry,
+    QuestionGroupObjectPermission,
+    QuestionUserObjectPermission,
+)
+from .registry import get_question_permission_codenames, get_question_permission_ids, get_question_permission_registry
+from .snapshots import refresh_allowed_snapshots
+
+
+REQUEST_ATTRIBUTE = '_question_access'
+
+BULK_BATCH_SIZE = 2000
+"""Rows per statement for bulk inserts, large statements are slow to build and to parse."""
+
+QUESTION_OWNER_PERMS = ('view_question', 'change_question', 'delete_question')
+"""Object permissions granted to the author of a question."""
+
+
+class QuestionAccess:
+    """
+    Request scoped resolver for questions and user object permissions on them.
+
+    Every question is loaded once and user/group object permissions are loaded once per question,
+    so permission classes, serializer context and querysets can share the same lookups. Answers are the same as
+    of guardian `ObjectPermissionChecker`, but only permission ids are read and mapped to codenames by the
+    permission registry, so there are no permission joins and no content type or permission lookups.
+    """
+
+    def __init__(self, user: ExampleUser | AnonymousUser) -> None:
+        self.user = user
+        self._questions: dict[str, Question | None] = {}
+        self._perms: dict[Any, set[str]] = {}
+
+    def get_question(self, pk: Any) -> Question | None:
+        key = str(pk)
+        if key not in self._questions:
+            try:
+                self._questions[key] = Question.objects.get(pk=pk)
+            except (Question.DoesNotExist, ValueError):
+                self._questions[key] = None
+        return self._questions[key]
+
+    def prefetch(self, questions: Iterable[Question]) -> None:
+        """Load user and group object permissions for all given questions in two queries."""
+        pks = {question.pk for question in questions if question.pk is not None and question.pk not in self._perms}
+        if not pks:
+            return
+        if not self.user.is_authenticated or not self.user.is_active:
+            self._perms.update((pk, set()) for pk in pks)
+            return
+        if self.user.is_superuser:
+            everything = set(get_question_permission_registry().ids)
+            self._perms.update((pk, set(everything)) for pk in pks)
+            return
+
+        rows = [
+            *QuestionUserObjectPermission.objects.filter(user_id=self.user.pk, content_object_id__in=pks).values_list(
+                'content_object_id', 'permission_id'
+            ),
+            *QuestionGroupObjectPermission.objects.filter(
+                group__user=self.user.pk, content_object_id__in=pks
+            ).values_list('content_object_id', 'permission_id'),
+        ]
+        codenames = get_question_permission_codenames({permission_id for _, permission_id in rows})
+        self._perms.update((pk, set()) for pk in pks)
+        for question_id, permission_id in rows:
+            if permission_id in codenames:
+                self._perms[question_id].add(codenames[permission_id])
+
+    def get_perms(self, question: Question) -> set[str]:
+        if question.pk not in self._perms:
+            self.prefetch([question])
+        return set(self._perms.get(question.pk, ()))
+
+    def has_perm(self, perm: str, question: Question) -> bool:
+        if not self.user.is_active:
+            return False
+        if self.user.is_superuser:
+            return True
+        return perm.split('.', 1)[-1] in self.get_perms(question)
+
+
+def get_question_access(request: HttpRequest | Request) -> QuestionAccess:
+    access: QuestionAccess | None = getattr(request, REQUEST_ATTRIBUTE, None)
+    if access is None:
+        access = QuestionAccess(request.user)
+        setattr(request, REQUEST_ATTRIBUTE, access)
+    return access
+
+
+async def aget_question_perm_masks(user: ExampleUser, question_ids: Collection[int]) -> dict[int, int]:
+    """Permission bitmasks of user on questions for async views, read from `QuestionAccessEntry` in one query."""
+    if user.is_superuser:
+        # superusers have every object permission, like with guardian checker
+        everything = sum(QUESTION_PERM_BITS.values())
+        return {question_id: everything for question_id in question_ids}
+    return {
+        question_id: mask
+        async for question_id, mask in QuestionAccessEntry.objects.filter(
+            user_id=user.pk, question_id__in=question_ids
+        ).values_list('question_id', 'perm_bitmask')
+    }
+
+
+def compute_question_access(
+    user_ids: Collection[int] | None = None,
+    question_ids: Collection[int] | None = None,
+) -> dict[tuple[int, int], int]:
+    """
+    Fold guardian user and group object permissions into `(user_id, question_id) -> perm_bitmask`.
+
+    `None` means no restriction for that side, so `user_ids=None` computes access of every user.
+    """
+    user_perms = QuestionUserObjectPermission.objects.all()
+    group_perms = QuestionGroupObjectPermission.objects.filter(group__user__isnull=False)
+    if user_ids is not None:
+        user_perms = user_perms.filter(user_id__in=user_ids)
+        group_perms = group_perms.filter(group__user__in=user_ids)
+    if question_ids is not None:
+        user_perms = user_perms.filter(content_object_id__in=question_ids)
+        group_perms = group_perms.filter(content_object_id__in=question_ids)
+
+    # permission ids are mapped to bits by the registry instead of joining permission rows for codenames
+    bits = get_question_perm_bits()
+    masks: dict[tuple[int, int], int] = defaultdict(int)
+    rows = chain(
+        user_perms.values_list('user_id', 'content_object_id', 'permission_id').iterator(),
+        group_perms.values_list('group__user', 'content_object_id', 'permission_id').iterator(),
+    )
+    for user_id, question_id, permission_id in rows:
+        if permission_id not in bits:
+            bits = get_question_perm_bits([permission_id])
+            bits.setdefault(permission_id, 0)
+        masks[(user_id, question_id)] |= bits[permission_id]
+    return {key: mask for key, mask in masks.items() if mask}
+
+
+def get_question_perm_bits(permission_ids: Collection[int] = ()) -> dict[int, int]:
+    """`QuestionAccessEntry.perm_bitmask` bits of Question permission ids."""
+    return {
+        permission_id: QUESTION_PERM_BITS.get(codename, 0)
+        for permission_id, codename in get_question_permission_codenames(permission_ids).items()
+    }
+
+
+def sync_question_access(
+    user_ids: Collection[int] | None = None,
+    question_ids: Collection[int] | None = None,
+) -> None:
+    """Recompute `QuestionAccessEntry` rows for given users and/or questions from guardian tables."""
+    if user_ids is not None and not user_ids or question_ids is not None and not question_ids:
+        return
+    masks = compute_question_access(user_ids, question_ids)
+    entries = QuestionAccessEntry.objects.all()
+    if user_ids is not None:
+        entries = entries.filter(user_id__in=user_ids)
+    if question_ids is not None:
+        entries = entries.filter(question_id__in=question_ids)
+    affected_user_ids = (
+        set(user_ids) if user_ids is not None else set(entries.values_list('user_id', flat=True).distinct())
+    )
+    affected_user_ids.update(user_id for user_id, _ in masks)
+    with transaction.atomic():
+        entries.delete()
+        QuestionAccessEntry.objects.bulk_create(
+            [
+                QuestionAccessEntry(user_id=user_id, question_id=question_id, perm_bitmask=mask)
+                for (user_id, question_id), mask in masks.items()
+            ],
+            batch_size=BULK_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['user', 'question'],
+            update_fields=['perm_bitmask'],
+        )
+        # a full sync rebuilds every snapshot, not only ones of users with access
+        full = user_ids is None and question_ids is None
+        refresh_allowed_snapshots(None if full else affected_user_ids, question_ids)
+        bump_user_access_versions(affected_user_ids)
+
+
+def grant_question_perms(
+    user_or_group: ExampleUser | Group,
+    questions: Iterable[Question],
+    perms: Iterable[str],
+) -> None:
+    """Grant object permissions on all questions with a single bulk insert, already granted ones are skipped."""
+    questions = list(questions)
+    permission_ids = get_question_permission_ids(perms)
+    if not questions or not permission_ids:
+        return
+
+    rows: list[QuestionUserObjectPermission] | list[QuestionGroupObjectPermission]
+    if isinstance(user_or_group, Group):
+        rows = [
+            QuestionGroupObjectPermission(
+                group_id=user_or_group.pk, permission_id=permission_id, content_object_id=question.pk
+            )
+            for question in questions
+            for permission_id in permission_ids
+        ]
+        QuestionGroupObjectPermission.objects.bulk_create(rows, batch_size=BULK_BATCH_SIZE, ignore_conflicts=True)
+        sync_question_access(question_ids=[question.pk for question in questions])
+    else:
+        rows = [
+            QuestionUserObjectPermission(
+                user_id=user_or_group.pk, permission_id=permission_id, content_object_id=question.pk
+            )
+            for question in questions
+            for permission_id in permission_ids
+        ]
+        QuestionUserObjectPermission.objects.bulk_create(rows, batch_size=BULK_BATCH_SIZE, ignore_conflicts=True)
+        sync_question_access(user_ids=[user_or_group.pk], question_ids=[question.pk for question in questions])
+
+
+def grant_question_perms_to_users(grants: Collection[tuple[int, int]], perms: Iterable[str]) -> None:
+    """Grant object permissions for `(user_id, question_id)` pairs with a single bulk insert."""
+    permission_ids = get_question_permission_ids(perms)
+    if not grants or not permission_ids:
+        return
+    QuestionUserObjectPermission.objects.bulk_create(
+        (
+            QuestionUserObjectPermission(user_id=user_id, permission_id=permission_id, content_object_id=question_id)
+            for user_id, question_id in grants
+            for permission_id in permission_ids
+        ),
+        batch_size=BULK_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    sync_question_access(
+        user_ids={user_id for user_id, _ in grants}, question_ids={question_id for _, question_id in grants}
+    )
@@ -1,8 +1,127 @@
-# Register your models here.
+from typing import Any, cast
+
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Model, QuerySet
+from django.http import HttpRequest
+from django.utils.functional import cached_property
+from users.models import ExampleUser
 
+from .access import get_question_access
+from .bulk import delete_questions
 from .models import Choice, Question
+from .search import search_questions
+
+
+ESTIMATED_COUNT_THRESHOLD = 100_000
+"""Unfiltered changelists of tables with more rows (by planner statistics) show an estimated count."""
+
+
+def get_estimated_count(queryset: QuerySet[Any]) -> int | None:
+    """Row count of the queryset table from `pg_class.reltuples`, `None` when the table was never analyzed."""
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [queryset.model._meta.db_table]
+        )
+        row = cursor.fetchone()
+    return row[0] if row is not None and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):  # type: ignore[type-arg]
+    """Paginator which doesn't run `COUNT(*)` over a whole large table, filtered querysets are counted exactly."""
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            estimate = get_estimated_count(queryset)
+            if estimate is not None and estimate > ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):  # type: ignore[type-arg]
+    paginator = EstimatedCountPaginator
+    # the total is another full count next to the filtered one
+    show_full_result_count = False
+    list_per_page = 50
+
+
+class ChoiceInline(admin.TabularInline):  # type: ignore[type-arg]
+    model = Choice
+    fields = ['value']
+    extra = 0
+
+    def get_queryset(self, request: HttpRequest) -> QuerySet[Choice]:
+        return super().get_queryset(request).order_by('id')
+
+
+@admin.register(Question)
+class QuestionAdmin(LargeTableAdmin):
+    """
+    Questions the staff user can view, changes need `change_question`/`delete_question` object permissions.
+
+    Object permissions are checked with one subquery on `QuestionAccessEntry` for lists and with the request
+    scoped `QuestionAccess` for single questions, which reads permission ids and maps them by the permission registry.
+    Search uses the full-text index.
+    """
+
+    list_display = ['id', 'value', 'choice_count', 'updated_at']
+    readonly_fields = ['choice_count', 'updated_at']
+    search_fields = ['value']
+    ordering = ['-id']
+    inlines = [ChoiceInline]
+
+    def get_queryset(self, request: HttpRequest) -> QuerySet[Question]:
+        user = cast(ExampleUser, request.user)
+        return Question.objects.with_permission(user, 'view_question').order_by(*self.get_ordering(request))
+
+    def get_search_results(
+        self, request: HttpRequest, queryset: QuerySet[Question], search_term: str
+    ) -> tuple[QuerySet[Question], bool]:
+        if not search_term.strip():
+            return queryset, False
+        return search_questions(queryset, search_term), False
+
+    def has_change_permission(self, request: HttpRequest, obj: Model | None = None) -> bool:
+        return super().has_change_permission(request, obj) and has_question_perm(request, 'change_question', obj)
+
+    def has_delete_permission(self, request: HttpRequest, obj: Model | None = None) -> bool:
+        return super().has_delete_permission(request, obj) and has_question_perm(request, 'delete_question', obj)
+
+    def delete_queryset(self, request: HttpRequest, queryset: QuerySet[Question]) -> None:
+        delete_questions(list(queryset.values_list('id', flat=True)))
+
+
+@admin.register(Choice)
+class ChoiceAdmin(LargeTableAdmin):
+    """Choices of questions the staff user can view, changes need `change_question` on the question."""
+
+    list_display = ['id', 'value', 'question']
+    list_select_related = ['question']
+    # questions are searched by the autocomplete view instead of being rendered into one select
+    autocomplete_fields = ['question']
+    ordering = ['-id']
+
+    def get_queryset(self, request: HttpRequest) -> QuerySet[Choice]:
+        return (
+            Choice.objects.with_question_permission(cast(ExampleUser, request.user), 'view_question')
+            .select_related('question')
+            .order_by(*self.get_ordering(request))
+        )
+
+    def has_change_permission(self, request: HttpRequest, obj: Model | None = None) -> bool:
+        question = obj.question if isinstance(obj, Choice) else None
+        return super().has_change_permission(request, obj) and has_question_perm(request, 'change_question', question)
+
+    def has_delete_permission(self, request: HttpRequest, obj: Model | None = None) -> bool:
+        question = obj.question if isinstance(obj, Choice) else None
+        return super().has_delete_permission(request, obj) and has_question_perm(request, 'change_question', question)
 
 
-admin.site.register(Question)
-admin.site.register(Choice)
+def has_question_perm(request: HttpRequest, perm: str, question: Model | None) -> bool:
+    """Object permission on a question, model level checks (without an object) are left to the admin."""
+    if not isinstance(question, Question):
+        return True
+    return get_question_access(request).has_perm(f'questions.{perm}', question)
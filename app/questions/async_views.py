@@ -0,0 +1,145 @@
+"""
+Read-only async versions of question and choice API endpoints for ASGI servers.
+
+Responses are the same as of `QuestionViewSet`/`ChoicesViewSet` list and retrieve, permissions are checked
+with the async ORM against `QuestionAccessEntry`, so a slow database round trip doesn't block a worker.
+Only session authentication is supported.
+"""
+
+from collections.abc import Mapping
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.views.decorators.http import require_safe
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from users.models import ExampleUser
+
+from .access import aget_question_perm_masks
+from .cache import has_model_perm
+from .models import QUESTION_PERM_BITS, Choice, Question
+from .serializers import arepresent_questions
+
+
+NOT_AUTHENTICATED = 'Authentication credentials were not provided.'
+PERMISSION_DENIED = 'You do not have permission to perform this action.'
+
+
+def json_response(data: Any, status: int = 200) -> JsonResponse:
+    # same bytes as DRF `JSONRenderer` output
+    return JsonResponse(
+        data, status=status, safe=False, json_dumps_params={'ensure_ascii': False, 'separators': (',', ':')}
+    )
+
+
+def error_response(detail: str, status: int) -> JsonResponse:
+    return json_response({'detail': detail}, status=status)
+
+
+async def get_authorized_user(request: HttpRequest) -> ExampleUser | JsonResponse:
+    """Session user with global `view_question` permission or an error response like DRF permission classes."""
+    user: ExampleUser | AnonymousUser = await request.auser()
+    if not isinstance(user, ExampleUser):
+        return error_response(NOT_AUTHENTICATED, 403)
+    # django cache and auth backends are sync only
+    if not await sync_to_async(has_model_perm)(user, 'questions.view_question'):
+        return error_response(PERMISSION_DENIED, 403)
+    return user
+
+
+async def can_view_question(user: ExampleUser, question_id: int) -> bool:
+    masks = await aget_question_perm_masks(user, [question_id])
+    return bool(masks.get(question_id, 0) & QUESTION_PERM_BITS['view_question'])
+
+
+def get_query_int(request: HttpRequest, name: str, default: int) -> int:
+    try:
+        value = int(request.GET[name])
+    except (KeyError, ValueError):
+        return default
+    return value if value >= 0 else default
+
+
+def paginate(request: HttpRequest, count: int, results: list[Any], limit: int, offset: int) -> dict[str, Any]:
+    """Page body with the same links as `LimitOffsetPagination`."""
+    url = request.build_absolute_uri()
+    next_url = None
+    if offset + limit < count:
+        next_url = replace_query_param(replace_query_param(url, 'limit', limit), 'offset', offset + limit)
+    previous_url = None
+    if offset > 0:
+        previous_url = replace_query_param(url, 'limit', limit)
+        if offset - limit <= 0:
+            previous_url = remove_query_param(previous_url, 'offset')
+        else:
+            previous_url = replace_query_param(previous_url, 'offset', offset - limit)
+    return {'count': count, 'next': next_url, 'previous': previous_url, 'results': results}
+
+
+def get_page_bounds(request: HttpRequest) -> tuple[int, int]:
+    page_size = api_settings.PAGE_SIZE or 100
+    return get_query_int(request, 'limit', page_size) or page_size, get_query_int(request, 'offset', 0)
+
+
+@require_safe
+async def question_list(request: HttpRequest) -> HttpResponse:
+    user = await get_authorized_user(request)
+    if isinstance(user, JsonResponse):
+        return user
+    limit, offset = get_page_bounds(request)
+    queryset = Question.objects.with_permission(user, 'view_question')
+    count = await queryset.acount()
+    rows: list[Mapping[str, Any]] = [
+        row async for row in queryset.order_by('id').values('id', 'value', 'choice_count')[offset : offset + limit]
+    ]
+    masks = await aget_question_perm_masks(user, [row['id'] for row in rows])
+    return json_response(paginate(request, count, await arepresent_questions(rows, masks), limit, offset))
+
+
+@require_safe
+async def question_detail(request: HttpRequest, pk: int) -> HttpResponse:
+    user = await get_authorized_user(request)
+    if isinstance(user, JsonResponse):
+        return user
+    try:
+        row = await Question.objects.values('id', 'value', 'choice_count').aget(pk=pk)
+    except Question.DoesNotExist:
+        return error_response('No Question matches the given query.', 404)
+    masks = await aget_question_perm_masks(user, [pk])
+    if not masks.get(pk, 0) & QUESTION_PERM_BITS['view_question']:
+        return error_response(PERMISSION_DENIED, 403)
+    [data] = await arepresent_questions([row], masks)
+    return json_response(data)
+
+
+@require_safe
+async def choice_list(request: HttpRequest, question_pk: int) -> HttpResponse:
+    user = await get_authorized_user(request)
+    if isinstance(user, JsonResponse):
+        return user
+    if not await can_view_question(user, question_pk):
+        return error_response(PERMISSION_DENIED, 403)
+    limit, offset = get_page_bounds(request)
+    queryset = Choice.objects.filter(question_id=question_pk)
+    count = await queryset.acount()
+    results = [
+        {'id': choice_id, 'question': question_pk, 'value': value}
+        async for choice_id, value in queryset.order_by('id').values_list('id', 'value')[offset : offset + limit]
+    ]
+    return json_response(paginate(request, count, results, limit, offset))
+
+
+@require_safe
+async def choice_detail(request: HttpRequest, question_pk: int, pk: int) -> HttpResponse:
+    user = await get_authorized_user(request)
+    if isinstance(user, JsonResponse):
+        return user
+    if not await can_view_question(user, question_pk):
+        return error_response(PERMISSION_DENIED, 403)
+    try:
+        choice = await Choice.objects.values('id', 'question', 'value').aget(question_id=question_pk, pk=pk)
+    except Choice.DoesNotExist:
+        return error_response('No Choice matches the given query.', 404)
+    return json_response(choice)
@@ -0,0 +1,237 @@
+from collections.abc import Collection, Mapping, Sequence
+from itertools import batched
+from typing import Any
+
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.exceptions import ValidationError
+from users.models import ExampleUser
+
+from .access import BULK_BATCH_SIZE, QUESTION_OWNER_PERMS, QuestionAccess, grant_question_perms
+from .cache import bump_question_versions
+from .denormalized import update_choice_fields
+from .models import QUESTION_PERM_BITS, Choice, Question
+from .snapshots import remove_from_allowed_snapshots
+
+
+MAX_BULK_SIZE = 10_000
+"""Max number of items in a single bulk request."""
+
+MAX_GRANT_QUESTION_IDS = 100_000
+"""Max number of question ids in a single grant request, larger sets should be given with a filter."""
+
+GRANT_FILTER_LOOKUPS: dict[str, type[serializers.Field[Any, Any, Any, Any]]] = {
+    'value__icontains': serializers.CharField,
+    'id__gte': serializers.IntegerField,
+    'id__lte': serializers.IntegerField,
+    'updated_at__gte': serializers.DateTimeField,
+    'updated_at__lte': serializers.DateTimeField,
+}
+"""Question lookups accepted by grant requests in `question_filter` with fields validating their values."""
+
+type BulkResult = dict[str, Any]
+
+
+class BulkChoiceSerializer(serializers.ModelSerializer[Choice]):
+    class Meta:
+        model = Choice
+        fields = ['value']
+
+
+class BulkQuestionSerializer(serializers.ModelSerializer[Question]):
+    id = serializers.IntegerField(required=False)
+    choices = BulkChoiceSerializer(many=True, required=False)
+
+    class Meta:
+        model = Question
+        fields = ['id', 'value', 'choices']
+
+
+class BulkQuestionDeleteSerializer(serializers.Serializer[Any]):
+    id = serializers.IntegerField()
+
+
+class BulkGrantSerializer(serializers.Serializer[Any]):
+    perms = serializers.ListField(child=serializers.ChoiceField(choices=list(QUESTION_PERM_BITS)), allow_empty=False)
+    user = serializers.PrimaryKeyRelatedField(queryset=ExampleUser.objects.all(), required=False)
+    group = serializers.PrimaryKeyRelatedField(queryset=Group.objects.all(), required=False)
+    question_ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False, max_length=MAX_GRANT_QUESTION_IDS
+    )
+    question_filter = serializers.DictField(required=False, allow_empty=False)
+
+    def validate_question_filter(self, value: dict[str, Any]) -> dict[str, Any]:
+        """Check lookups and their values before the task is queued, values are normalized to JSON types."""
+        if unknown := set(value) - set(GRANT_FILTER_LOOKUPS):
+            raise ValidationError(f'Unsupported lookups {sorted(unknown)}, use one of {list(GRANT_FILTER_LOOKUPS)}.')
+        normalized: dict[str, Any] = {}
+        errors: dict[str, Any] = {}
+        for lookup, lookup_value in value.items():
+            field = GRANT_FILTER_LOOKUPS[lookup]()
+            try:
+                normalized[lookup] = field.to_representation(field.run_validation(lookup_value))
+            except ValidationError as error:
+                errors[lookup] = error.detail
+        if errors:
+            raise ValidationError(errors)
+        return normalized
+
+    def validate(self, data: dict[str, Any]) -> dict[str, Any]:
+        if ('user' in data) == ('group' in data):
+            raise ValidationError({'non_field_errors': ['Expected exactly one of user and group.']})
+        if ('question_ids' in data) == ('question_filter' in data):
+            raise ValidationError({'non_field_errors': ['Expected exactly one of question_ids and question_filter.']})
+        return data
+
+
+def validate_items(
+    data: Any,
+    serializer_class: type[serializers.Serializer[Any]],
+    partial: bool = False,
+) -> tuple[list[tuple[int, dict[str, Any]]], list[BulkResult]]:
+    """
+    Validate every item of the batch in one pass, returns valid items with their indexes and failed results.
+
+    Fields are optional in `partial` items like in PATCH requests of DRF.
+    """
+    if not isinstance(data, Sequence) or isinstance(data, str | bytes) or not data:
+        raise ValidationError({'non_field_errors': ['Expected a non empty list of items.']})
+    if len(data) > MAX_BULK_SIZE:
+        raise ValidationError({'non_field_errors': [f'Ensure there are no more than {MAX_BULK_SIZE} items.']})
+
+    serializer = serializer_class(partial=partial)
+    valid: list[tuple[int, dict[str, Any]]] = []
+    failed: list[BulkResult] = []
+    for index, item in enumerate(data):
+        try:
+            if not isinstance(item, Mapping):
+                raise ValidationError({'non_field_errors': ['Expected an object.']})
+            valid.append((index, serializer.run_validation(item)))
+        except ValidationError as error:
+            failed.append({'index': index, 'status': status.HTTP_400_BAD_REQUEST, 'errors': error.detail})
+    return valid, failed
+
+
+def sort_results(results: list[BulkResult]) -> list[BulkResult]:
+    return sorted(results, key=lambda result: int(result['index']))
+
+
+def bulk_create_questions(user: ExampleUser, data: Any) -> list[BulkResult]:
+    valid, results = validate_items(data, BulkQuestionSerializer)
+    with transaction.atomic():
+        questions = Question.objects.bulk_create(
+            (Question(value=item['value']) for _, item in valid), batch_size=BULK_BATCH_SIZE
+        )
+        Choice.objects.bulk_create(
+            (
+                Choice(question=question, value=choice['value'])
+                for question, (_, item) in zip(questions, valid, strict=True)
+                for choice in item.get('choices', [])
+            ),
+            batch_size=BULK_BATCH_SIZE,
+        )
+        update_choice_fields([question.pk for question in questions])
+        grant_question_perms(user, questions, QUESTION_OWNER_PERMS)
+    results += [
+        {'index': index, 'status': status.HTTP_201_CREATED, 'id': question.pk}
+        for question, (index, _) in zip(questions, valid, strict=True)
+    ]
+    return sort_results(results)
+
+
+def resolve_permitted(
+    access: QuestionAccess,
+    valid: list[tuple[int, dict[str, Any]]],
+    perm: str,
+) -> tuple[list[tuple[int, Question, dict[str, Any]]], list[BulkResult]]:
+    """
+    Load questions of the batch at once and split items into permitted and failed ones.
+
+    Every question can be given once, later items with the same id fail.
+    """
+    questions = Question.objects.in_bulk([item['id'] for _, item in valid if 'id' in item])
+    access.prefetch(questions.values())
+    permitted: list[tuple[int, Question, dict[str, Any]]] = []
+    failed: list[BulkResult] = []
+    seen: set[int] = set()
+    for index, item in valid:
+        if 'id' not in item:
+            failed.append(
+                {'index': index, 'status': status.HTTP_400_BAD_REQUEST, 'errors': {'id': ['This field is required.']}}
+            )
+        elif item['id'] in seen:
+            failed.append(
+                {
+                    'index': index,
+                    'status': status.HTTP_400_BAD_REQUEST,
+                    'errors': {'id': ['Duplicate id in the batch.']},
+                }
+            )
+        elif (question := questions.get(item['id'])) is None:
+            failed.append({'index': index, 'status': status.HTTP_404_NOT_FOUND, 'id': item['id']})
+        elif not access.has_perm(perm, question):
+            failed.append({'index': index, 'status': status.HTTP_403_FORBIDDEN, 'id': item['id']})
+        else:
+            permitted.append((index, question, item))
+        if 'id' in item:
+            seen.add(item['id'])
+    return permitted, failed
+
+
+def bulk_update_questions(access: QuestionAccess, data: Any) -> list[BulkResult]:
+    valid, results = validate_items(data, BulkQuestionSerializer, partial=True)
+    permitted, failed = resolve_permitted(access, valid, 'questions.change_question')
+    results += failed
+    with transaction.atomic():
+        # bulk_update doesn't apply auto_now
+        now = timezone.now()
+        for _, question, item in permitted:
+            question.value = item.get('value', question.value)
+            question.updated_at = now
+        Question.objects.bulk_update(
+            [question for _, question, _ in permitted], ['value', 'updated_at'], batch_size=BULK_BATCH_SIZE
+        )
+        bump_question_versions([question.pk for _, question, _ in permitted])
+
+        # nested choices replace current choices of the question
+        replaced = [(question, item['choices']) for _, question, item in permitted if 'choices' in item]
+        # nothing references choices, so they are deleted without collecting rows and sending `post_delete` per choice,
+        # versions and denormalized fields of the questions are updated for the whole batch
+        replaced_choices = Choice.objects.filter(question__in=[question for question, _ in replaced])
+        replaced_choices._raw_delete(replaced_choices.db)  # type: ignore[attr-defined]
+        Choice.objects.bulk_create(
+            (Choice(question=question, value=choice['value']) for question, choices in replaced for choice in choices),
+            batch_size=BULK_BATCH_SIZE,
+        )
+        update_choice_fields([question.pk for _, question, _ in permitted])
+    results += [{'index': index, 'status': status.HTTP_200_OK, 'id': question.pk} for index, question, _ in permitted]
+    return sort_results(results)
+
+
+def bulk_delete_questions(access: QuestionAccess, data: Any) -> list[BulkResult]:
+    valid, results = validate_items(data, BulkQuestionDeleteSerializer)
+    permitted, failed = resolve_permitted(access, valid, 'questions.delete_question')
+    results += failed
+    delete_questions([question.pk for _, question, _ in permitted])
+    results += [
+        {'index': index, 'status': status.HTTP_204_NO_CONTENT, 'id': question.pk} for index, question, _ in permitted
+    ]
+    return sort_results(results)
+
+
+def delete_questions(question_ids: Collection[int]) -> None:
+    """
+    Delete questions with one queryset delete.
+
+    Signal receivers skip queryset deletes of questions, snapshots are updated here with one statement per batch
+    (before access entries are deleted by cascade) and cached renders are invalidated with one call.
+    """
+    if not question_ids:
+        return
+    with transaction.atomic():
+        for batch in batched(question_ids, BULK_BATCH_SIZE):
+            remove_from_allowed_snapshots(batch)
+        Question.objects.filter(id__in=question_ids).delete()
+        bump_question_versions(question_ids)
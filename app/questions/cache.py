@@ -0,0 +1,132 @@
+import time
+from collections.abc import Collection, Iterable
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from django.template.loader import render_to_string
+from django.utils.safestring import SafeString, mark_safe
+from example.routers import primary_reads, reads_from_replica
+from users.models import ExampleUser
+
+from .models import Choice, Question
+
+
+QUESTION_FRAGMENT_KEY = 'questions:fragment:{}:{}'
+QUESTION_VERSION_KEY = 'questions:version:{}'
+USER_ACCESS_VERSION_KEY = 'questions:access-version:{}'
+USER_PERMS_VERSION_KEY = 'questions:perms-version:{}'
+USER_PERMS_KEY = 'questions:perms:{}:{}'
+
+FRAGMENT_TIMEOUT = 24 * 60 * 60
+USER_PERMS_TIMEOUT = 5 * 60
+
+
+def new_version() -> str:
+    return str(time.time_ns())
+
+
+def get_versions(key_template: str, ids: Iterable[int]) -> dict[int, str]:
+    """Current version tokens of ids, missing tokens are created so cached data stays valid until bumped."""
+    keys = {key_template.format(id): id for id in ids}
+    versions = {keys[key]: version for key, version in cache.get_many(keys).items()}
+    if missing := {key: new_version() for key, id in keys.items() if id not in versions}:
+        cache.set_many(missing, timeout=None)
+        versions.update({keys[key]: version for key, version in missing.items()})
+    return versions
+
+
+def bump_versions(key_template: str, ids: Collection[int]) -> None:
+    """
+    Replace version tokens of ids right away and once more after commit.
+
+    The second bump drops anything cached by concurrent requests from data that wasn't committed yet.
+    """
+    if not ids:
+        return
+    keys = [key_template.format(id) for id in ids]
+
+    def bump() -> None:
+        version = new_version()
+        cache.set_many({key: version for key in keys}, timeout=None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def get_question_versions(question_ids: Iterable[int]) -> dict[int, str]:
+    return get_versions(QUESTION_VERSION_KEY, question_ids)
+
+
+def bump_question_versions(question_ids: Collection[int]) -> None:
+    """Invalidate cached renders of questions after question or choices change."""
+    bump_versions(QUESTION_VERSION_KEY, question_ids)
+
+
+def bump_user_access_versions(user_ids: Collection[int]) -> None:
+    """Invalidate validators of question lists after permissions of users change."""
+    bump_versions(USER_ACCESS_VERSION_KEY, user_ids)
+
+
+def get_user_access_version(user_id: int) -> str:
+    return get_versions(USER_ACCESS_VERSION_KEY, [user_id])[user_id]
+
+
+def bump_user_perms_versions(user_ids: Collection[int]) -> None:
+    """Invalidate cached model permissions after permissions or groups of users change."""
+    bump_versions(USER_PERMS_VERSION_KEY, user_ids)
+
+
+def get_user_model_perms(user: ExampleUser) -> set[str]:
+    """
+    `app_label.codename` model permissions of user granted directly and through groups.
+
+    Cached per user until user permissions version is bumped, the short timeout bounds staleness after changes
+    which don't send signals (like queryset updates of permission tables).
+    """
+    version = get_versions(USER_PERMS_VERSION_KEY, [user.pk])[user.pk]
+    key = USER_PERMS_KEY.format(user.pk, version)
+    perms: list[str] | None = cache.get(key)
+    if perms is None:
+        with primary_reads():
+            perms = sorted(user.get_all_permissions())
+        cache.set(key, perms, timeout=USER_PERMS_TIMEOUT)
+    return set(perms)
+
+
+def has_model_perm(user: ExampleUser | AnonymousUser, perm: str) -> bool:
+    """Same as `user.has_perm(perm)` without an object, model permissions of users are read from the cache."""
+    if not isinstance(user, ExampleUser):
+        return user.has_perm(perm)
+    if not user.is_active:
+        return False
+    return user.is_superuser or perm in get_user_model_perms(user)
+
+
+def render_question_fragments(questions: Iterable[Question]) -> list[SafeString]:
+    """
+    Rendered `question_item.html` for every question, cached per question id and version.
+
+    Cached fragments are fetched with one round trip, choices are prefetched only for questions which are rendered.
+    """
+    questions = list(questions)
+    versions = get_question_versions(question.pk for question in questions)
+    keys = {question.pk: QUESTION_FRAGMENT_KEY.format(question.pk, versions[question.pk]) for question in questions}
+    fragments: dict[str, str] = cache.get_many(keys.values())
+
+    missing = [question for question in questions if keys[question.pk] not in fragments]
+    # a lagging replica would cache stale renders under versions bumped on the primary
+    if missing and reads_from_replica():
+        with primary_reads():
+            current = Question.objects.in_bulk([question.pk for question in missing])
+        missing = [current.get(question.pk, question) for question in missing]
+    with primary_reads():
+        prefetch_related_objects(missing, Prefetch('choices', queryset=Choice.objects.order_by('id')))
+    rendered = {
+        keys[question.pk]: render_to_string('questions/question_item.html', {'question': question})
+        for question in missing
+    }
+    cache.set_many(rendered, timeout=FRAGMENT_TIMEOUT)
+    fragments.update(rendered)
+    return [mark_safe(fragments[keys[question.pk]]) for question in questions]
@@ -0,0 +1,72 @@
+import hashlib
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any, cast
+
+from django.db.models import Count, Max, QuerySet
+from django.http import HttpRequest
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from .cache import get_user_access_version
+from .models import Question
+
+
+type Validators = tuple[str, datetime | None]
+"""ETag and Last-Modified of a response."""
+
+
+def make_etag(request: Request, *parts: Any) -> str:
+    """
+    ETag of a response from the state it is built of.
+
+    Responses differ by user (`can_change`/`can_delete` flags depend on their access), by query string
+    (pagination and field selection) and by the renderer, so all of them are part of the tag.
+    """
+    renderer_format = getattr(request.accepted_renderer, 'format', None)
+    user_id = request.user.pk
+    key = ':'.join(
+        str(part)
+        for part in (user_id, get_user_access_version(user_id), request.get_full_path(), renderer_format, *parts)
+    )
+    return hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+
+
+def get_question_list_validators(request: Request, queryset: QuerySet[Question], *parts: Any) -> Validators:
+    """
+    Validators of a question list from one aggregate over the permitted questions.
+
+    Lists have no Last-Modified: the newest `updated_at` doesn't move when a question is deleted or access to it is
+    revoked, so `If-Modified-Since` alone would keep stale lists. The ETag covers both by count and access version,
+    `parts` add state of the response which isn't in the queryset.
+    """
+    state = queryset.order_by().aggregate(count=Count('id'), last_modified=Max('updated_at'))
+    return make_etag(request, state['count'], state['last_modified'], *parts), None
+
+
+def get_question_validators(request: Request, question: Question) -> Validators:
+    """Validators of a question, its choices included as every choice write touches `Question.updated_at`."""
+    return make_etag(request, question.pk, question.updated_at), question.updated_at
+
+
+def conditional_response(request: Request, validators: Validators, respond: Callable[[], Response]) -> Response:
+    """
+    Answer 304 (or 412) when client validators match, otherwise build the response with `respond`.
+
+    Serialization is skipped for revalidated requests, validators are attached to both kinds of responses.
+    """
+    etag, last_modified = validators
+    etag = quote_etag(etag)
+    timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+    # only META and method of the request are used
+    precondition = get_conditional_response(cast(HttpRequest, request), etag=etag, last_modified=timestamp)
+    response = respond() if precondition is None else Response(status=precondition.status_code)
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        # clients and shared caches have to revalidate, responses are per user
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
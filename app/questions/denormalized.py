@@ -0,0 +1,36 @@
+"""
+Question fields derived from its choices.
+
+`Question.choice_count` and `Question.search_vector` are recomputed in one statement by choice signals and by bulk
+writes, which don't send signals.
+"""
+
+from collections.abc import Collection
+
+from django.db.models import Count, OuterRef, PositiveIntegerField, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Choice, Question
+from .search import get_search_vector
+
+
+def get_choice_count() -> Coalesce:
+    return Coalesce(
+        Subquery(
+            Choice.objects.filter(question=OuterRef('pk'))
+            .order_by()
+            .values('question')
+            .annotate(count=Count('id'))
+            .values('count')
+        ),
+        Value(0),
+        output_field=PositiveIntegerField(),
+    )
+
+
+def update_choice_fields(question_ids: Collection[int]) -> None:
+    """Recompute `choice_count` and `search_vector` of questions after their choices change."""
+    if question_ids:
+        Question.objects.filter(pk__in=question_ids).update(
+            choice_count=get_choice_count(), search_vector=get_search_vector()
+        )
@@ -0,0 +1,77 @@
+import csv
+import json
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from typing import Any
+
+from django.db.models import QuerySet
+from rest_framework.renderers import JSONRenderer
+
+from .models import Choice, Question
+
+
+EXPORT_CHUNK_SIZE = 2000
+"""Questions fetched from server side cursor at once, their choices are loaded with one query per chunk."""
+
+CSV_HEADER = ['question_id', 'question_value', 'choice_id', 'choice_value']
+
+
+class NDJSONRenderer(JSONRenderer):
+    """Marks export responses as NDJSON, errors are rendered as a single JSON document."""
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class CSVRenderer(JSONRenderer):
+    """Marks export responses as CSV, errors are rendered as a single JSON document."""
+
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class Echo:
+    """Pseudo buffer for `csv.writer` which returns written line instead of storing it."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_question_chunks(
+    queryset: QuerySet[Question], chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[list[dict[str, Any]]]:
+    """Stream `.values()` rows of questions in id order with their choices, memory is bounded by chunk size."""
+    chunk: list[Mapping[str, Any]] = []
+    for row in queryset.order_by('id').values('id', 'value').iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield attach_choices(chunk)
+            chunk = []
+    if chunk:
+        yield attach_choices(chunk)
+
+
+def attach_choices(rows: Sequence[Mapping[str, Any]]) -> list[dict[str, Any]]:
+    choices: dict[int, list[dict[str, Any]]] = {row['id']: [] for row in rows}
+    for choice_id, question_id, value in (
+        Choice.objects.filter(question_id__in=choices).order_by('id').values_list('id', 'question_id', 'value')
+    ):
+        choices[question_id].append({'id': choice_id, 'question': question_id, 'value': value})
+    return [{'id': row['id'], 'value': row['value'], 'choices': choices[row['id']]} for row in rows]
+
+
+def iter_ndjson(chunks: Iterable[list[dict[str, Any]]]) -> Iterator[str]:
+    for chunk in chunks:
+        yield ''.join(json.dumps(question, ensure_ascii=False, separators=(',', ':')) + '\n' for question in chunk)
+
+
+def iter_csv(chunks: Iterable[list[dict[str, Any]]]) -> Iterator[str]:
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+    for chunk in chunks:
+        lines = []
+        for question in chunk:
+            if not question['choices']:
+                lines.append(writer.writerow([question['id'], question['value'], '', '']))
+            for choice in question['choices']:
+                lines.append(writer.writerow([question['id'], question['value'], choice['id'], choice['value']]))
+        yield ''.join(lines)
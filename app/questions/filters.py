@@ -0,0 +1,59 @@
+from collections.abc import Mapping
+from typing import Any
+
+from django.db.models import QuerySet
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+from rest_framework.request import Request
+from rest_framework.views import APIView
+
+from .models import Question
+
+
+QUESTION_ORDERINGS = ('id', '-id', 'choice_count', '-choice_count')
+"""Values of `?ordering=` accepted by question lists, served by the `(choice_count, id)` index."""
+
+CHOICE_COUNT_BOUNDS = {'min_choices': 'choice_count__gte', 'max_choices': 'choice_count__lte'}
+"""Query parameters which filter question lists by number of choices."""
+
+
+def get_choice_count_bounds(params: Mapping[str, str]) -> dict[str, int]:
+    """`choice_count` lookups from query parameters, raises `ValueError` naming the parameter with an invalid value."""
+    lookups: dict[str, int] = {}
+    for param, lookup in CHOICE_COUNT_BOUNDS.items():
+        if (value := params.get(param)) is None:
+            continue
+        try:
+            lookups[lookup] = int(value)
+        except ValueError:
+            raise ValueError(param) from None
+    return lookups
+
+
+def order_questions(queryset: QuerySet[Question], ordering: str | None) -> QuerySet[Question]:
+    """Order by one of `QUESTION_ORDERINGS`, ties are ordered by id so pages are stable. Others order by id."""
+    if ordering not in QUESTION_ORDERINGS:
+        return queryset.order_by('id')
+    return queryset.order_by(ordering, 'id')
+
+
+class ChoiceCountFilter(BaseFilterBackend):
+    """Filter questions by number of choices with `?min_choices=` and `?max_choices=`."""
+
+    def filter_queryset(self, request: Request, queryset: QuerySet[Any], view: APIView) -> QuerySet[Any]:
+        try:
+            return queryset.filter(**get_choice_count_bounds(request.query_params))
+        except ValueError as error:
+            raise ValidationError({str(error): ['A valid integer is required.']}) from None
+
+
+class QuestionOrderingFilter(OrderingFilter):
+    """Order questions with `?ordering=choice_count`/`-choice_count`, without it ordering of the queryset is kept."""
+
+    ordering_fields = ['id', 'choice_count']
+
+    def filter_queryset(self, request: Request, queryset: QuerySet[Any], view: APIView) -> QuerySet[Any]:
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+        return queryset.order_by(*ordering, 'id')
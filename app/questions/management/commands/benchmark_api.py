@@ -0,0 +1,190 @@
+import json
+import random
+import statistics
+import time
+from collections import Counter
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from users.models import ExampleUser
+
+from questions.access import BULK_BATCH_SIZE, sync_question_access
+from questions.denormalized import update_choice_fields
+from questions.models import Choice, Question, QuestionGroupObjectPermission, QuestionUserObjectPermission
+from questions.registry import get_question_permission_ids
+
+
+type Endpoint = Callable[[random.Random], str]
+"""Builds url of the next request to an endpoint."""
+
+DATASET_OPTIONS = ('users', 'groups', 'questions', 'choices', 'user_grants', 'group_grants', 'requests', 'seed')
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed users, groups, questions, choices and permission grants, then measure latency and queries "
+        "of question API and HTML endpoints for one of the users"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument('--questions', type=int, default=10_000)
+        parser.add_argument('--choices', type=int, default=4, help="Choices per question")
+        parser.add_argument('--user-grants', type=int, default=50_000, help="Object permissions granted to users")
+        parser.add_argument('--group-grants', type=int, default=5_000, help="Object permissions granted to groups")
+        parser.add_argument('--requests', type=int, default=50, help="Requests per endpoint")
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--seed', type=int, default=0, help="Random seed, same seed generates the same dataset")
+        parser.add_argument('--output', type=Path, help="Save results as JSON")
+        parser.add_argument('--compare', type=Path, help="JSON results of a previous run to compare with")
+        parser.add_argument('--keep', action='store_true', help="Keep generated data instead of rolling it back")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options['requests'] < 2:
+            raise CommandError("At least 2 requests per endpoint are needed for percentiles")
+        baseline = json.loads(options['compare'].read_text()) if options['compare'] else None
+        rng = random.Random(options['seed'])
+
+        # the test client host is allowed only for the benchmark
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']), transaction.atomic():
+            started = time.perf_counter()
+            user, question_ids = self.seed(rng, options)
+            seed_time = time.perf_counter() - started
+            if not question_ids:
+                raise CommandError("Benchmark user has no permitted questions, increase --user-grants")
+
+            client = Client()
+            client.force_login(user)
+            page_size = options['page_size']
+            endpoints: dict[str, Endpoint] = {
+                'questions-list': lambda _: f"{reverse('questions-list')}?limit={page_size}",
+                'questions-detail': lambda rng: reverse('questions-detail', args=(rng.choice(question_ids),)),
+                'question-choices-list': lambda rng: reverse('question-choices-list', args=(rng.choice(question_ids),)),
+                'all-question-list': lambda _: reverse('all-question-list', args=('allowed',)),
+            }
+            results = {
+                name: self.measure(client, endpoint, rng, options['requests']) for name, endpoint in endpoints.items()
+            }
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+        report = {
+            'created_at': datetime.now(UTC).isoformat(),
+            'options': {name: options[name] for name in DATASET_OPTIONS},
+            'permitted_questions': len(question_ids),
+            'seed_seconds': round(seed_time, 3),
+            'endpoints': results,
+        }
+        self.print_report(report, baseline)
+        if options['output']:
+            options['output'].write_text(json.dumps(report, indent=2))
+
+    def seed(self, rng: random.Random, options: dict[str, Any]) -> tuple[ExampleUser, list[int]]:
+        """Generate the dataset, returns the user with the most grants and ids of questions they can view."""
+        prefix = f'benchmark_{time.monotonic_ns()}'
+        password = make_password(None)
+        users = ExampleUser.objects.bulk_create(
+            (ExampleUser(username=f'{prefix}_{index}', password=password) for index in range(options['users'])),
+            batch_size=BULK_BATCH_SIZE,
+        )
+        groups = Group.objects.bulk_create(Group(name=f'{prefix}_{index}') for index in range(options['groups']))
+        if groups:
+            ExampleUser.groups.through.objects.bulk_create(
+                (ExampleUser.groups.through(exampleuser_id=user.pk, group_id=rng.choice(groups).pk) for user in users),
+                batch_size=BULK_BATCH_SIZE,
+            )
+        questions = Question.objects.bulk_create(
+            (Question(value=f'Question {index}') for index in range(options['questions'])), batch_size=BULK_BATCH_SIZE
+        )
+        Choice.objects.bulk_create(
+            (
+                Choice(question=question, value=f'Choice {index}')
+                for question in questions
+                for index in range(options['choices'])
+            ),
+            batch_size=BULK_BATCH_SIZE,
+        )
+        update_choice_fields([question.pk for question in questions])
+
+        view, change, delete = get_question_permission_ids(['view_question', 'change_question', 'delete_question'])
+        perms = [view, view, view, change, delete]  # most grants are read access
+        user_grants = [
+            (rng.choice(users).pk, rng.choice(perms), rng.choice(questions).pk) for _ in range(options['user_grants'])
+        ]
+        QuestionUserObjectPermission.objects.bulk_create(
+            (
+                QuestionUserObjectPermission(user_id=user_id, permission_id=perm_id, content_object_id=question_id)
+                for user_id, perm_id, question_id in user_grants
+            ),
+            batch_size=BULK_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        if groups:
+            QuestionGroupObjectPermission.objects.bulk_create(
+                (
+                    QuestionGroupObjectPermission(
+                        group_id=rng.choice(groups).pk, permission_id=rng.choice(perms), content_object_id=q.pk
+                    )
+                    for q in rng.choices(questions, k=options['group_grants'])
+                ),
+                batch_size=BULK_BATCH_SIZE,
+                ignore_conflicts=True,
+            )
+        sync_question_access(user_ids=[user.pk for user in users])
+
+        user_id = Counter(user_id for user_id, _, _ in user_grants).most_common(1)[0][0] if user_grants else users[0].pk
+        user = ExampleUser.objects.get(pk=user_id)
+        user.user_permissions.add(view)
+        question_ids = list(Question.objects.with_permission(user, 'view_question').values_list('id', flat=True))
+        return user, question_ids
+
+    def measure(self, client: Client, endpoint: Endpoint, rng: random.Random, requests: int) -> dict[str, Any]:
+        client.get(endpoint(rng))  # warm up
+        latencies: list[float] = []
+        queries: list[int] = []
+        for _ in range(requests):
+            url = endpoint(rng)
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                response = client.get(url, HTTP_ACCEPT='application/json')
+                latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f"GET {url} responded with {response.status_code}")
+            queries.append(len(context.captured_queries))
+        percentiles = statistics.quantiles(latencies, n=100)
+        return {
+            'requests': requests,
+            'mean_ms': round(statistics.fmean(latencies), 2),
+            'p50_ms': round(percentiles[49], 2),
+            'p95_ms': round(percentiles[94], 2),
+            'p99_ms': round(percentiles[98], 2),
+            'queries_per_request': round(statistics.fmean(queries), 2),
+            'max_queries': max(queries),
+        }
+
+    def print_report(self, report: dict[str, Any], baseline: dict[str, Any] | None) -> None:
+        self.stdout.write(
+            ' '.join(f'{name}={value}' for name, value in report['options'].items())
+            + f" permitted_questions={report['permitted_questions']} seed={report['seed_seconds']}s"
+        )
+        for name, result in report['endpoints'].items():
+            line = (
+                f"{name:<24} p50={result['p50_ms']:>8.2f} ms p95={result['p95_ms']:>8.2f} ms "
+                f"p99={result['p99_ms']:>8.2f} ms queries={result['queries_per_request']:>6.2f}"
+            )
+            if baseline and (previous := baseline['endpoints'].get(name)):
+                p95_change = (result['p95_ms'] / previous['p95_ms'] - 1) * 100 if previous['p95_ms'] else 0
+                queries_change = result['queries_per_request'] - previous['queries_per_request']
+                line += f" | p95 {p95_change:+.1f}% queries {queries_change:+.2f}"
+            self.stdout.write(line)
@@ -0,0 +1,86 @@
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+from users.models import ExampleUser
+
+from questions.access import get_question_access, sync_question_access
+from questions.denormalized import update_choice_fields
+from questions.models import Choice, Question, QuestionUserObjectPermission
+from questions.registry import get_question_permission_ids
+from questions.serializers import QuestionSerializer, get_nested_prefetches, represent_questions
+
+
+class Command(BaseCommand):
+    help = "Compare QuestionSerializer with the fast `.values()` read path on generated questions"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--questions', type=int, default=10_000)
+        parser.add_argument('--choices', type=int, default=4, help="Choices per question")
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args: Any, questions: int, choices: int, repeat: int, **options: Any) -> None:
+        # everything is generated in a transaction which is rolled back at the end
+        with transaction.atomic():
+            user = self.seed(questions, choices)
+            queryset = Question.objects.with_permission(user, 'view_question').order_by('id')
+
+            def serializer_path() -> bytes:
+                # same work as QuestionViewSet does for a page: prefetch choices and object permissions
+                request = self.make_request(user)
+                instances = list(queryset.prefetch_related(*get_nested_prefetches(QuestionSerializer())))
+                get_question_access(request).prefetch(instances)
+                data = QuestionSerializer(instances, many=True, context={'request': request}).data
+                return bytes(JSONRenderer().render(data))
+
+            def fast_path() -> bytes:
+                data = represent_questions(
+                    list(queryset.values('id', 'value', 'choice_count')), self.make_request(user)
+                )
+                return bytes(JSONRenderer().render(data))
+
+            serializer_output, serializer_time = self.measure(serializer_path, repeat)
+            fast_output, fast_time = self.measure(fast_path, repeat)
+            transaction.set_rollback(True)
+
+        if serializer_output != fast_output:
+            raise CommandError("Fast read path output differs from QuestionSerializer output")
+        self.stdout.write(f"questions={questions} choices_per_question={choices} bytes={len(fast_output)}")
+        self.stdout.write(f"serializer: {serializer_time * 1000:.1f} ms")
+        self.stdout.write(f"fast path:  {fast_time * 1000:.1f} ms ({serializer_time / fast_time:.1f}x)")
+
+    def seed(self, questions: int, choices: int) -> ExampleUser:
+        user = ExampleUser.objects.create_user(username=f'benchmark_{time.monotonic_ns()}')
+        created = Question.objects.bulk_create(Question(value=f'Question {index}') for index in range(questions))
+        Choice.objects.bulk_create(
+            (Choice(question=question, value=f'Choice {index}') for question in created for index in range(choices)),
+            batch_size=5000,
+        )
+        update_choice_fields([question.pk for question in created])
+        [view_perm_id] = get_question_permission_ids(['view_question'])
+        QuestionUserObjectPermission.objects.bulk_create(
+            (QuestionUserObjectPermission(user=user, permission_id=view_perm_id, content_object=q) for q in created),
+            batch_size=5000,
+        )
+        sync_question_access(user_ids=[user.pk])
+        return user
+
+    def make_request(self, user: ExampleUser) -> Request:
+        http_request = APIRequestFactory().get('/api/questions/')
+        force_authenticate(http_request, user)
+        request = Request(http_request)
+        request.user = user
+        return request
+
+    def measure(self, action: Any, repeat: int) -> tuple[bytes, float]:
+        best = float('inf')
+        output = b''
+        for _ in range(repeat):
+            started = time.perf_counter()
+            output = action()
+            best = min(best, time.perf_counter() - started)
+        return output, best
@@ -0,0 +1,142 @@
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from users.models import ExampleUser
+
+from questions.bulk import bulk_create_questions, delete_questions
+from questions.models import Question
+from questions.registry import get_question_permission_ids
+
+
+SERVER_START_TIMEOUT = 30
+
+# name, server command and question list path served by it
+SCENARIOS = [
+    (
+        'gunicorn, sync views',
+        ['gunicorn', 'example.wsgi', '--bind', '127.0.0.1:{port}', '--workers', '{workers}'],
+        '/api/questions/',
+    ),
+    (
+        'uvicorn, async views',
+        ['uvicorn', 'example.asgi:application', '--port', '{port}', '--workers', '{workers}', '--no-access-log'],
+        '/api/async/questions/',
+    ),
+]
+
+
+class Command(BaseCommand):
+    help = "Compare concurrent throughput of question list served by gunicorn (WSGI) and uvicorn (ASGI)"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--questions', type=int, default=1000)
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=50, help="Requests in flight at the same time")
+        parser.add_argument('--workers', type=int, default=2, help="Worker processes of every server")
+        parser.add_argument('--limit', type=int, default=20, help="Page size of requested list")
+
+    def handle(
+        self,
+        *args: Any,
+        questions: int,
+        requests: int,
+        concurrency: int,
+        workers: int,
+        limit: int,
+        **options: Any,
+    ) -> None:
+        # servers run in their own processes, so data is committed and removed at the end
+        user = ExampleUser.objects.create_user(username=f'benchmark_{time.monotonic_ns()}')
+        session = SessionStore()
+        try:
+            user.user_permissions.add(*get_question_permission_ids(['view_question']))
+            items = [
+                {'value': f'Question {index}', 'choices': [{'value': 'Yes'}, {'value': 'No'}]}
+                for index in range(questions)
+            ]
+            bulk_create_questions(user, items)
+            cookie = f'{settings.SESSION_COOKIE_NAME}={self.login(session, user)}'
+            self.stdout.write(f"questions={questions} requests={requests} concurrency={concurrency} workers={workers}")
+            for name, command, path in SCENARIOS:
+                with self.serve(command, workers) as port:
+                    url = f'http://127.0.0.1:{port}{path}?limit={limit}'
+                    self.request(url, cookie)  # warm up
+                    latencies, elapsed = self.drive(url, cookie, requests, concurrency)
+                self.report(name, latencies, elapsed)
+        finally:
+            session.delete()
+            delete_questions(list(Question.objects.filter(access_entries__user=user).values_list('id', flat=True)))
+            user.delete()
+
+    def login(self, session: SessionStore, user: ExampleUser) -> str:
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.save()
+        return str(session.session_key)
+
+    def serve(self, command: list[str], workers: int) -> 'Server':
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        args = [sys.executable, '-m', *(part.format(port=port, workers=workers) for part in command)]
+        return Server(args, port, cwd=str(settings.BASE_DIR))
+
+    def request(self, url: str, cookie: str) -> float:
+        started = time.perf_counter()
+        request = urllib.request.Request(url, headers={'Cookie': cookie, 'Accept': 'application/json'})
+        with urllib.request.urlopen(request) as response:
+            response.read()
+        return time.perf_counter() - started
+
+    def drive(self, url: str, cookie: str, requests: int, concurrency: int) -> tuple[list[float], float]:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            latencies = list(executor.map(lambda _: self.request(url, cookie), range(requests)))
+        return latencies, time.perf_counter() - started
+
+    def report(self, name: str, latencies: list[float], elapsed: float) -> None:
+        percentiles = statistics.quantiles(latencies, n=100)
+        p50, p95, p99 = (percentiles[index] * 1000 for index in (49, 94, 98))
+        self.stdout.write(
+            f"{name}: {len(latencies) / elapsed:.0f} req/s, p50={p50:.1f} ms p95={p95:.1f} ms p99={p99:.1f} ms"
+        )
+
+
+class Server:
+    """Server subprocess which is running while the context is entered, yields its port."""
+
+    def __init__(self, args: list[str], port: int, cwd: str) -> None:
+        self.args = args
+        self.port = port
+        self.cwd = cwd
+        self.process: subprocess.Popen[bytes] | None = None
+
+    def __enter__(self) -> int:
+        self.process = subprocess.Popen(self.args, cwd=self.cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise CommandError(f"Server exited with code {self.process.returncode}: {' '.join(self.args)}")
+            try:
+                with socket.create_connection(('127.0.0.1', self.port), timeout=1):
+                    return self.port
+            except OSError:
+                time.sleep(0.1)
+        self.__exit__()
+        raise CommandError(f"Server didn't start in {SERVER_START_TIMEOUT}s: {' '.join(self.args)}")
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self.process is not None:
+            self.process.terminate()
+            self.process.wait()
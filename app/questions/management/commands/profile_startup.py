@@ -0,0 +1,90 @@
+import json
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+
+# code run by a fresh interpreter to start every kind of worker process, without serving anything
+STARTUP_CODE = {
+    'wsgi': 'import example.wsgi',
+    'celery': 'from example.celery import app; app.loader.import_default_modules()',
+}
+
+PROFILE_SCRIPT = """
+import json, time
+started = time.perf_counter()
+{startup}
+from django.urls import get_resolver
+get_resolver().url_patterns
+phases = {{'startup': time.perf_counter() - started}}
+if {warm_up}:
+    from example.warmup import warm_up
+    phases['warm_up'] = warm_up()
+print(json.dumps(phases))
+"""
+
+IMPORT_TIME_PREFIX = 'import time:'
+
+
+@dataclass
+class ImportTime:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_import_times(output: str) -> list[ImportTime]:
+    """Rows of `python -X importtime` output, nesting of modules is dropped."""
+    times = []
+    for line in output.splitlines():
+        if not line.startswith(IMPORT_TIME_PREFIX):
+            continue
+        self_us, cumulative_us, module = line.removeprefix(IMPORT_TIME_PREFIX).split('|')
+        if not self_us.strip().isdigit():
+            continue  # header
+        times.append(ImportTime(module.strip(), int(self_us), int(cumulative_us)))
+    return times
+
+
+class Command(BaseCommand):
+    help = "Report import time of modules and packages loaded on start of a gunicorn or celery worker process"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--target', choices=sorted(STARTUP_CODE), default='wsgi')
+        parser.add_argument('--limit', type=int, default=20, help="Modules and packages to list")
+        parser.add_argument(
+            '--warm-up', action='store_true', help="Run `example.warmup.warm_up` too, it queries the database"
+        )
+
+    def handle(self, *args: Any, target: str, limit: int, warm_up: bool, **options: Any) -> None:
+        script = PROFILE_SCRIPT.format(startup=STARTUP_CODE[target], warm_up=warm_up)
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', script],
+            cwd=str(settings.BASE_DIR),
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode:
+            raise CommandError(f"Startup failed with code {process.returncode}:\n{process.stderr[-2000:]}")
+        phases: dict[str, float] = json.loads(process.stdout.splitlines()[-1])
+        times = parse_import_times(process.stderr)
+
+        packages: dict[str, int] = defaultdict(int)
+        for row in times:
+            packages[row.module.split('.', 1)[0]] += row.self_us
+        self.stdout.write(
+            ' '.join(f'{phase}={duration * 1000:.1f} ms' for phase, duration in phases.items())
+            + f' imports={sum(row.self_us for row in times) / 1000:.1f} ms modules={len(times)}'
+        )
+
+        self.stdout.write('\nPackages by own import time:')
+        for package, total in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:limit]:
+            self.stdout.write(f'{total / 1000:10.1f} ms  {package}')
+        self.stdout.write('\nModules by own import time (cumulative with imported modules):')
+        for row in sorted(times, key=lambda row: row.self_us, reverse=True)[:limit]:
+            self.stdout.write(f'{row.self_us / 1000:10.1f} ms {row.cumulative_us / 1000:10.1f} ms  {row.module}')
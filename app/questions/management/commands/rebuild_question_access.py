@@ -0,0 +1,59 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from questions.access import compute_question_access, sync_question_access
+from questions.models import Question, QuestionAccessEntry
+
+
+class Command(BaseCommand):
+    help = "Rebuild denormalized QuestionAccessEntry rows from guardian object permissions or check them for drift"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help="Only compare access table with guardian tables and fail if they differ",
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Questions processed per chunk")
+
+    def handle(self, *args: Any, check: bool, chunk_size: int, **options: Any) -> None:
+        question_ids = Question.objects.order_by('id').values_list('id', flat=True)
+        mismatches = 0
+        processed = 0
+        chunk: list[int] = []
+        for question_id in question_ids.iterator(chunk_size=chunk_size):
+            chunk.append(question_id)
+            if len(chunk) == chunk_size:
+                mismatches += self.process_chunk(chunk, check)
+                processed += len(chunk)
+                chunk = []
+        if chunk:
+            mismatches += self.process_chunk(chunk, check)
+            processed += len(chunk)
+
+        if not check:
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt question access for {processed} questions"))
+            return
+        if mismatches:
+            raise CommandError(f"Found {mismatches} mismatched question access entries in {processed} questions")
+        self.stdout.write(self.style.SUCCESS(f"Question access is in sync for {processed} questions"))
+
+    def process_chunk(self, question_ids: list[int], check: bool) -> int:
+        if not check:
+            sync_question_access(question_ids=question_ids)
+            return 0
+        expected = compute_question_access(question_ids=question_ids)
+        actual = {
+            (user_id, question_id): mask
+            for user_id, question_id, mask in QuestionAccessEntry.objects.filter(
+                question_id__in=question_ids
+            ).values_list('user_id', 'question_id', 'perm_bitmask')
+        }
+        mismatched = {key for key in expected.keys() | actual.keys() if expected.get(key) != actual.get(key)}
+        for user_id, question_id in sorted(mismatched):
+            self.stderr.write(
+                f"user={user_id} question={question_id} "
+                f"expected={expected.get((user_id, question_id), 0)} actual={actual.get((user_id, question_id), 0)}"
+            )
+        return len(mismatched)
@@ -0,0 +1,82 @@
+# Generated by Django 5.1.3 on 2026-10-18 11:50
+
+from collections import defaultdict
+from typing import Any
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+QUESTION_PERM_BITS = {
+    'view_question': 1,
+    'change_question': 2,
+    'delete_question': 4,
+    'add_question': 8,
+}
+
+
+def populate_access_entries(apps: Any, schema_editor: Any) -> None:
+    QuestionUserObjectPermission = apps.get_model('questions', 'QuestionUserObjectPermission')
+    QuestionGroupObjectPermission = apps.get_model('questions', 'QuestionGroupObjectPermission')
+    QuestionAccessEntry = apps.get_model('questions', 'QuestionAccessEntry')
+
+    masks: dict[tuple[int, int], int] = defaultdict(int)
+    user_perms = QuestionUserObjectPermission.objects.values_list(
+        'user_id', 'content_object_id', 'permission__codename'
+    )
+    group_perms = QuestionGroupObjectPermission.objects.filter(group__user__isnull=False).values_list(
+        'group__user', 'content_object_id', 'permission__codename'
+    )
+    for perms in (user_perms, group_perms):
+        for user_id, question_id, codename in perms.iterator():
+            masks[(user_id, question_id)] |= QUESTION_PERM_BITS.get(codename, 0)
+    QuestionAccessEntry.objects.bulk_create(
+        (
+            QuestionAccessEntry(user_id=user_id, question_id=question_id, perm_bitmask=mask)
+            for (user_id, question_id), mask in masks.items()
+            if mask
+        ),
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('questions', '0003_alter_choice_question'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionAccessEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('perm_bitmask', models.PositiveSmallIntegerField(default=0)),
+                (
+                    'question',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='access_entries',
+                        to='questions.question',
+                    ),
+                ),
+                (
+                    'user',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL
+                    ),
+                ),
+            ],
+            options={
+                'constraints': [
+                    models.UniqueConstraint(
+                        fields=('user', 'question'),
+                        include=('perm_bitmask',),
+                        name='questions_access_user_question_uniq',
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_access_entries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.1.3 on 2026-10-18 12:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # indexes are built without locking writes to the tables, which can't be done in a transaction
+    atomic = False
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('questions', '0005_question_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='choice',
+            index=models.Index(fields=['question', 'id'], include=('value',), name='questions_choice_question_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='questiongroupobjectpermission',
+            index=models.Index(
+                fields=['group', 'content_object'], include=('permission',), name='questions_grpperm_grp_obj_idx'
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='questionuserobjectpermission',
+            index=models.Index(
+                fields=['user', 'content_object'], include=('permission',), name='questions_usrperm_usr_obj_idx'
+            ),
+        ),
+        # single column indexes are prefixes of the indexes above
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='choice',
+                    name='question',
+                    field=models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='choices',
+                        to='questions.question',
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name='questionaccessentry',
+                    name='user',
+                    field=models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='+',
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    'DROP INDEX CONCURRENTLY IF EXISTS "questions_choice_question_id_2d0da4e9"',
+                    'CREATE INDEX CONCURRENTLY IF NOT EXISTS "questions_choice_question_id_2d0da4e9" '
+                    'ON "questions_choice" ("question_id")',
+                ),
+                migrations.RunSQL(
+                    'DROP INDEX CONCURRENTLY IF EXISTS "questions_questionaccessentry_user_id_021ed235"',
+                    'CREATE INDEX CONCURRENTLY IF NOT EXISTS "questions_questionaccessentry_user_id_021ed235" '
+                    'ON "questions_questionaccessentry" ("user_id")',
+                ),
+            ],
+        ),
+    ]
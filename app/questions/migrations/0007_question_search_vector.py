@@ -0,0 +1,64 @@
+# Generated by Django 5.1.3 on 2026-10-18 12:35
+
+from typing import Any
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import DatabaseError, migrations
+
+
+def create_trigram_index(apps: Any, schema_editor: Any) -> None:
+    # trigram matching is optional, search falls back to full-text only where pg_trgm isn't available
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+        try:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        except DatabaseError:
+            return
+    schema_editor.execute(
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS "questions_question_value_trgm_idx" '
+        'ON "questions_question" USING gin ("value" gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps: Any, schema_editor: Any) -> None:
+    schema_editor.execute('DROP INDEX CONCURRENTLY IF EXISTS "questions_question_value_trgm_idx"')
+
+
+class Migration(migrations.Migration):
+    # indexes are built without locking writes to the table, which can't be done in a transaction
+    atomic = False
+
+    dependencies = [
+        ('questions', '0006_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # same document as `questions.search.get_search_vector`
+        migrations.RunSQL(
+            """
+            UPDATE "questions_question" SET "search_vector" =
+                setweight(to_tsvector('english'::regconfig, COALESCE("value", '')), 'A')
+                || setweight(to_tsvector('english'::regconfig, COALESCE((
+                    SELECT string_agg("value", ' ') FROM "questions_choice"
+                    WHERE "questions_choice"."question_id" = "questions_question"."id"
+                ), '')), 'B')
+            """,
+            migrations.RunSQL.noop,
+        ),
+        AddIndexConcurrently(
+            model_name='question',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['search_vector'], name='questions_question_search_idx'
+            ),
+        ),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.3 on 2026-10-18 12:55
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # index is built without locking writes to the table, which can't be done in a transaction
+    atomic = False
+
+    dependencies = [
+        ('questions', '0007_question_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='choice_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(
+            """
+            UPDATE "questions_question" SET "choice_count" = "counts"."count"
+            FROM (
+                SELECT "question_id", COUNT(*) AS "count" FROM "questions_choice" GROUP BY "question_id"
+            ) AS "counts"
+            WHERE "counts"."question_id" = "questions_question"."id"
+            """,
+            migrations.RunSQL.noop,
+        ),
+        AddIndexConcurrently(
+            model_name='question',
+            index=models.Index(fields=['choice_count', 'id'], name='questions_question_choices_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.3 on 2026-10-18 13:12
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('questions', '0008_question_choice_count'),
+        ('users', '0002_alter_exampleuser_groups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AllowedQuestions',
+            fields=[
+                (
+                    'user',
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name='+',
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    'question_ids',
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.BigIntegerField(), default=list, size=None
+                    ),
+                ),
+                ('question_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
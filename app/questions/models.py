@@ -1,10 +1,15 @@
 import logging
-from typing import TypeVar, cast
+from collections.abc import Collection, Iterable
+from typing import Any, TypeVar
 
 from django.contrib.auth.models import AnonymousUser
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from guardian.managers import GroupObjectPermissionManager, UserObjectPermissionManager
 from guardian.models import GroupObjectPermissionBase, UserObjectPermissionBase
-from guardian.shortcuts import get_objects_for_user
+from guardian.utils import get_anonymous_user
 from users.models import ExampleUser
 
 
@@ -24,42 +29,181 @@ We assyme that Choice permissions is mirrored from Question and should be automa
 """
 
 
+QUESTION_PERM_BITS = {
+    'view_question': 1,
+    'change_question': 2,
+    'delete_question': 4,
+    'add_question': 8,
+}
+"""Bits of `QuestionAccessEntry.perm_bitmask` for every Question permission codename."""
+
+
+def get_perm_bit(perm_code_name: str) -> int:
+    codename = perm_code_name.split('.', 1)[-1]
+    try:
+        return QUESTION_PERM_BITS[codename]
+    except KeyError:
+        raise ValueError(f"Unknown question permission '{perm_code_name}'") from None
+
+
 class QuestionManager(models.Manager["Question"]):
     def with_permission(self, user: ExampleUser | AnonymousUser, perm_code_name: str) -> models.QuerySet["Question"]:
-        queryset = cast(
-            models.QuerySet[Question],
-            get_objects_for_user(user, perm_code_name, klass=Question, accept_global_perms=False),
+        bit = get_perm_bit(perm_code_name)
+        if user.is_superuser:
+            return self.all()
+        if user.is_anonymous:
+            user = get_anonymous_user()
+        # single indexed lookup on (user, question) instead of guardian content type/permission joins
+        entries = (
+            QuestionAccessEntry.objects.filter(user_id=user.pk)
+            .alias(granted=models.F('perm_bitmask').bitand(bit))
+            .filter(granted=bit)
+            .values('question_id')
         )
-        return queryset
+        return self.filter(id__in=entries)
 
 
 class Question(models.Model):  # type: ignore[django-manager-missing]
     objects: QuestionManager = QuestionManager()
 
     value = models.TextField(max_length=200)
+    # touched by every question and choice write, used as Last-Modified/ETag source for conditional GET
+    updated_at = models.DateTimeField(auto_now=True)
+    # value and choices text, maintained by `questions.search.update_search_vectors`
+    search_vector = SearchVectorField(null=True, editable=False)
+    # maintained by `questions.denormalized.update_choice_fields`, lists are ordered and filtered by it
+    choice_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='questions_question_search_idx'),
+            models.Index(fields=['choice_count', 'id'], name='questions_question_choices_idx'),
+        ]
 
 
 class QuestionChoiceManager(models.Manager["Choice"]):
     def with_question_permission(
         self, user: ExampleUser | AnonymousUser, perm_code_name: str
     ) -> models.QuerySet["Choice"]:
-        questions_queryset = cast(
-            models.QuerySet[Question],
-            get_objects_for_user(user, perm_code_name, klass=Question, accept_global_perms=False),
-        )
-        return self.filter(question__in=questions_queryset)
+        if user.is_superuser:
+            return self.all()
+        return self.filter(question__in=Question.objects.with_permission(user, perm_code_name))
 
 
 class Choice(models.Model):
     objects: QuestionChoiceManager = QuestionChoiceManager()
 
-    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name="choices")
+    # lookups by question are served by `questions_choice_question_idx`
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name="choices", db_index=False)
     value = models.TextField(max_length=200)
 
+    class Meta:
+        indexes = [
+            # choices of a question ordered by id are read with an index only scan
+            models.Index(fields=['question', 'id'], include=['value'], name='questions_choice_question_idx'),
+        ]
+
+
+class QuestionUserObjectPermissionManager(UserObjectPermissionManager):  # type: ignore[misc]
+    """
+    Guardian bulk assigns (`assign_perm` with a queryset or a list of users) use `bulk_create`, which sends no
+    `post_save`, so access of the created rows is synced here at once.
+    """
+
+    def bulk_assign_perm(self, perm: Any, user_or_group: Any, queryset: Any) -> list['QuestionUserObjectPermission']:
+        assigned: list[QuestionUserObjectPermission] = super().bulk_assign_perm(perm, user_or_group, queryset)
+        sync_object_permissions_access(assigned, user_ids=[user_or_group.pk])
+        return assigned
+
+    def assign_perm_to_many(self, perm: Any, users_or_groups: Any, obj: Any) -> list['QuestionUserObjectPermission']:
+        assigned: list[QuestionUserObjectPermission] = super().assign_perm_to_many(perm, users_or_groups, obj)
+        sync_object_permissions_access(assigned, user_ids=[permission.user_id for permission in assigned])
+        return assigned
+
+
+class QuestionGroupObjectPermissionManager(GroupObjectPermissionManager):  # type: ignore[misc]
+    """Group counterpart of `QuestionUserObjectPermissionManager`, access of all members is synced."""
+
+    def bulk_assign_perm(self, perm: Any, user_or_group: Any, queryset: Any) -> list['QuestionGroupObjectPermission']:
+        assigned: list[QuestionGroupObjectPermission] = super().bulk_assign_perm(perm, user_or_group, queryset)
+        sync_object_permissions_access(assigned)
+        return assigned
+
+    def assign_perm_to_many(self, perm: Any, users_or_groups: Any, obj: Any) -> list['QuestionGroupObjectPermission']:
+        assigned: list[QuestionGroupObjectPermission] = super().assign_perm_to_many(perm, users_or_groups, obj)
+        sync_object_permissions_access(assigned)
+        return assigned
+
+
+def sync_object_permissions_access(
+    permissions: Iterable['QuestionUserObjectPermission | QuestionGroupObjectPermission'],
+    user_ids: Collection[int] | None = None,
+) -> None:
+    # access module imports the models
+    from .access import sync_question_access
+
+    if question_ids := {permission.content_object_id for permission in permissions}:
+        sync_question_access(user_ids=user_ids, question_ids=question_ids)
+
 
 class QuestionUserObjectPermission(UserObjectPermissionBase):  # type: ignore[misc]
+    objects = QuestionUserObjectPermissionManager()
     content_object: 'models.ForeignKey[Question]' = models.ForeignKey(Question, on_delete=models.CASCADE)
 
+    class Meta(UserObjectPermissionBase.Meta):  # type: ignore[misc]
+        indexes = [
+            # access prefetch and sync look up permissions of a user on a set of questions,
+            # (user, permission) lookups are served by the unique constraint
+            models.Index(
+                fields=['user', 'content_object'], include=['permission'], name='questions_usrperm_usr_obj_idx'
+            ),
+        ]
+
 
 class QuestionGroupObjectPermission(GroupObjectPermissionBase):  # type: ignore[misc]
+    objects = QuestionGroupObjectPermissionManager()
     content_object: 'models.ForeignKey[Question]' = models.ForeignKey(Question, on_delete=models.CASCADE)
+
+    class Meta(GroupObjectPermissionBase.Meta):  # type: ignore[misc]
+        indexes = [
+            models.Index(
+                fields=['group', 'content_object'], include=['permission'], name='questions_grpperm_grp_obj_idx'
+            ),
+        ]
+
+
+class QuestionAccessEntry(models.Model):
+    """
+    Denormalized user access to a question.
+
+    Object permissions granted to the user directly or through groups are folded into `perm_bitmask`
+    (see `QUESTION_PERM_BITS`). Rows are kept in sync with guardian tables by `questions.signals`.
+    """
+
+    # lookups by user are served by the unique constraint
+    user = models.ForeignKey(ExampleUser, on_delete=models.CASCADE, related_name='+', db_index=False)
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='access_entries')
+    perm_bitmask = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'question'],
+                include=['perm_bitmask'],
+                name='questions_access_user_question_uniq',
+            ),
+        ]
+
+
+class AllowedQuestions(models.Model):
+    """
+    Snapshot of ids of questions a user can view, sorted ascending.
+
+    Built from `QuestionAccessEntry` on first use and refreshed by `questions.snapshots` whenever access of the user
+    is synced, so pages of permitted questions are sliced from the array and counted without reading access rows.
+    """
+
+    user = models.OneToOneField(ExampleUser, on_delete=models.CASCADE, primary_key=True, related_name='+')
+    question_ids = ArrayField(models.BigIntegerField(), default=list)
+    # length of `question_ids`, counted without detoasting the array
+    question_count = models.PositiveIntegerField(default=0)
@@ -0,0 +1,81 @@
+from typing import Any, TypeVar
+
+from django.db.models import Model, QuerySet
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination, CursorPagination, LimitOffsetPagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+_MT = TypeVar("_MT", bound=Model)
+
+
+CURSOR_ORDERINGS = (('id',), ('-id',))
+"""Orderings a cursor can page by, a cursor on a non-unique ordering would skip or repeat rows across pages."""
+
+
+class IdCursorPagination(CursorPagination):
+    """Keyset pagination by `id`, pages don't run `COUNT(*)` and don't rescan skipped rows."""
+
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    def get_ordering(self, request: Request, queryset: QuerySet[Any], view: APIView) -> tuple[str, ...]:
+        """Ordering of `?ordering=` or `id`, other orderings and relevance ordered searches are rejected."""
+        for backend in getattr(view, 'filter_backends', []):
+            search_param = getattr(backend, 'search_param', None)
+            if search_param and request.query_params.get(search_param, '').strip():
+                raise ValidationError(
+                    {search_param: ["Results ordered by relevance can't be paginated with a cursor."]}
+                )
+        ordering = tuple(super().get_ordering(request, queryset, view))
+        if ordering not in CURSOR_ORDERINGS:
+            raise ValidationError({'ordering': ['Cursor pagination supports only id and -id ordering.']})
+        return ordering
+
+
+class OptionalCursorPagination(BasePagination):
+    """
+    Limit/offset pagination with opt-in cursor mode.
+
+    Cursor mode is enabled with `?pagination=cursor`, cursor links keep that query parameter.
+    """
+
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    default_pagination_class: type[BasePagination] = LimitOffsetPagination
+    cursor_pagination_class: type[BasePagination] = IdCursorPagination
+
+    def __init__(self) -> None:
+        self.delegate: BasePagination = self.default_pagination_class()
+
+    @property
+    def display_page_controls(self) -> bool:  # type: ignore[override]
+        return self.delegate.display_page_controls
+
+    def is_cursor_mode(self, request: Request) -> bool:
+        return request.query_params.get(self.mode_query_param) == self.cursor_mode
+
+    def paginate_queryset(
+        self, queryset: QuerySet[_MT], request: Request, view: APIView | None = None
+    ) -> list[_MT] | None:
+        if self.is_cursor_mode(request):
+            self.delegate = self.cursor_pagination_class()
+        return self.delegate.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data: Any) -> Response:
+        return self.delegate.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema: dict[str, Any]) -> dict[str, Any]:
+        return self.delegate.get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view: APIView) -> list[Any]:
+        return self.delegate.get_schema_operation_parameters(view)
+
+    def get_results(self, data: dict[str, Any]) -> Any:
+        return self.delegate.get_results(data)
+
+    def to_html(self) -> str:
+        return self.delegate.to_html()
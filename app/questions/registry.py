@@ -0,0 +1,66 @@
+"""
+Process-wide registry of Question permission ids.
+
+Permission rows of Question are loaded once per process with one query (`example.warmup.warm_up` preloads them before
+workers fork), so grants, object permission checks and access syncs work with permission ids and never look up
+content types or permissions by codename. Flushes and migrations may recreate permission rows under new ids: the
+registry is cleared on `post_migrate` and reloaded when it meets a codename or an id it doesn't know.
+"""
+
+from collections.abc import Collection, Iterable, Mapping
+
+from django.contrib.auth.models import Permission
+from example.routers import primary_reads
+
+from .models import Question
+
+
+class QuestionPermissionRegistry:
+    """Question permission ids by codename and codenames by id."""
+
+    def __init__(self, ids: Mapping[str, int]) -> None:
+        self.ids = dict(ids)
+        self.codenames = {pk: codename for codename, pk in self.ids.items()}
+
+
+# replaced as a whole, so threads see either the old or the new registry and a concurrent load is only repeated
+_registry: QuestionPermissionRegistry | None = None
+
+
+def load_question_permissions() -> QuestionPermissionRegistry:
+    """Load Question permission rows into a new registry, content type is joined by app label and model."""
+    global _registry
+    with primary_reads():
+        rows = Permission.objects.filter(
+            content_type__app_label=Question._meta.app_label, content_type__model=Question._meta.model_name
+        ).values_list('codename', 'id')
+        _registry = QuestionPermissionRegistry(dict(rows))
+    return _registry
+
+
+def get_question_permission_registry() -> QuestionPermissionRegistry:
+    return _registry if _registry is not None else load_question_permissions()
+
+
+def clear_question_permissions() -> None:
+    global _registry
+    _registry = None
+
+
+def get_question_permission_ids(perms: Iterable[str]) -> list[int]:
+    """Resolve Question permission codenames (with or without app label) to permission ids."""
+    codenames = [perm.split('.', 1)[-1] for perm in perms]
+    registry = get_question_permission_registry()
+    if not registry.ids.keys() >= set(codenames):
+        registry = load_question_permissions()
+        if unknown := set(codenames) - registry.ids.keys():
+            raise ValueError(f"Unknown question permissions {sorted(unknown)}")
+    return [registry.ids[codename] for codename in codenames]
+
+
+def get_question_permission_codenames(permission_ids: Collection[int]) -> Mapping[int, str]:
+    """Codenames of Question permissions by id, the registry is reloaded once if any of `permission_ids` is unknown."""
+    registry = get_question_permission_registry()
+    if not registry.codenames.keys() >= set(permission_ids):
+        registry = load_question_permissions()
+    return registry.codenames
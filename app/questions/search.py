@@ -0,0 +1,79 @@
+from collections.abc import Collection
+from functools import cache
+from typing import Any
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db import connections
+from django.db.models import F, OuterRef, Q, QuerySet, Subquery, TextField, Value
+from django.db.models.expressions import CombinedExpression
+from django.db.models.functions import Coalesce
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.request import Request
+from rest_framework.views import APIView
+
+from .models import Choice, Question
+
+
+SEARCH_CONFIG = 'english'
+"""Text search configuration of `Question.search_vector` and search queries."""
+
+SEARCH_MAX_LENGTH = 200
+"""Longer search terms are truncated, trigram matching cost grows with their length."""
+
+
+def get_search_vector() -> CombinedExpression:
+    """Weighted document of a question: its value (A) and text of all its choices (B)."""
+    choice_text = Subquery(
+        Choice.objects.filter(question=OuterRef('pk'))
+        .order_by()
+        .values('question')
+        .annotate(text=StringAgg('value', ' '))
+        .values('text')
+    )
+    return SearchVector('value', weight='A', config=SEARCH_CONFIG) + SearchVector(
+        Coalesce(choice_text, Value(''), output_field=TextField()), weight='B', config=SEARCH_CONFIG
+    )
+
+
+def update_search_vectors(question_ids: Collection[int]) -> None:
+    """Recompute `Question.search_vector` of questions in one statement, after question or choices change."""
+    if question_ids:
+        Question.objects.filter(pk__in=question_ids).update(search_vector=get_search_vector())
+
+
+@cache
+def has_trigram_support(alias: str) -> bool:
+    """Whether `pg_trgm` is installed, the trigram index is created by migrations only when it is available."""
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def search_questions(queryset: QuerySet[Question], terms: str) -> QuerySet[Question]:
+    """
+    Filter questions by full-text match of their value and choices, ordered by relevance.
+
+    With `pg_trgm` installed question values similar to the terms match too, so prefixes and typos are found.
+    Both conditions are served by GIN indexes and are combined with filters of the queryset in one query.
+    """
+    terms = terms.strip()[:SEARCH_MAX_LENGTH]
+    query = SearchQuery(terms, search_type='websearch', config=SEARCH_CONFIG)
+    condition = Q(search_vector=query)
+    rank: Any = SearchRank(F('search_vector'), query)
+    if has_trigram_support(queryset.db):
+        condition |= Q(value__trigram_word_similar=terms)
+        rank += TrigramWordSimilarity(terms, 'value')
+    return queryset.filter(condition).annotate(rank=rank).order_by('-rank', 'id')
+
+
+class QuestionSearchFilter(BaseFilterBackend):
+    """Full-text search of questions with `?search=`, results are ordered by relevance."""
+
+    search_param = 'search'
+
+    def filter_queryset(self, request: Request, queryset: QuerySet[Any], view: APIView) -> QuerySet[Any]:
+        terms = request.query_params.get(self.search_param, '')
+        if not terms.strip():
+            return queryset
+        return search_questions(queryset, terms)
@@ -1,12 +1,39 @@
-from typing import Any
+from collections.abc import Mapping, Sequence
+from typing import Any, TypeVar, cast
 
-from rest_framework import serializers
+from django.db.models import Model, Prefetch
+from example.metrics import measure_serialization
+from rest_framework import permissions, serializers
+from rest_framework.fields import Field
 
-from .models import Choice, Question
+from .access import get_question_access
+from .models import QUESTION_PERM_BITS, Choice, Question
 
 
-class ChoiceSerializer(serializers.ModelSerializer[Choice]):
+M = TypeVar('M', bound=Model)
+
+
+class MeasuredListSerializer(serializers.ListSerializer[Any]):
+    @property
+    def data(self) -> Any:
+        with measure_serialization():
+            return super().data
+
+
+class MeasuredSerializer(serializers.ModelSerializer[M]):
+    """Model serializer whose top level `.data` is reported as serialization time of the request."""
+
     class Meta:
+        list_serializer_class = MeasuredListSerializer
+
+    @property
+    def data(self) -> Any:
+        with measure_serialization():
+            return super().data
+
+
+class ChoiceSerializer(MeasuredSerializer[Choice]):
+    class Meta(MeasuredSerializer.Meta):
         model = Choice
         fields = ['id', 'question', 'value']
         read_only_fields = ['question']  # Prevent updating question field after creation
@@ -23,10 +50,132 @@ class ChoiceSerializer(serializers.ModelSerializer[Choice]):
         return data
 
 
-class QuestionSerializer(serializers.ModelSerializer[Question]):
+class QuestionSerializer(MeasuredSerializer[Question]):
     choices = ChoiceSerializer(many=True, read_only=True)
+    can_change = serializers.SerializerMethodField()
+    can_delete = serializers.SerializerMethodField()
 
-    class Meta:
+    class Meta(MeasuredSerializer.Meta):
         model = Question
-        read_only_fields = ['id', 'choices']
-        fields = ['id', 'value', 'choices']
+        read_only_fields = ['id', 'choice_count', 'choices', 'can_change', 'can_delete']
+        fields = ['id', 'value', 'choice_count', 'choices', 'can_change', 'can_delete']
+
+    def get_fields(self) -> dict[str, Field[Any, Any, Any, Any]]:
+        fields = super().get_fields()
+        requested = get_requested_fields(self.context.get('request'))
+        if requested is None:
+            return fields
+        return {name: field for name, field in fields.items() if name in requested}
+
+    def get_can_change(self, question: Question) -> bool:
+        return self.has_question_perm('questions.change_question', question)
+
+    def get_can_delete(self, question: Question) -> bool:
+        return self.has_question_perm('questions.delete_question', question)
+
+    def has_question_perm(self, perm: str, question: Question) -> bool:
+        # permissions are resolved through request access, so prefetched page perms are reused
+        request = self.context.get('request')
+        if request is None:
+            return False
+        return get_question_access(request).has_perm(perm, question)
+
+
+def represent_questions(rows: Sequence[Mapping[str, Any]], request: Any) -> list[dict[str, Any]]:
+    """
+    Fast read-only representation of `QuestionSerializer` for `.values('id', 'value', 'choice_count')` rows.
+
+    Choices are grouped under their questions from one `.values()` query and capability flags are resolved
+    from prefetched object permissions, output is the same as `QuestionSerializer(many=True).data`.
+    """
+    with measure_serialization():
+        return _represent_questions(rows, request)
+
+
+def _represent_questions(rows: Sequence[Mapping[str, Any]], request: Any) -> list[dict[str, Any]]:
+    choices: dict[int, list[dict[str, Any]]] = {row['id']: [] for row in rows}
+    for choice in (
+        Choice.objects.filter(question_id__in=choices).order_by('id').values_list('id', 'question_id', 'value')
+    ):
+        choices[choice[1]].append({'id': choice[0], 'question': choice[1], 'value': choice[2]})
+
+    access = get_question_access(request)
+    questions = [Question(id=row['id']) for row in rows]
+    access.prefetch(questions)
+    return [
+        {
+            'id': row['id'],
+            'value': row['value'],
+            'choice_count': row['choice_count'],
+            'choices': choices[row['id']],
+            'can_change': access.has_perm('questions.change_question', question),
+            'can_delete': access.has_perm('questions.delete_question', question),
+        }
+        for row, question in zip(rows, questions, strict=True)
+    ]
+
+
+async def arepresent_questions(
+    rows: Sequence[Mapping[str, Any]], perm_masks: Mapping[int, int]
+) -> list[dict[str, Any]]:
+    """
+    Async `represent_questions` for ASGI views.
+
+    Capability flags come from `QuestionAccessEntry.perm_bitmask` of the user instead of guardian checker,
+    which can't be used from async code.
+    """
+    with measure_serialization():
+        return await _arepresent_questions(rows, perm_masks)
+
+
+async def _arepresent_questions(
+    rows: Sequence[Mapping[str, Any]], perm_masks: Mapping[int, int]
+) -> list[dict[str, Any]]:
+    choices: dict[int, list[dict[str, Any]]] = {row['id']: [] for row in rows}
+    async for choice_id, question_id, value in (
+        Choice.objects.filter(question_id__in=choices).order_by('id').values_list('id', 'question_id', 'value')
+    ):
+        choices[question_id].append({'id': choice_id, 'question': question_id, 'value': value})
+
+    change_bit, delete_bit = QUESTION_PERM_BITS['change_question'], QUESTION_PERM_BITS['delete_question']
+    return [
+        {
+            'id': row['id'],
+            'value': row['value'],
+            'choice_count': row['choice_count'],
+            'choices': choices[row['id']],
+            'can_change': bool(perm_masks.get(row['id'], 0) & change_bit),
+            'can_delete': bool(perm_masks.get(row['id'], 0) & delete_bit),
+        }
+        for row in rows
+    ]
+
+
+def get_requested_fields(request: Any) -> set[str] | None:
+    """
+    Field names requested with `?fields=id,value`, nested fields are added with `?expand=choices`.
+
+    Returns `None` when all fields should be serialized.
+    """
+    if request is None or request.method not in permissions.SAFE_METHODS:
+        return None
+    fields = request.query_params.get('fields')
+    if not fields:
+        return None
+    expand = request.query_params.get('expand', '')
+    return {name.strip() for name in f'{fields},{expand}'.split(',') if name.strip()}
+
+
+def get_nested_prefetches(serializer: serializers.BaseSerializer[Any]) -> list[Prefetch]:
+    """Plan ordered prefetches for nested `many=True` model serializers declared on `serializer`."""
+    prefetches: list[Prefetch] = []
+    if not isinstance(serializer, serializers.Serializer):
+        return prefetches
+    for field in serializer.fields.values():
+        if not isinstance(field, serializers.ListSerializer):
+            continue
+        if not isinstance(field.child, serializers.ModelSerializer):
+            continue
+        model = cast(type[Model], field.child.Meta.model)
+        prefetches.append(Prefetch(cast(str, field.source), queryset=model._default_manager.order_by('pk')))
+    return prefetches
@@ -0,0 +1,175 @@
+from typing import Any, cast
+
+from django.contrib.auth.models import Group, Permission
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from users.models import ExampleUser
+
+from .access import sync_question_access
+from .cache import bump_question_versions, bump_user_perms_versions
+from .denormalized import get_choice_count
+from .models import Choice, Question, QuestionGroupObjectPermission, QuestionUserObjectPermission
+from .registry import clear_question_permissions
+from .search import get_search_vector, update_search_vectors
+from .snapshots import remove_from_allowed_snapshots
+
+
+CLEARED_USERS_ATTRIBUTE = '_cleared_user_ids'
+CLEARED_GROUPS_ATTRIBUTE = '_cleared_group_ids'
+TOUCHED_QUESTIONS_ATTRIBUTE = '_touched_question_ids'
+
+
+@receiver(post_migrate)
+def permissions_migrated(sender: Any, **kwargs: Any) -> None:
+    # migrations and flushes may recreate permission rows, content types are cleared by Django itself
+    clear_question_permissions()
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_changed(sender: Any, instance: Question, origin: Any = None, **kwargs: Any) -> None:
+    if isinstance(origin, QuerySet):
+        return  # queryset deletes go through `questions.bulk.delete_questions`, which bumps all at once
+    bump_question_versions([instance.pk])
+
+
+@receiver(pre_delete, sender=Question)
+def question_deleted(sender: Any, instance: Question, origin: Any = None, **kwargs: Any) -> None:
+    if isinstance(origin, QuerySet):
+        return
+    # access entries of the question are still there to find snapshots which list it
+    remove_from_allowed_snapshots([instance.pk])
+
+
+@receiver(post_save, sender=Question)
+def question_saved(sender: Any, instance: Question, update_fields: Any = None, **kwargs: Any) -> None:
+    if update_fields is None or 'value' in update_fields:
+        update_search_vectors([instance.pk])
+
+
+@receiver(post_save, sender=Choice)
+@receiver(post_delete, sender=Choice)
+def choice_changed(sender: Any, instance: Choice, origin: Any = None, **kwargs: Any) -> None:
+    if is_question_deletion(origin):
+        return
+    bump_question_versions([instance.question_id])
+    touch_question(instance.question_id, origin)
+
+
+def touch_question(question_id: int, origin: Any) -> None:
+    # queryset deletes send a signal per choice, question of them is updated once
+    touched: set[int] | None = getattr(origin, TOUCHED_QUESTIONS_ATTRIBUTE, None) if origin is not None else None
+    if touched is not None and question_id in touched:
+        return
+    Question.objects.filter(pk=question_id).update(
+        updated_at=timezone.now(), choice_count=get_choice_count(), search_vector=get_search_vector()
+    )
+    if origin is not None:
+        setattr(origin, TOUCHED_QUESTIONS_ATTRIBUTE, (touched or set()) | {question_id})
+
+
+def is_question_deletion(origin: Any) -> bool:
+    # access entries of deleted questions are removed by cascade, no need to sync them row by row
+    if isinstance(origin, QuerySet):
+        return origin.model is Question
+    return isinstance(origin, Question)
+
+
+@receiver(post_save, sender=QuestionUserObjectPermission)
+@receiver(post_delete, sender=QuestionUserObjectPermission)
+def user_object_permission_changed(
+    sender: Any, instance: QuestionUserObjectPermission, origin: Any = None, **kwargs: Any
+) -> None:
+    if is_question_deletion(origin):
+        return
+    sync_question_access(user_ids=[instance.user_id], question_ids=[instance.content_object_id])
+
+
+@receiver(post_save, sender=QuestionGroupObjectPermission)
+@receiver(post_delete, sender=QuestionGroupObjectPermission)
+def group_object_permission_changed(
+    sender: Any, instance: QuestionGroupObjectPermission, origin: Any = None, **kwargs: Any
+) -> None:
+    if is_question_deletion(origin):
+        return
+    sync_question_access(question_ids=[instance.content_object_id])
+
+
+@receiver(m2m_changed, sender=ExampleUser.groups.through)
+def user_groups_changed(
+    sender: Any,
+    instance: ExampleUser | Group,
+    action: str,
+    reverse: bool,
+    pk_set: set[int] | None,
+    **kwargs: Any,
+) -> None:
+    if not reverse:
+        # user.groups.add(...)/remove(...)/clear()
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            sync_question_access(user_ids=[instance.pk])
+            bump_user_perms_versions([instance.pk])
+        return
+
+    # group.user_set.add(...)/remove(...)/clear(), remember members before they are cleared
+    if action == 'pre_clear':
+        setattr(instance, CLEARED_USERS_ATTRIBUTE, list(instance.user_set.values_list('id', flat=True)))
+    elif action in ('post_add', 'post_remove'):
+        sync_question_access(user_ids=pk_set)
+        bump_user_perms_versions(pk_set or set())
+    elif action == 'post_clear':
+        user_ids = getattr(instance, CLEARED_USERS_ATTRIBUTE, [])
+        sync_question_access(user_ids=user_ids)
+        bump_user_perms_versions(user_ids)
+
+
+@receiver(m2m_changed, sender=ExampleUser.user_permissions.through)
+def user_permissions_changed(
+    sender: Any,
+    instance: ExampleUser | Permission,
+    action: str,
+    reverse: bool,
+    pk_set: set[int] | None,
+    **kwargs: Any,
+) -> None:
+    if not reverse:
+        # user.user_permissions.add(...)/remove(...)/clear()
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            bump_user_perms_versions([instance.pk])
+        return
+
+    # permission.user_set.add(...)/remove(...)/clear()
+    if action == 'pre_clear':
+        setattr(instance, CLEARED_USERS_ATTRIBUTE, list(instance.user_set.values_list('id', flat=True)))
+    elif action in ('post_add', 'post_remove'):
+        bump_user_perms_versions(pk_set or set())
+    elif action == 'post_clear':
+        bump_user_perms_versions(getattr(instance, CLEARED_USERS_ATTRIBUTE, []))
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(
+    sender: Any,
+    instance: Group | Permission,
+    action: str,
+    reverse: bool,
+    pk_set: set[int] | None,
+    **kwargs: Any,
+) -> None:
+    if not reverse:
+        # group.permissions.add(...)/remove(...)/clear(), members of the group are affected
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            bump_user_perms_versions(list(instance.user_set.values_list('id', flat=True)))
+        return
+
+    # permission.group_set.add(...)/remove(...)/clear(), members of all the groups are affected
+    if action == 'pre_clear':
+        setattr(
+            instance, CLEARED_GROUPS_ATTRIBUTE, list(cast(Permission, instance).group_set.values_list('id', flat=True))
+        )
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        group_ids = pk_set if action != 'post_clear' else getattr(instance, CLEARED_GROUPS_ATTRIBUTE, [])
+        members = ExampleUser.objects.filter(groups__in=group_ids or []).values_list('id', flat=True).distinct()
+        bump_user_perms_versions(list(members))
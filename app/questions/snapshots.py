@@ -0,0 +1,183 @@
+"""
+Per-user snapshots of permitted question ids.
+
+`AllowedQuestions` rows hold the sorted ids of questions a user can view. A snapshot is built on the first page read
+of the user and every `sync_question_access` refreshes existing snapshots of affected users in the same
+transaction: questions of the sync are merged into the arrays, syncs without questions rebuild them from
+`QuestionAccessEntry`. Deleted questions are removed from snapshots before their access entries are deleted, by a
+signal receiver for single questions and once per batch by `questions.bulk.delete_questions` for queryset deletes.
+"""
+
+from collections.abc import Collection, Sequence
+from typing import Any, overload
+
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.db.models import QuerySet
+from users.models import ExampleUser
+
+from .models import QUESTION_PERM_BITS, AllowedQuestions, Question, QuestionAccessEntry
+
+
+VIEW_BIT = QUESTION_PERM_BITS['view_question']
+
+SNAPSHOT_TABLE = AllowedQuestions._meta.db_table
+ENTRY_TABLE = QuestionAccessEntry._meta.db_table
+
+PERMITTED_IDS_SQL = f"""
+    SELECT "question_id" FROM "{ENTRY_TABLE}"
+    WHERE "user_id" = {{user}} AND "perm_bitmask" & {VIEW_BIT} = {VIEW_BIT}
+"""
+
+BUILD_SQL = f"""
+    INSERT INTO "{SNAPSHOT_TABLE}" ("user_id", "question_ids", "question_count")
+    SELECT "users"."id", "snapshot"."ids", cardinality("snapshot"."ids")
+    FROM unnest(%s::bigint[]) AS "users" ("id")
+    CROSS JOIN LATERAL (
+        SELECT ARRAY({PERMITTED_IDS_SQL.format(user='"users"."id"')} ORDER BY "question_id") AS "ids"
+    ) AS "snapshot"
+    ON CONFLICT ("user_id") DO UPDATE
+    SET "question_ids" = EXCLUDED."question_ids", "question_count" = EXCLUDED."question_count"
+"""
+
+REBUILD_SQL = f"""
+    UPDATE "{SNAPSHOT_TABLE}" SET ("question_ids", "question_count") = (
+        SELECT "ids", cardinality("ids") FROM (
+            SELECT ARRAY(
+                {PERMITTED_IDS_SQL.format(user=f'"{SNAPSHOT_TABLE}"."user_id"')} ORDER BY "question_id"
+            ) AS "ids"
+        ) AS "snapshot"
+    )
+"""
+
+# set operations hash both sides, `<> ALL(...)` would compare every id of the snapshot with every synced question
+MERGE_SQL = f"""
+    UPDATE "{SNAPSHOT_TABLE}" SET ("question_ids", "question_count") = (
+        SELECT "ids", cardinality("ids") FROM (
+            SELECT ARRAY(
+                (
+                    SELECT unnest("{SNAPSHOT_TABLE}"."question_ids")
+                    EXCEPT SELECT unnest(%(question_ids)s::bigint[])
+                )
+                UNION
+                (
+                    {PERMITTED_IDS_SQL.format(user=f'"{SNAPSHOT_TABLE}"."user_id"')}
+                    AND "question_id" = ANY(%(question_ids)s::bigint[])
+                )
+                ORDER BY 1
+            ) AS "ids"
+        ) AS "snapshot"
+    )
+    WHERE "user_id" = ANY(%(user_ids)s::bigint[])
+"""
+
+REMOVE_SQL = f"""
+    UPDATE "{SNAPSHOT_TABLE}" SET ("question_ids", "question_count") = (
+        SELECT "ids", cardinality("ids") FROM (
+            SELECT ARRAY(
+                SELECT unnest("{SNAPSHOT_TABLE}"."question_ids")
+                EXCEPT SELECT unnest(%(question_ids)s::bigint[])
+                ORDER BY 1
+            ) AS "ids"
+        ) AS "snapshot"
+    )
+    WHERE "user_id" IN (
+        SELECT "user_id" FROM "{ENTRY_TABLE}"
+        WHERE "question_id" = ANY(%(question_ids)s::bigint[]) AND "perm_bitmask" & {VIEW_BIT} = {VIEW_BIT}
+    )
+    AND "question_ids" && %(question_ids)s::bigint[]
+"""
+
+
+def build_allowed_snapshots(user_ids: Collection[int]) -> None:
+    """Create or rebuild snapshots of users from `QuestionAccessEntry`."""
+    if not user_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(BUILD_SQL, [list(user_ids)])
+
+
+def refresh_allowed_snapshots(
+    user_ids: Collection[int] | None = None,
+    question_ids: Collection[int] | None = None,
+) -> None:
+    """
+    Refresh existing snapshots after `QuestionAccessEntry` rows of users and/or questions were synced.
+
+    With `question_ids` only those questions are merged into snapshots of `user_ids` (which are required then),
+    otherwise snapshots of `user_ids` or of every user with `None` are rebuilt. Users without a snapshot are skipped.
+    """
+    with connection.cursor() as cursor:
+        if question_ids is not None:
+            if user_ids and question_ids:
+                cursor.execute(MERGE_SQL, {'user_ids': list(user_ids), 'question_ids': list(question_ids)})
+        elif user_ids is None:
+            cursor.execute(REBUILD_SQL)
+        elif user_ids:
+            cursor.execute(f'{REBUILD_SQL} WHERE "user_id" = ANY(%s::bigint[])', [list(user_ids)])
+
+
+def remove_from_allowed_snapshots(question_ids: Collection[int]) -> None:
+    """Remove questions which are being deleted from snapshots of users who can view them, in one statement."""
+    if not question_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(REMOVE_SQL, {'question_ids': list(question_ids)})
+
+
+class AllowedQuestionList(Sequence[Any]):
+    """
+    Questions a user can view ordered by id, sliced from the user's snapshot.
+
+    Can be paginated by Django and DRF paginators: `count()` reads only the stored length and a page slices its ids
+    from the array, then loads them from `queryset` (so `.values()` rows can be listed too) in one query.
+    """
+
+    def __init__(self, user: ExampleUser, queryset: QuerySet[Question, Any], descending: bool = False) -> None:
+        self.user = user
+        self.queryset = queryset
+        self.descending = descending
+        self._count: int | None = None
+        self._using: str | None = None
+
+    def get_snapshot(self) -> QuerySet[AllowedQuestions]:
+        return AllowedQuestions.objects.using(self._using).filter(user_id=self.user.pk)
+
+    def count(self) -> int:  # type: ignore[override]
+        if self._count is None:
+            count = self.get_snapshot().values_list('question_count', flat=True).first()
+            if count is None:
+                build_allowed_snapshots([self.user.pk])
+                # replicas don't have the new snapshot yet
+                self._using = DEFAULT_DB_ALIAS
+                count = self.get_snapshot().values_list('question_count', flat=True).get()
+            self._count = count
+        return self._count
+
+    def __len__(self) -> int:
+        return self.count()
+
+    @overload
+    def __getitem__(self, index: int) -> Any: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Any]: ...
+
+    def __getitem__(self, index: int | slice) -> Any:
+        if isinstance(index, int):
+            position = index + self.count() if index < 0 else index
+            return self[position : position + 1][0]
+        start, stop, _ = index.indices(self.count())
+        if start >= stop:
+            return []
+        if self.descending:
+            start, stop = self.count() - stop, self.count() - start
+        ids: list[int] = self.get_snapshot().values_list(f'question_ids__{start}_{stop}', flat=True).get()
+        if self.descending:
+            ids.reverse()
+        rows = {self.get_pk(row): row for row in self.queryset.filter(id__in=ids)}
+        return [rows[pk] for pk in ids if pk in rows]
+
+    @staticmethod
+    def get_pk(row: Any) -> int:
+        pk: int = row['id'] if isinstance(row, dict) else row.pk
+        return pk
@@ -3,40 +3,195 @@
 from __future__ import absolute_import, unicode_literals
 
 import random
+import string
+import uuid
+from collections.abc import Collection, Mapping
 from logging import getLogger
+from typing import Any
 
-from celery import shared_task
+from celery import Task, chord, shared_task
+from django.contrib.auth.models import Group
+from django.core.cache import cache
 from django.db import transaction
-from django.utils.crypto import get_random_string
-from guardian.shortcuts import assign_perm
+from django.db.models import Max, Min
 from users.models import ExampleUser
 
+from .access import BULK_BATCH_SIZE, QUESTION_OWNER_PERMS, grant_question_perms, grant_question_perms_to_users
+from .denormalized import update_choice_fields
 from .models import Choice, Question
 
 
 logger = getLogger(__file__)
 
+GENERATE_CHUNK_SIZE = 10_000
+"""Questions created by a single chunk task, every chunk is inserted in its own transaction."""
+
+GENERATED_CHUNK_KEY = 'questions:generated-chunk:{}:{}'
+GENERATED_CHUNK_TIMEOUT = 7 * 24 * 60 * 60
+
+GRANT_CHUNK_SIZE = 5000
+"""Questions granted per transaction by `grant_question_perms_in_bulk`."""
+
+GRANT_PROGRESS_STATE = 'PROGRESS'
+
+USER_SAMPLE_ROUNDS = 3
+"""Rounds of random primary key lookups when sampling users."""
+
+
+def random_string(rng: random.Random, length: int) -> str:
+    return ''.join(rng.choices(string.ascii_letters + string.digits, k=length))
+
+
+def sample_user_ids(rng: random.Random, size: int) -> list[int]:
+    """
+    Ids of `size` random users, drawn with replacement.
+
+    Random ids are picked from the primary key range and looked up by the primary key index, so the users table is
+    never loaded as a whole. Ids missing because of gaps in the range are redrawn for a few rounds, the rest of the
+    sample (or all of it when the range is too sparse) is taken from consecutive ids after a random one.
+    """
+    bounds = ExampleUser.objects.aggregate(low=Min('id'), high=Max('id'))
+    if bounds['low'] is None or size <= 0:
+        return []
+    found: list[int] = []
+    for _ in range(USER_SAMPLE_ROUNDS):
+        candidates = [rng.randint(bounds['low'], bounds['high']) for _ in range(size - len(found))]
+        existing = set(ExampleUser.objects.filter(id__in=candidates).values_list('id', flat=True))
+        if not existing:
+            break
+        found += [user_id for user_id in candidates if user_id in existing]
+        if len(found) >= size:
+            return found
+
+    start = rng.randint(bounds['low'], bounds['high'])
+    users = ExampleUser.objects.order_by('id').values_list('id', flat=True)
+    found += users.filter(id__gte=start)[: size - len(found)]
+    if len(found) < size:
+        found += users.filter(id__lt=start)[: size - len(found)]
+    return [*found, *rng.choices(found, k=size - len(found))]
+
+
+def create_random_questions(count: int, rng: random.Random) -> list[Question]:
+    """Insert questions with 2 to 5 choices each and grant owner permissions on every one to a random user."""
+    with transaction.atomic():
+        questions = Question.objects.bulk_create(
+            (Question(value=f"Random Question {random_string(rng, 10)}") for _ in range(count)),
+            batch_size=BULK_BATCH_SIZE,
+        )
+        Choice.objects.bulk_create(
+            (
+                Choice(question=question, value=f"Choice {random_string(rng, 5)}")
+                for question in questions
+                for _ in range(rng.randint(2, 5))
+            ),
+            batch_size=BULK_BATCH_SIZE,
+        )
+        update_choice_fields([question.pk for question in questions])
+        user_ids = sample_user_ids(rng, len(questions))
+        grants = [(user_id, question.pk) for user_id, question in zip(user_ids, questions, strict=False)]
+        grant_question_perms_to_users(grants, QUESTION_OWNER_PERMS)
+    return questions
+
 
 @shared_task  # type: ignore
 def create_random_question() -> str:
+    logger.info('Called create_random_question')
+    [question] = create_random_questions(1, random.Random())
+    return f"Question '{question.value}' created."
+
+
+@shared_task  # type: ignore
+def generate_questions(count: int, seed: int | None = None) -> int:
+    """Generate `count` random questions in chunks of `GENERATE_CHUNK_SIZE` within one task."""
+    rng = random.Random(seed)
+    created = 0
+    while created < count:
+        created += len(create_random_questions(min(GENERATE_CHUNK_SIZE, count - created), rng))
+    logger.info('Generated %d questions', created)
+    return created
+
+
+@shared_task(acks_late=True)  # type: ignore
+def generate_question_chunk(run_id: str, index: int, count: int, seed: int | None = None) -> int:
+    """
+    Generate one chunk of a `seed_questions` run.
+
+    Tasks are acknowledged after they finish, so chunks of lost workers are redelivered. A chunk which was already
+    committed is skipped, so redelivered and retried chunks don't create duplicate questions.
+    """
+    key = GENERATED_CHUNK_KEY.format(run_id, index)
+    if cache.get(key) is not None:
+        logger.info('Chunk %d of run %s was already generated', index, run_id)
+        return 0
+    rng = random.Random(f'{seed}:{index}' if seed is not None else None)
     with transaction.atomic():
-        logger.info('Called create_random_question')
-        # Create a new Question
-        question_text = f"Random Question {get_random_string(10)}"
-        question = Question.objects.create(value=question_text)
-
-        # Create a random number of Choices (between 2 and 5)
-        num_choices = random.randint(2, 5)
-        for _ in range(num_choices):
-            choice_text = f"Choice {get_random_string(5)}"
-            Choice.objects.create(question=question, value=choice_text)
-
-        # Assign permissions to a random User
-        users = ExampleUser.objects.all()
-        if users.exists():
-            user = random.choice(users)
-            assign_perm('view_question', user, question)
-            assign_perm('change_question', user, question)
-            assign_perm('delete_question', user, question)
-
-        return f"Question '{question_text}' created with {num_choices} choices."
+        created = len(create_random_questions(count, rng))
+        transaction.on_commit(lambda: cache.set(key, created, timeout=GENERATED_CHUNK_TIMEOUT))
+    return created
+
+
+@shared_task  # type: ignore
+def finish_question_seeding(created: list[int], run_id: str) -> int:
+    total = sum(created)
+    logger.info('Seeding run %s generated %d questions', run_id, total)
+    return total
+
+
+@shared_task  # type: ignore
+def seed_questions(count: int, chunk_size: int = GENERATE_CHUNK_SIZE, seed: int | None = None) -> str:
+    """
+    Fan out generation of `count` questions to the worker pool, one `generate_question_chunk` task per chunk.
+
+    Chunks run in parallel as a chord and `finish_question_seeding` reports the total, returns the run id.
+    """
+    run_id = uuid.uuid4().hex
+    chunks = [
+        generate_question_chunk.s(run_id, index, min(chunk_size, count - start), seed)
+        for index, start in enumerate(range(0, count, chunk_size))
+    ]
+    if chunks:
+        chord(chunks)(finish_question_seeding.s(run_id))
+    logger.info('Seeding run %s started with %d chunks', run_id, len(chunks))
+    return run_id
+
+
+@shared_task(bind=True)  # type: ignore
+def grant_question_perms_in_bulk(
+    self: Task,
+    perms: list[str],
+    user_id: int | None = None,
+    group_id: int | None = None,
+    question_ids: Collection[int] | None = None,
+    question_filter: Mapping[str, Any] | None = None,
+) -> dict[str, int]:
+    """
+    Grant object permissions on many questions to a user or a group outside of the request.
+
+    Questions are given by ids or by `Question.objects.filter()` lookups and are granted in chunks of
+    `GRANT_CHUNK_SIZE`, every chunk inserts permission rows in bulk skipping already granted ones and syncs
+    `QuestionAccessEntry` in its own transaction. Syncing bumps access versions of affected users, so their cached
+    permitted questions are invalidated as chunks are committed. Progress is reported as `PROGRESS` state with
+    `done` and `total` questions.
+    """
+    if (user_id is None) == (group_id is None):
+        raise ValueError("Exactly one of user_id and group_id is required")
+    if (question_ids is None) == (question_filter is None):
+        raise ValueError("Exactly one of question_ids and question_filter is required")
+
+    grantee: ExampleUser | Group = (
+        ExampleUser.objects.get(pk=user_id) if user_id is not None else Group.objects.get(pk=group_id)
+    )
+    questions = Question.objects.filter(id__in=question_ids) if question_ids is not None else Question.objects.all()
+    ids = questions.filter(**(question_filter or {})).order_by('id').values_list('id', flat=True)
+    total = ids.count()
+    done = 0
+    last_id = 0
+    while chunk := list(ids.filter(id__gt=last_id)[:GRANT_CHUNK_SIZE]):
+        with transaction.atomic():
+            grant_question_perms(grantee, [Question(pk=pk) for pk in chunk], perms)
+        done += len(chunk)
+        last_id = chunk[-1]
+        if not self.request.called_directly:
+            self.update_state(state=GRANT_PROGRESS_STATE, meta={'done': done, 'total': total})
+    logger.info('Granted %s on %d questions to %s', ', '.join(perms), done, grantee)
+    return {'done': done, 'total': total}
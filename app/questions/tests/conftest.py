@@ -1,13 +1,18 @@
 from typing import Any, Callable
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 from users.models import ExampleUser
 
+from questions.denormalized import update_choice_fields
 from questions.models import Choice, Question
 
 
 type CreateUser = Callable[[str], ExampleUser]
 type CreateQuestion = Callable[[str], Question]
+type CountQueries = Callable[[Callable[[], Any]], int]
 
 
 @pytest.fixture
@@ -28,6 +33,17 @@ def user_2(create_user: CreateUser) -> ExampleUser:
     return create_user('user_2')
 
 
+@pytest.fixture
+def api_client() -> APIClient:
+    return APIClient()
+
+
+@pytest.fixture
+def user_1_client(api_client: APIClient, user_1: ExampleUser) -> APIClient:
+    api_client.force_authenticate(user_1)
+    return api_client
+
+
 @pytest.fixture
 def create_question(db: Any) -> CreateQuestion:
     def make_by_question_value(value: str) -> Question:
@@ -39,6 +55,21 @@ def create_question(db: Any) -> CreateQuestion:
                 Choice(question=question, value=f'{value}_3'),
             ]
         )
+        # bulk inserts don't send signals
+        update_choice_fields([question.pk])
+        question.refresh_from_db()
         return question
 
     return make_by_question_value
+
+
+@pytest.fixture
+def count_queries(db: Any) -> CountQueries:
+    """Count queries run by the action, used to assert that query count doesn't grow with result size."""
+
+    def count(action: Callable[[], Any]) -> int:
+        with CaptureQueriesContext(connection) as context:
+            action()
+        return len(context.captured_queries)
+
+    return count
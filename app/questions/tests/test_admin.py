@@ -0,0 +1,110 @@
+from functools import partial
+
+import pytest
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from guardian.shortcuts import assign_perm
+from users.models import ExampleUser
+
+from .conftest import CountQueries, CreateQuestion, CreateUser
+
+
+@pytest.fixture
+def superuser_client(db: None) -> Client:
+    client = Client()
+    client.force_login(ExampleUser.objects.create_superuser(username='admin', password='admin'))
+    return client
+
+
+@pytest.fixture
+def staff(create_user: CreateUser) -> ExampleUser:
+    user = create_user('staff')
+    user.is_staff = True
+    user.save()
+    user.user_permissions.add(
+        *Permission.objects.filter(
+            content_type__app_label='questions', codename__in=['view_question', 'change_question', 'view_choice']
+        )
+    )
+    return user
+
+
+def test_changelists_query_count_is_constant(
+    superuser_client: Client,
+    create_question: CreateQuestion,
+    count_queries: CountQueries,
+) -> None:
+    urls = [reverse('admin:questions_question_changelist'), reverse('admin:questions_choice_changelist')]
+
+    def count_changelist_queries() -> list[int]:
+        return [count_queries(partial(superuser_client.get, url)) for url in urls]
+
+    create_question('question_0')
+    superuser_client.get(urls[0])
+    single = count_changelist_queries()
+    for index in range(1, 6):
+        create_question(f'question_{index}')
+    assert count_changelist_queries() == single
+
+
+def test_large_table_count_is_estimated(
+    superuser_client: Client,
+    create_question: CreateQuestion,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    for index in range(3):
+        create_question(f'question_{index}')
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE questions_choice')
+    monkeypatch.setattr('questions.admin.ESTIMATED_COUNT_THRESHOLD', 1)
+    url = reverse('admin:questions_choice_changelist')
+
+    with CaptureQueriesContext(connection) as context:
+        response = superuser_client.get(url)
+    assert response.status_code == 200
+    assert not [query for query in context.captured_queries if 'COUNT(*)' in query['sql']]
+    assert 'pg_class' in ''.join(query['sql'] for query in context.captured_queries)
+
+    # filtered lists are counted exactly
+    with CaptureQueriesContext(connection) as context:
+        superuser_client.get(url, {'question__id__exact': '1'})
+    assert [query for query in context.captured_queries if 'COUNT(*)' in query['sql']]
+
+
+def test_staff_sees_only_permitted_questions(staff: ExampleUser, create_question: CreateQuestion) -> None:
+    viewable, changeable, hidden = (create_question(f'question_{index}') for index in range(3))
+    assign_perm('questions.view_question', staff, viewable)
+    for perm in ('questions.view_question', 'questions.change_question'):
+        assign_perm(perm, staff, changeable)
+    client = Client()
+    client.force_login(staff)
+
+    response = client.get(reverse('admin:questions_question_changelist'))
+    assert [question.pk for question in response.context['cl'].result_list] == [changeable.pk, viewable.pk]
+    response = client.get(reverse('admin:questions_choice_changelist'))
+    assert {choice.question_id for choice in response.context['cl'].result_list} == {viewable.pk, changeable.pk}
+
+    # read only without change object permission
+    response = client.get(reverse('admin:questions_question_change', args=(viewable.pk,)))
+    assert response.status_code == 200 and not response.context['has_change_permission']
+    response = client.get(reverse('admin:questions_question_change', args=(changeable.pk,)))
+    assert response.status_code == 200 and response.context['has_change_permission']
+    response = client.get(reverse('admin:questions_question_change', args=(hidden.pk,)))
+    assert response.status_code == 302
+
+
+def test_choice_question_is_picked_with_autocomplete(superuser_client: Client, create_question: CreateQuestion) -> None:
+    question = create_question('question_1')
+
+    response = superuser_client.get(reverse('admin:questions_choice_add'))
+    assert b'admin-autocomplete' in response.content
+    assert b'question_1' not in response.content
+
+    response = superuser_client.get(
+        reverse('admin:autocomplete'),
+        {'term': 'question_1', 'app_label': 'questions', 'model_name': 'choice', 'field_name': 'question'},
+    )
+    assert [result['id'] for result in response.json()['results']] == [str(question.pk)]
@@ -0,0 +1,38 @@
+import io
+import json
+from pathlib import Path
+from typing import Any
+
+from django.core.management import call_command
+from users.models import ExampleUser
+
+from questions.models import Question
+
+
+def test_benchmark_api_reports_every_endpoint_and_rolls_back(db: Any, tmp_path: Path) -> None:
+    output = tmp_path / 'results.json'
+    options = {'users': 3, 'groups': 1, 'questions': 10, 'user_grants': 20, 'group_grants': 5, 'requests': 2}
+    call_command('benchmark_api', output=output, **options)
+
+    report = json.loads(output.read_text())
+    assert set(report['endpoints']) == {
+        'questions-list',
+        'questions-detail',
+        'question-choices-list',
+        'all-question-list',
+    }
+    assert all(result['queries_per_request'] > 0 for result in report['endpoints'].values())
+    assert not Question.objects.exists()
+    assert not ExampleUser.objects.filter(username__startswith='benchmark_').exists()
+
+    # previous results can be compared with
+    call_command('benchmark_api', compare=output, **options)
+
+
+def test_benchmark_serialization_matches_serializer_and_rolls_back(db: Any) -> None:
+    stdout = io.StringIO()
+    call_command('benchmark_serialization', questions=20, choices=2, repeat=1, stdout=stdout)
+
+    assert 'questions=20 choices_per_question=2' in stdout.getvalue()
+    assert not Question.objects.exists()
+    assert not ExampleUser.objects.filter(username__startswith='benchmark_').exists()
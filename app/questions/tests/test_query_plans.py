@@ -0,0 +1,79 @@
+import json
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.db.models import QuerySet
+from guardian.shortcuts import assign_perm
+from users.models import ExampleUser
+
+from questions.access import grant_question_perms
+from questions.models import Choice, Question, QuestionGroupObjectPermission, QuestionUserObjectPermission
+
+
+def iter_plan_nodes(node: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield node
+    for child in node.get('Plans', []):
+        yield from iter_plan_nodes(child)
+
+
+def explain(queryset: QuerySet[Any]) -> list[dict[str, Any]]:
+    [plan] = json.loads(queryset.explain(format='json'))
+    return list(iter_plan_nodes(plan['Plan']))
+
+
+def get_seq_scans(queryset: QuerySet[Any]) -> set[str]:
+    return {node['Relation Name'] for node in explain(queryset) if node['Node Type'] == 'Seq Scan'}
+
+
+def get_used_indexes(queryset: QuerySet[Any]) -> set[str]:
+    return {node['Index Name'] for node in explain(queryset) if 'Index Name' in node}
+
+
+@pytest.fixture
+def seeded_user(user_1: ExampleUser, user_2: ExampleUser) -> ExampleUser:
+    questions = Question.objects.bulk_create(Question(value=f'question_{index}') for index in range(2000))
+    Choice.objects.bulk_create(
+        Choice(question=question, value=f'choice_{index}') for question in questions for index in range(2)
+    )
+    grant_question_perms(user_1, questions[::10], ['view_question', 'change_question'])
+    grant_question_perms(user_2, questions[::3], ['view_question'])
+    group = Group.objects.create(name='group')
+    group.user_set.add(user_1)
+    grant_question_perms(group, questions[::7], ['view_question'])
+    assign_perm('questions.view_question', user_1)
+
+    # statistics of seeded tables and planner which uses an index whenever there is a suitable one
+    with connection.cursor() as cursor:
+        for model in (Question, Choice, QuestionUserObjectPermission, QuestionGroupObjectPermission):
+            cursor.execute(f'ANALYZE {model._meta.db_table}')
+        cursor.execute('SET LOCAL enable_seqscan = off')
+    return user_1
+
+
+def test_permission_filters_use_indexes(seeded_user: ExampleUser) -> None:
+    assert get_seq_scans(Question.objects.with_permission(seeded_user, 'view_question').order_by('id')) == set()
+    assert get_seq_scans(Choice.objects.with_question_permission(seeded_user, 'view_question')) == set()
+    assert 'questions_access_user_question_uniq' in get_used_indexes(
+        Question.objects.with_permission(seeded_user, 'change_question')
+    )
+
+
+def test_choices_of_question_use_covering_index(seeded_user: ExampleUser) -> None:
+    question = Question.objects.order_by('id').first()
+    queryset = Choice.objects.filter(question=question).order_by('id').values_list('id', 'question_id', 'value')
+    assert get_seq_scans(queryset) == set()
+    assert 'questions_choice_question_idx' in get_used_indexes(queryset)
+
+
+def test_object_permission_prefetch_uses_indexes(seeded_user: ExampleUser) -> None:
+    question_ids = list(Question.objects.order_by('id').values_list('id', flat=True)[:100])
+    # same filters as `QuestionAccess.prefetch`
+    user_perms = QuestionUserObjectPermission.objects.filter(user=seeded_user, content_object_id__in=question_ids)
+    group_perms = QuestionGroupObjectPermission.objects.filter(
+        group__user=seeded_user, content_object_id__in=question_ids
+    )
+    assert get_seq_scans(user_perms.values_list('content_object_id', 'permission_id')) == set()
+    assert get_seq_scans(group_perms.values_list('content_object_id', 'permission_id')) == set()
@@ -0,0 +1,282 @@
+from typing import Any
+
+import pytest
+from django.contrib.auth.models import Group, Permission
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from guardian.shortcuts import assign_perm, remove_perm
+from users.models import ExampleUser
+
+from questions.access import QUESTION_OWNER_PERMS, QuestionAccess, grant_question_perms
+from questions.bulk import delete_questions
+from questions.cache import has_model_perm
+from questions.models import AllowedQuestions, Question, QuestionAccessEntry, QuestionUserObjectPermission
+from questions.registry import (
+    get_question_permission_ids,
+    load_question_permissions,
+)
+from questions.snapshots import build_allowed_snapshots
+
+from .conftest import CountQueries, CreateQuestion, CreateUser
+
+
+def get_masks(user: ExampleUser) -> dict[int, int]:
+    return dict(QuestionAccessEntry.objects.filter(user=user).values_list('question_id', 'perm_bitmask'))
+
+
+def test_user_object_permissions_are_synced(user_1: ExampleUser, create_question: CreateQuestion) -> None:
+    question = create_question('question_1')
+
+    assign_perm('questions.view_question', user_1, question)
+    assign_perm('questions.change_question', user_1, question)
+    assert get_masks(user_1) == {question.id: 0b11}
+    assert list(Question.objects.with_permission(user_1, 'questions.change_question')) == [question]
+
+    remove_perm('questions.change_question', user_1, question)
+    assert get_masks(user_1) == {question.id: 0b1}
+    assert not Question.objects.with_permission(user_1, 'change_question').exists()
+
+    remove_perm('questions.view_question', user_1, question)
+    assert get_masks(user_1) == {}
+
+
+def test_group_object_permissions_and_membership_are_synced(
+    user_1: ExampleUser,
+    user_2: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    question = create_question('question_1')
+    group = Group.objects.create(name='group')
+    user_1.groups.add(group)
+
+    assign_perm('questions.view_question', group, question)
+    assert get_masks(user_1) == {question.id: 0b1}
+    assert get_masks(user_2) == {}
+
+    group.user_set.add(user_2)
+    assert get_masks(user_2) == {question.id: 0b1}
+
+    user_1.groups.remove(group)
+    assert get_masks(user_1) == {}
+
+    group.user_set.clear()
+    assert get_masks(user_2) == {}
+
+    group.user_set.add(user_1)
+    group.delete()
+    assert get_masks(user_1) == {}
+
+
+def test_bulk_object_permission_assigns_are_synced(
+    user_1: ExampleUser,
+    user_2: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    questions = [create_question(f'question_{i}') for i in range(3)]
+    group = Group.objects.create(name='group')
+    user_2.groups.add(group)
+
+    assign_perm('questions.view_question', user_1, Question.objects.filter(id__in=[q.id for q in questions[:2]]))
+    assert get_masks(user_1) == {questions[0].id: 0b1, questions[1].id: 0b1}
+
+    assign_perm('questions.change_question', [user_1, user_2], questions[2])
+    assert get_masks(user_1) == {questions[0].id: 0b1, questions[1].id: 0b1, questions[2].id: 0b10}
+    assert get_masks(user_2) == {questions[2].id: 0b10}
+
+    assign_perm('questions.view_question', group, Question.objects.all())
+    assert get_masks(user_2) == {questions[0].id: 0b1, questions[1].id: 0b1, questions[2].id: 0b11}
+
+    remove_perm('questions.view_question', user_1, Question.objects.all())
+    assert get_masks(user_1) == {questions[2].id: 0b10}
+
+
+def test_rebuild_question_access_command(
+    db: Any,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    question_1 = create_question('question_1')
+    question_2 = create_question('question_2')
+    assign_perm('questions.view_question', user_1, question_1)
+    assign_perm('questions.delete_question', user_1, question_2)
+    call_command('rebuild_question_access', '--check')
+
+    QuestionAccessEntry.objects.filter(question=question_1).delete()
+    QuestionAccessEntry.objects.filter(question=question_2).update(perm_bitmask=0b1)
+    with pytest.raises(CommandError, match='Found 2 mismatched'):
+        call_command('rebuild_question_access', '--check')
+
+    call_command('rebuild_question_access', '--chunk-size', '1')
+    call_command('rebuild_question_access', '--check')
+    assert get_masks(user_1) == {question_1.id: 0b1, question_2.id: 0b100}
+
+
+def get_snapshot(user: ExampleUser) -> list[int]:
+    snapshot = AllowedQuestions.objects.get(user=user)
+    assert snapshot.question_count == len(snapshot.question_ids)
+    return snapshot.question_ids
+
+
+def test_allowed_snapshots_are_refreshed_with_access(
+    user_1: ExampleUser,
+    user_2: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    question_1, question_2, question_3 = (create_question(f'question_{index}') for index in range(3))
+    assign_perm('questions.view_question', user_1, question_2)
+    build_allowed_snapshots([user_1.pk])
+    assert get_snapshot(user_1) == [question_2.pk]
+
+    # permissions other than view are not listed
+    assign_perm('questions.change_question', user_1, question_1)
+    assign_perm('questions.view_question', user_1, question_3)
+    assert get_snapshot(user_1) == [question_2.pk, question_3.pk]
+    grant_question_perms(user_1, [question_1], ['view_question'])
+    assert get_snapshot(user_1) == [question_1.pk, question_2.pk, question_3.pk]
+    remove_perm('questions.view_question', user_1, question_2)
+    assert get_snapshot(user_1) == [question_1.pk, question_3.pk]
+
+    group = Group.objects.create(name='group')
+    group.user_set.add(user_1, user_2)
+    assign_perm('questions.view_question', group, question_2)
+    assert get_snapshot(user_1) == [question_1.pk, question_2.pk, question_3.pk]
+    user_1.groups.clear()
+    assert get_snapshot(user_1) == [question_1.pk, question_3.pk]
+    # snapshots are built on first use only
+    assert not AllowedQuestions.objects.filter(user=user_2).exists()
+
+    AllowedQuestions.objects.filter(user=user_1).update(question_ids=[], question_count=0)
+    call_command('rebuild_question_access')
+    assert get_snapshot(user_1) == [question_1.pk, question_3.pk]
+
+
+def test_grant_question_perms_in_bulk(
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+    count_queries: CountQueries,
+) -> None:
+    questions = [create_question(f'question_{index}') for index in range(5)]
+    assign_perm('questions.view_question', user_1, questions[0])
+    get_question_permission_ids(QUESTION_OWNER_PERMS)
+
+    queries = count_queries(lambda: grant_question_perms(user_1, questions, QUESTION_OWNER_PERMS))
+    # bulk insert and access sync, independent of number of questions and perms
+    assert queries <= 8
+    assert get_masks(user_1) == {question.id: 0b111 for question in questions}
+
+    group = Group.objects.create(name='group')
+    user_1.groups.add(group)
+    question = create_question('question_group')
+    grant_question_perms(group, [question], ['questions.view_question'])
+    assert get_masks(user_1)[question.id] == 0b1
+
+    with pytest.raises(ValueError, match='unknown_question'):
+        grant_question_perms(user_1, questions, ['unknown_question'])
+
+
+def test_model_permissions_are_cached_until_changed(user_1: ExampleUser, count_queries: CountQueries) -> None:
+    def has_perm(perm: str) -> bool:
+        # fresh user instance like in every request, so permissions aren't cached on the instance
+        return has_model_perm(ExampleUser.objects.get(pk=user_1.pk), f'questions.{perm}')
+
+    view, change = (
+        Permission.objects.get(pk=pk) for pk in get_question_permission_ids(['view_question', 'change_question'])
+    )
+    assert not has_perm('view_question')
+    user = ExampleUser.objects.get(pk=user_1.pk)
+    assert count_queries(lambda: has_model_perm(user, 'questions.view_question')) == 0
+
+    user_1.user_permissions.add(view)
+    assert has_perm('view_question')
+    view.user_set.remove(user_1)
+    assert not has_perm('view_question')
+
+    group = Group.objects.create(name='group')
+    group.permissions.add(change)
+    group.user_set.add(user_1)
+    assert has_perm('change_question')
+    change.group_set.clear()
+    assert not has_perm('change_question')
+    group.permissions.add(change)
+    user_1.groups.clear()
+    assert not has_perm('change_question')
+
+
+def test_object_permission_checks_skip_permission_lookups(
+    user_1: ExampleUser,
+    create_user: CreateUser,
+    create_question: CreateQuestion,
+    count_queries: CountQueries,
+) -> None:
+    questions = [create_question(f'question_{index}') for index in range(3)]
+    assign_perm('questions.view_question', user_1, questions[0])
+    group = Group.objects.create(name='group')
+    user_1.groups.add(group)
+    assign_perm('questions.change_question', group, questions[0])
+    assign_perm('questions.view_question', group, questions[1])
+    load_question_permissions()
+
+    access = QuestionAccess(user_1)
+    # user and group permission ids only, no content type or permission queries
+    assert count_queries(lambda: access.prefetch(questions)) == 2
+    assert count_queries(lambda: access.get_perms(questions[0])) == 0
+    assert access.get_perms(questions[0]) == {'view_question', 'change_question'}
+    assert access.has_perm('questions.view_question', questions[1])
+    assert not access.has_perm('change_question', questions[1])
+    assert access.get_perms(questions[2]) == set()
+
+    superuser = create_user('admin')
+    superuser.is_superuser = True
+    access = QuestionAccess(superuser)
+    assert count_queries(lambda: access.get_perms(questions[2])) == 0
+    assert access.get_perms(questions[2]) == {*QUESTION_OWNER_PERMS, 'add_question'}
+
+
+def test_permission_registry_is_reloaded_after_migrations(
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+    count_queries: CountQueries,
+) -> None:
+    [view_id] = get_question_permission_ids(['questions.view_question'])
+    assert count_queries(lambda: get_question_permission_ids(['view_question', 'change_question'])) == 0
+    emit_post_migrate_signal(verbosity=0, interactive=False, db='default')
+    assert count_queries(lambda: get_question_permission_ids(['view_question'])) == 1
+
+    # ids unknown to the registry, like of permission rows recreated by a migration in another process, reload it
+    view = Permission.objects.get(pk=view_id)
+    view.delete()
+    view.pk = None
+    view.save()
+    question = create_question('question_1')
+    QuestionUserObjectPermission.objects.create(user=user_1, permission=view, content_object=question)
+    assert get_masks(user_1) == {question.id: 0b1}
+    assert QuestionAccess(user_1).has_perm('view_question', question)
+    assert get_question_permission_ids(['view_question']) == [view.pk]
+
+
+def test_deleted_questions_are_removed_from_snapshots_at_once(
+    user_1: ExampleUser,
+    user_2: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    questions = [create_question(f'question_{index}') for index in range(5)]
+    for question in questions:
+        assign_perm('questions.view_question', user_1, question)
+    assign_perm('questions.view_question', user_2, questions[0])
+    build_allowed_snapshots([user_1.pk, user_2.pk])
+
+    with CaptureQueriesContext(connection) as context:
+        delete_questions([question.pk for question in questions[:4]])
+    snapshot_updates = [
+        query for query in context.captured_queries if 'UPDATE "questions_allowedquestions"' in query['sql']
+    ]
+    assert len(snapshot_updates) == 1
+    assert get_snapshot(user_1) == [questions[4].pk]
+    assert get_snapshot(user_2) == []
+
+    # single deletes are handled by the signal receiver
+    questions[4].delete()
+    assert get_snapshot(user_1) == []
@@ -1,6 +1,8 @@
 from typing import cast
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from guardian.shortcuts import assign_perm
 from rest_framework import status
@@ -8,13 +10,9 @@ from rest_framework.test import APIClient
 from users.models import ExampleUser
 
 from questions.models import Choice
+from questions.views import QuestionViewSet
 
-from .conftest import CreateQuestion
-
-
-@pytest.fixture
-def api_client() -> APIClient:
-    return APIClient()
+from .conftest import CountQueries, CreateQuestion
 
 
 def test_get_list_request_auth(
@@ -303,3 +301,298 @@ def test_user_can_delete_choice_from_allowed_question_choice(
     url = reverse('question-choices-detail', args=(choice.question.id, choice.id))
     response = api_client.delete(url)
     assert response.status_code == status.HTTP_204_NO_CONTENT
+
+
+# parent question and object permissions are resolved once per request
+def test_choice_request_loads_parent_question_once(
+    api_client: APIClient,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    assign_perm('questions.view_question', user_1)
+    question = create_question('question_1')
+    assign_perm('questions.view_question', user_1, question)
+    api_client.force_authenticate(user_1)
+    choice = cast(Choice, question.choices.first())
+
+    for url in (
+        reverse('question-choices-list', args=(question.id,)),
+        reverse('question-choices-detail', args=(question.id, choice.id)),
+    ):
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        question_lookups = [query for query in context.captured_queries if 'FROM "questions_question"' in query['sql']]
+        assert len(question_lookups) == 1, question_lookups
+
+
+# choice detail is scoped to the question from url
+def test_user_cant_get_choice_through_other_question(
+    api_client: APIClient,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    assign_perm('questions.view_question', user_1)
+    question_1 = create_question('question_1')
+    question_2 = create_question('question_2')
+    assign_perm('questions.view_question', user_1, question_1)
+    api_client.force_authenticate(user_1)
+
+    choice_2 = cast(Choice, question_2.choices.first())
+    url = reverse('question-choices-detail', args=(question_1.id, choice_2.id))
+    assert api_client.get(url).status_code == status.HTTP_404_NOT_FOUND
+
+
+# object permissions for the whole page are prefetched and exposed as capability flags
+def test_list_prefetches_object_permissions_for_page(
+    api_client: APIClient,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    assign_perm('questions.view_question', user_1)
+    questions = [create_question(f'question_{index}') for index in range(3)]
+    for question in questions:
+        assign_perm('questions.view_question', user_1, question)
+    assign_perm('questions.change_question', user_1, questions[0])
+    assign_perm('questions.delete_question', user_1, questions[1])
+    api_client.force_authenticate(user_1)
+
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.get(reverse('questions-list'))
+    assert response.status_code == status.HTTP_200_OK
+    permission_lookups = [
+        query['sql']
+        for query in context.captured_queries
+        if 'objectpermission' in query['sql'] and 'FROM "questions_question"' not in query['sql']
+    ]
+    # one query for user and one for group object permissions of the whole page
+    assert len(permission_lookups) == 2, permission_lookups
+
+    flags = {item['id']: (item['can_change'], item['can_delete']) for item in response.data['results']}
+    assert flags == {
+        questions[0].id: (True, False),
+        questions[1].id: (False, True),
+        questions[2].id: (False, False),
+    }
+
+
+# cursor mode walks every permitted question without count queries
+def test_user_can_walk_questions_with_cursor_pagination(
+    api_client: APIClient,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    assign_perm('questions.view_question', user_1)
+    questions = [create_question(f'question_{index}') for index in range(5)]
+    for question in questions[:4]:
+        assign_perm('questions.view_question', user_1, question)
+    api_client.force_authenticate(user_1)
+
+    url: str | None = reverse('questions-list') + '?pagination=cursor&page_size=2'
+    ids = []
+    while url:
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert 'count' not in response.data
+        assert not [query for query in context.captured_queries if 'COUNT(*)' in query['sql']]
+        ids += [item['id'] for item in response.data['results']]
+        url = response.data['next']
+    assert ids == [question.id for question in questions[:4]]
+
+
+def test_cursor_pagination_rejects_non_unique_orderings_and_search(
+    api_client: APIClient,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    assign_perm('questions.view_question', user_1)
+    questions = [create_question(f'question_{index}') for index in range(3)]
+    for question in questions:
+        assign_perm('questions.view_question', user_1, question)
+    api_client.force_authenticate(user_1)
+    url = reverse('questions-list')
+
+    response = api_client.get(url, {'pagination': 'cursor', 'ordering': '-id'})
+    assert response.status_code == status.HTTP_200_OK
+    assert [item['id'] for item in response.data['results']] == [question.id for question in reversed(questions)]
+
+    response = api_client.get(url, {'pagination': 'cursor', 'ordering': 'choice_count'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'ordering' in response.data
+    response = api_client.get(url, {'pagination': 'cursor', 'search': 'question'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'search' in response.data
+
+
+def test_user_can_walk_choices_with_cursor_pagination(
+    api_client: APIClient,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    assign_perm('questions.view_question', user_1)
+    question = create_question('question_1')
+    assign_perm('questions.view_question', user_1, question)
+    api_client.force_authenticate(user_1)
+
+    url: str | None = reverse('question-choices-list', args=(question.id,)) + '?pagination=cursor&page_size=2'
+    ids = []
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        ids += [item['id'] for item in response.data['results']]
+        url = response.data['next']
+    assert ids == list(question.choices.order_by('id').values_list('id', flat=True))
+
+
+# list query count doesn't depend on page size, choices are prefetched
+def test_list_questions_query_count_is_constant(
+    api_client: APIClient,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+    count_queries: CountQueries,
+) -> None:
+    assign_perm('questions.view_question', user_1)
+    api_client.force_authenticate(user_1)
+    url = reverse('questions-list')
+
+    def add_questions(count: int) -> None:
+        for index in range(count):
+            assign_perm('questions.view_question', user_1, create_question(f'question_{index}'))
+
+    add_questions(1)
+    # warm up model level permissions cached on forced user
+    api_client.get(url)
+    single_question_queries = count_queries(lambda: api_client.get(url))
+    add_questions(5)
+    many_questions_queries = count_queries(lambda: api_client.get(url))
+    assert single_question_queries == many_questions_queries
+
+    response = api_client.get(url)
+    for item in response.data['results']:
+        assert [choice['id'] for choice in item['choices']] == sorted(choice['id'] for choice in item['choices'])
+
+
+def test_list_questions_fields_and_expand(
+    api_client: APIClient,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    assign_perm('questions.view_question', user_1)
+    question = create_question('question_1')
+    assign_perm('questions.view_question', user_1, question)
+    api_client.force_authenticate(user_1)
+    url = reverse('questions-list')
+
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.get(url, {'fields': 'id,value'})
+    assert response.data['results'] == [{'id': question.id, 'value': 'question_1'}]
+    assert not [query for query in context.captured_queries if 'FROM "questions_choice"' in query['sql']]
+
+    response = api_client.get(url, {'fields': 'id', 'expand': 'choices'})
+    assert list(response.data['results'][0]) == ['id', 'choices']
+    assert len(response.data['results'][0]['choices']) == 3
+
+
+# fast read path renders the same bytes as serializers
+def test_fast_read_matches_serializer_output(
+    api_client: APIClient,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    assign_perm('questions.view_question', user_1)
+    questions = [create_question(f'question_{index}') for index in range(3)]
+    for question in questions:
+        assign_perm('questions.view_question', user_1, question)
+    assign_perm('questions.change_question', user_1, questions[0])
+    assign_perm('questions.delete_question', user_1, questions[1])
+    questions[2].choices.all().delete()
+    api_client.force_authenticate(user_1)
+
+    urls = [
+        reverse('questions-list'),
+        reverse('questions-list') + '?pagination=cursor&page_size=2',
+        reverse('questions-detail', args=(questions[0].id,)),
+    ]
+    fast_responses = [api_client.get(url).content for url in urls]
+    monkeypatch.setattr(QuestionViewSet, 'use_fast_read', False)
+    serializer_responses = [api_client.get(url).content for url in urls]
+    assert fast_responses == serializer_responses
+
+
+def test_list_questions_by_choice_count(
+    api_client: APIClient,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+    count_queries: CountQueries,
+) -> None:
+    assign_perm('questions.view_question', user_1)
+    api_client.force_authenticate(user_1)
+    questions = [create_question(f'question_{index}') for index in range(3)]
+    for question in questions:
+        assign_perm('questions.view_question', user_1, question)
+    # counters follow choice writes
+    Choice.objects.create(question=questions[1], value='extra')
+    questions[2].choices.all()[0].delete()
+    questions[0].choices.all().delete()
+    url = reverse('questions-list')
+
+    def list_counts(**params: str) -> list[tuple[int, int]]:
+        response = api_client.get(url, params)
+        assert response.status_code == status.HTTP_200_OK
+        return [(item['id'], item['choice_count']) for item in response.data['results']]
+
+    assert list_counts() == [(questions[0].id, 0), (questions[1].id, 4), (questions[2].id, 2)]
+    assert list_counts(ordering='-choice_count') == [(questions[1].id, 4), (questions[2].id, 2), (questions[0].id, 0)]
+    assert list_counts(min_choices='1', max_choices='3') == [(questions[2].id, 2)]
+    assert api_client.get(url, {'min_choices': 'many'}).status_code == status.HTTP_400_BAD_REQUEST
+
+    # counts come from the question rows, not from a query per question
+    with CaptureQueriesContext(connection) as context:
+        api_client.get(url, {'ordering': 'choice_count', 'fields': 'id,choice_count'})
+    assert not [query for query in context.captured_queries if 'FROM "questions_choice"' in query['sql']]
+
+
+def test_list_questions_pages_are_sliced_from_allowed_snapshot(
+    api_client: APIClient,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    assign_perm('questions.view_question', user_1)
+    api_client.force_authenticate(user_1)
+    questions = [create_question(f'question_{index}') for index in range(5)]
+    for question in questions[:4]:
+        assign_perm('questions.view_question', user_1, question)
+    url = reverse('questions-list')
+
+    def list_ids(**params: str) -> tuple[int, list[int]]:
+        response = api_client.get(url, params)
+        assert response.status_code == status.HTTP_200_OK
+        return response.data['count'], [item['id'] for item in response.data['results']]
+
+    ids = [question.id for question in questions]
+    assert list_ids(limit='2') == (4, ids[:2])
+    with CaptureQueriesContext(connection) as context:
+        assert list_ids(limit='2', offset='2') == (4, ids[2:4])
+    assert not [query for query in context.captured_queries if 'questionaccessentry' in query['sql']]
+    assert list_ids(limit='3', ordering='-id') == (4, [ids[3], ids[2], ids[1]])
+
+    questions[1].delete()
+    assert list_ids() == (3, [ids[0], ids[2], ids[3]])
+    # revalidated by questions of the page
+    response = api_client.get(url)
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == status.HTTP_304_NOT_MODIFIED
+    questions[0].value = 'changed'
+    questions[0].save()
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == status.HTTP_200_OK
+
+    # deleting a question outside of the page changes count and links of the page
+    response = api_client.get(url, {'limit': '1'})
+    assert response.data['count'] == 3
+    assert api_client.get(url, {'limit': '1'}, HTTP_IF_NONE_MATCH=response['ETag']).status_code == 304
+    questions[3].delete()
+    response = api_client.get(url, {'limit': '1'}, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['count'] == 2
+    assert response.data['next'] is not None
@@ -0,0 +1,70 @@
+import pytest
+from django.test import Client
+from django.urls import reverse
+from guardian.shortcuts import assign_perm
+from rest_framework import status
+from users.models import ExampleUser
+
+from .conftest import CreateQuestion
+
+
+@pytest.fixture
+def client(user_1: ExampleUser) -> Client:
+    client = Client()
+    client.force_login(user_1)
+    return client
+
+
+# test that async endpoints respond with the same content as sync ones
+def test_async_endpoints_match_sync_endpoints(
+    client: Client,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    assign_perm('questions.view_question', user_1)
+    questions = [create_question(f'question_{index}') for index in range(3)]
+    create_question('hidden')
+    for question in questions:
+        assign_perm('questions.view_question', user_1, question)
+    assign_perm('questions.change_question', user_1, questions[0])
+    question = questions[0]
+    choice = question.choices.order_by('id')[0]
+
+    for name, args, params in [
+        ('questions-list', (), {}),
+        ('questions-list', (), {'limit': 1, 'offset': 1}),
+        ('questions-detail', (question.id,), {}),
+        ('question-choices-list', (question.id,), {'limit': 2}),
+        ('question-choices-detail', (question.id, choice.id), {}),
+    ]:
+        sync_response = client.get(reverse(name, args=args), params, HTTP_ACCEPT='application/json')
+        async_response = client.get(reverse(f'async-{name}', args=args), params)
+        assert async_response.status_code == status.HTTP_200_OK
+        assert async_response.content.replace(b'/api/async/', b'/api/') == sync_response.content
+
+
+def test_async_endpoints_check_permissions(
+    client: Client,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    question = create_question('question')
+    list_url = reverse('async-questions-list')
+    detail_url = reverse('async-questions-detail', args=(question.id,))
+    choices_url = reverse('async-question-choices-list', args=(question.id,))
+
+    assert Client().get(list_url).status_code == status.HTTP_403_FORBIDDEN
+    assert client.get(list_url).status_code == status.HTTP_403_FORBIDDEN
+
+    assign_perm('questions.view_question', user_1)
+    assert client.get(list_url).json()['results'] == []
+    assert client.get(detail_url).status_code == status.HTTP_403_FORBIDDEN
+    assert client.get(choices_url).status_code == status.HTTP_403_FORBIDDEN
+    assert client.get(reverse('async-questions-detail', args=(0,))).status_code == status.HTTP_404_NOT_FOUND
+    assert client.post(list_url).status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+    assign_perm('questions.view_question', user_1, question)
+    assert client.get(detail_url).status_code == status.HTTP_200_OK
+    assert len(client.get(choices_url).json()['results']) == 3
+    missing_choice_url = reverse('async-question-choices-detail', args=(question.id, 0))
+    assert client.get(missing_choice_url).status_code == status.HTTP_404_NOT_FOUND
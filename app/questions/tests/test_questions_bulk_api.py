@@ -0,0 +1,243 @@
+from typing import Any
+
+import pytest
+from celery.result import AsyncResult
+from django.urls import reverse
+from guardian.shortcuts import assign_perm
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import ExampleUser
+
+from questions.models import Question, QuestionAccessEntry
+
+from .conftest import CountQueries, CreateQuestion
+
+
+def make_items(count: int) -> list[dict[str, Any]]:
+    return [
+        {'value': f'question_{index}', 'choices': [{'value': f'choice_{index}_1'}, {'value': f'choice_{index}_2'}]}
+        for index in range(count)
+    ]
+
+
+def test_user_can_bulk_create_questions(user_1_client: APIClient, user_1: ExampleUser, user_2: ExampleUser) -> None:
+    url = reverse('questions-bulk')
+    assign_perm('questions.add_question', user_1)
+
+    client = APIClient()
+    client.force_authenticate(user_2)
+    assert client.post(url, make_items(1), format='json').status_code == status.HTTP_403_FORBIDDEN
+
+    response = user_1_client.post(url, [*make_items(2), {'choices': []}, 'question'], format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert [result['status'] for result in response.data] == [201, 201, 400, 400]
+    assert response.data[2]['errors'] == {'value': ['This field is required.']}
+
+    questions = Question.objects.filter(id__in=[result['id'] for result in response.data[:2]]).order_by('id')
+    assert [question.value for question in questions] == ['question_0', 'question_1']
+    assert [list(question.choices.order_by('id').values_list('value', flat=True)) for question in questions] == [
+        ['choice_0_1', 'choice_0_2'],
+        ['choice_1_1', 'choice_1_2'],
+    ]
+    assert set(QuestionAccessEntry.objects.filter(user=user_1).values_list('question_id', 'perm_bitmask')) == {
+        (question.id, 0b111) for question in questions
+    }
+
+
+def test_bulk_create_query_count_is_constant(
+    user_1_client: APIClient,
+    user_1: ExampleUser,
+    count_queries: CountQueries,
+) -> None:
+    assign_perm('questions.add_question', user_1)
+    url = reverse('questions-bulk')
+    user_1_client.post(url, make_items(1), format='json')
+
+    few_items_queries = count_queries(lambda: user_1_client.post(url, make_items(2), format='json'))
+    many_items_queries = count_queries(lambda: user_1_client.post(url, make_items(50), format='json'))
+    assert few_items_queries == many_items_queries
+
+
+def test_bulk_rejects_invalid_batches(user_1_client: APIClient, user_1: ExampleUser) -> None:
+    assign_perm('questions.add_question', user_1)
+    url = reverse('questions-bulk')
+    assert user_1_client.post(url, [], format='json').status_code == status.HTTP_400_BAD_REQUEST
+    assert user_1_client.post(url, {'value': 'test'}, format='json').status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_user_can_bulk_update_allowed_questions(
+    user_1_client: APIClient,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    assign_perm('questions.change_question', user_1)
+    question_1 = create_question('question_1')
+    question_2 = create_question('question_2')
+    question_3 = create_question('question_3')
+    assign_perm('questions.change_question', user_1, question_1)
+    assign_perm('questions.change_question', user_1, question_3)
+
+    response = user_1_client.patch(
+        reverse('questions-bulk'),
+        [
+            {'id': question_1.id, 'value': 'changed_1', 'choices': [{'value': 'new_choice'}]},
+            {'id': question_2.id, 'value': 'changed_2'},
+            {'id': 0, 'value': 'missing'},
+            {'value': 'without_id'},
+            {'id': question_3.id, 'value': 'changed_3'},
+        ],
+        format='json',
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert [result['status'] for result in response.data] == [200, 403, 404, 400, 200]
+
+    question_1.refresh_from_db()
+    question_2.refresh_from_db()
+    question_3.refresh_from_db()
+    assert (question_1.value, question_2.value, question_3.value) == ('changed_1', 'question_2', 'changed_3')
+    assert list(question_1.choices.values_list('value', flat=True)) == ['new_choice']
+    assert question_3.choices.count() == 3
+
+
+def test_bulk_update_is_partial_and_rejects_duplicate_ids(
+    user_1_client: APIClient,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    assign_perm('questions.change_question', user_1)
+    question_1 = create_question('question_1')
+    question_2 = create_question('question_2')
+    assign_perm('questions.change_question', user_1, question_1)
+    assign_perm('questions.change_question', user_1, question_2)
+
+    response = user_1_client.patch(
+        reverse('questions-bulk'),
+        [
+            {'id': question_1.id, 'choices': [{'value': 'new_choice'}]},
+            {'id': question_2.id, 'value': 'changed_2'},
+            {'id': question_1.id, 'value': 'duplicate', 'choices': [{'value': 'duplicate_choice'}]},
+        ],
+        format='json',
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert [result['status'] for result in response.data] == [200, 200, 400]
+    assert response.data[2]['errors'] == {'id': ['Duplicate id in the batch.']}
+
+    question_1.refresh_from_db()
+    question_2.refresh_from_db()
+    assert (question_1.value, question_2.value) == ('question_1', 'changed_2')
+    assert list(question_1.choices.values_list('value', flat=True)) == ['new_choice']
+    assert question_1.choice_count == 1
+
+
+def test_bulk_update_query_count_is_constant(
+    user_1_client: APIClient,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+    count_queries: CountQueries,
+) -> None:
+    assign_perm('questions.change_question', user_1)
+    questions = [create_question(f'question_{index}') for index in range(50)]
+    assign_perm('questions.change_question', user_1, Question.objects.all())
+    url = reverse('questions-bulk')
+
+    def make_update_items(count: int) -> list[dict[str, Any]]:
+        return [
+            {'id': question.id, 'value': 'changed', 'choices': [{'value': 'new_choice'}]}
+            for question in questions[:count]
+        ]
+
+    user_1_client.patch(url, make_update_items(1), format='json')
+
+    few_items_queries = count_queries(lambda: user_1_client.patch(url, make_update_items(2), format='json'))
+    many_items_queries = count_queries(lambda: user_1_client.patch(url, make_update_items(50), format='json'))
+    assert few_items_queries == many_items_queries
+    assert set(Question.objects.values_list('value', 'choice_count')) == {('changed', 1)}
+
+
+def test_user_can_bulk_delete_allowed_questions(
+    user_1_client: APIClient,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    assign_perm('questions.delete_question', user_1)
+    question_1 = create_question('question_1')
+    question_2 = create_question('question_2')
+    assign_perm('questions.delete_question', user_1, question_1)
+
+    response = user_1_client.delete(
+        reverse('questions-bulk'), [{'id': question_1.id}, {'id': question_2.id}], format='json'
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert [result['status'] for result in response.data] == [204, 403]
+    assert list(Question.objects.values_list('id', flat=True)) == [question_2.id]
+    assert not QuestionAccessEntry.objects.exists()
+
+
+def test_staff_can_start_bulk_grant(
+    user_1_client: APIClient,
+    user_1: ExampleUser,
+    user_2: ExampleUser,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    url = reverse('questions-grants')
+    payload = {'perms': ['view_question'], 'user': user_2.pk, 'question_filter': {'id__gte': 1}}
+    assert user_1_client.post(url, payload, format='json').status_code == status.HTTP_403_FORBIDDEN
+
+    user_1.is_staff = True
+    user_1.save()
+    queued: list[dict[str, Any]] = []
+
+    def delay(**kwargs: Any) -> AsyncResult:
+        queued.append(kwargs)
+        return AsyncResult('a1b2')
+
+    monkeypatch.setattr('questions.views.grant_question_perms_in_bulk.delay', delay)
+
+    response = user_1_client.post(url, {**payload, 'question_ids': [1]}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = user_1_client.post(url, {**payload, 'question_filter': {'value__regex': '.*'}}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    # values are validated by type of the lookup before the task is queued
+    response = user_1_client.post(
+        url, {**payload, 'question_filter': {'id__gte': 'x', 'updated_at__lte': 'yesterday'}}, format='json'
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert set(response.data['question_filter']) == {'id__gte', 'updated_at__lte'}
+    assert not queued
+
+    response = user_1_client.post(url, {**payload, 'question_filter': {'id__gte': '1'}}, format='json')
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.data == {'task_id': 'a1b2'}
+    assert response['Location'].endswith(reverse('questions-grant-status', args=('a1b2',)))
+    assert queued == [
+        {
+            'perms': ['view_question'],
+            'user_id': user_2.pk,
+            'group_id': None,
+            'question_ids': None,
+            'question_filter': {'id__gte': 1},
+        }
+    ]
+
+
+def test_staff_can_follow_bulk_grant_progress(
+    user_1_client: APIClient, user_1: ExampleUser, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    user_1.is_staff = True
+    user_1.save()
+    result = AsyncResult('a1b2')
+    monkeypatch.setattr('questions.views.grant_question_perms_in_bulk.AsyncResult', lambda task_id: result)
+    url = reverse('questions-grant-status', args=('a1b2',))
+
+    monkeypatch.setattr(AsyncResult, 'state', 'PROGRESS')
+    monkeypatch.setattr(AsyncResult, 'info', {'done': 3, 'total': 7})
+    assert user_1_client.get(url).data == {'task_id': 'a1b2', 'state': 'PROGRESS', 'done': 3, 'total': 7}
+
+    monkeypatch.setattr(AsyncResult, 'state', 'FAILURE')
+    monkeypatch.setattr(AsyncResult, 'info', ValueError('Unknown question permissions'))
+    assert user_1_client.get(url).data == {
+        'task_id': 'a1b2',
+        'state': 'FAILURE',
+        'error': 'Unknown question permissions',
+    }
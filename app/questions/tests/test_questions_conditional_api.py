@@ -0,0 +1,120 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from guardian.shortcuts import assign_perm, remove_perm
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import ExampleUser
+
+from .conftest import CreateQuestion
+
+
+@pytest.fixture(autouse=True)
+def model_perms(user_1: ExampleUser) -> None:
+    assign_perm('questions.view_question', user_1)
+
+
+def test_question_list_is_revalidated_without_serialization(
+    user_1_client: APIClient,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    question = create_question('question_1')
+    assign_perm('questions.view_question', user_1, question)
+    url = reverse('questions-list')
+
+    response = user_1_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    etag = response['ETag']
+    assert not response.has_header('Last-Modified')
+
+    with CaptureQueriesContext(connection) as context:
+        response = user_1_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response['ETag'] == etag
+    assert not response.content
+    assert not [query for query in context.captured_queries if 'FROM "questions_choice"' in query['sql']]
+
+    # different page of the same list has a different tag
+    assert user_1_client.get(url, {'limit': 1}, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+    # choice write touches the question
+    question.choices.create(value='new_choice')
+    response = user_1_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    etag = response['ETag']
+
+    # permission changes of the user change the tag
+    remove_perm('questions.view_question', user_1, question)
+    response = user_1_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['results'] == []
+
+
+def test_question_list_is_not_revalidated_by_date_after_delete_or_revoke(
+    user_1_client: APIClient,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    questions = [create_question(f'question_{index}') for index in range(3)]
+    for question in questions:
+        assign_perm('questions.view_question', user_1, question)
+    url = reverse('questions-list')
+    # what the list would have sent as Last-Modified, the newest `updated_at` of its questions
+    since = user_1_client.get(reverse('questions-detail', args=(questions[-1].id,)))['Last-Modified']
+
+    questions[0].delete()
+    response = user_1_client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+    assert response.status_code == status.HTTP_200_OK
+    assert [row['id'] for row in response.json()['results']] == [questions[1].id, questions[2].id]
+
+    remove_perm('questions.view_question', user_1, questions[1])
+    response = user_1_client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+    assert response.status_code == status.HTTP_200_OK
+    assert [row['id'] for row in response.json()['results']] == [questions[2].id]
+
+
+def test_question_detail_is_revalidated(
+    user_1_client: APIClient,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    question = create_question('question_1')
+    assign_perm('questions.view_question', user_1, question)
+    url = reverse('questions-detail', args=(question.id,))
+
+    response = user_1_client.get(url)
+    etag, last_modified = response['ETag'], response['Last-Modified']
+    assert user_1_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+    assert user_1_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code == status.HTTP_304_NOT_MODIFIED
+
+    question.value = 'changed'
+    question.save()
+    response = user_1_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['value'] == 'changed'
+
+
+def test_question_choices_are_revalidated(
+    user_1_client: APIClient,
+    user_1: ExampleUser,
+    user_2: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    question = create_question('question_1')
+    assign_perm('questions.view_question', user_1, question)
+    url = reverse('question-choices-list', args=(question.id,))
+
+    etag = user_1_client.get(url)['ETag']
+    assert user_1_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+    # validators are checked after permissions
+    other_client = APIClient()
+    other_client.force_authenticate(user_2)
+    assert other_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_403_FORBIDDEN
+
+    question.choices.order_by('id')[0].delete()
+    response = user_1_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()['results']) == 2
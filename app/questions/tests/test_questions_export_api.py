@@ -0,0 +1,79 @@
+import json
+from typing import cast
+
+import pytest
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from guardian.shortcuts import assign_perm
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import ExampleUser
+
+from questions.views import QuestionViewSet
+
+from .conftest import CreateQuestion
+
+
+def test_user_can_export_allowed_questions_as_ndjson(
+    user_1_client: APIClient,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    assign_perm('questions.view_question', user_1)
+    questions = [create_question(f'question_{index}') for index in range(5)]
+    for question in questions[:4]:
+        assign_perm('questions.view_question', user_1, question)
+    monkeypatch.setattr(QuestionViewSet, 'export_chunk_size', 2)
+
+    with CaptureQueriesContext(connection) as context:
+        response = user_1_client.get(reverse('questions-export'))
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'application/x-ndjson'
+        content = cast(StreamingHttpResponse, response).getvalue()
+
+    # choices are loaded with one query per chunk of 2 questions
+    choice_queries = [query for query in context.captured_queries if 'FROM "questions_choice"' in query['sql']]
+    assert len(choice_queries) == 2
+
+    lines = [json.loads(line) for line in content.decode().splitlines()]
+    assert [line['id'] for line in lines] == [question.id for question in questions[:4]]
+    assert lines[0] == {
+        'id': questions[0].id,
+        'value': 'question_0',
+        'choices': [
+            {'id': choice.id, 'question': questions[0].id, 'value': choice.value}
+            for choice in questions[0].choices.order_by('id')
+        ],
+    }
+
+
+def test_user_can_export_allowed_questions_as_csv(
+    user_1_client: APIClient,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    assign_perm('questions.view_question', user_1)
+    question = create_question('question, "quoted"')
+    question.choices.exclude(id=question.choices.order_by('id')[0].id).delete()
+    empty_question = create_question('empty')
+    empty_question.choices.all().delete()
+    assign_perm('questions.view_question', user_1, question)
+    assign_perm('questions.view_question', user_1, empty_question)
+
+    response = user_1_client.get(reverse('questions-export'), {'format': 'csv'})
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Content-Type'] == 'text/csv'
+    choice = question.choices.get()
+    assert cast(StreamingHttpResponse, response).getvalue().decode().splitlines() == [
+        'question_id,question_value,choice_id,choice_value',
+        f'{question.id},"question, ""quoted""",{choice.id},"question, ""quoted""_1"',
+        f'{empty_question.id},empty,,',
+    ]
+
+
+def test_export_requires_view_permission(user_1_client: APIClient) -> None:
+    response = user_1_client.get(reverse('questions-export'))
+    assert response.status_code == status.HTTP_403_FORBIDDEN
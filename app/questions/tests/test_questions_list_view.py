@@ -0,0 +1,106 @@
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from guardian.shortcuts import assign_perm, remove_perm
+from users.models import ExampleUser
+
+from questions.models import Choice
+from questions.views import QuestionsListView
+
+from .conftest import CreateQuestion
+
+
+@pytest.fixture
+def client(user_1: ExampleUser) -> Client:
+    assign_perm('questions.view_question', user_1)
+    client = Client()
+    client.force_login(user_1)
+    return client
+
+
+def test_all_questions_fragments_are_cached(client: Client, create_question: CreateQuestion) -> None:
+    question = create_question('question_1')
+    url = reverse('all-question-list', args=('all',))
+    assert b'question_1_1' in client.get(url).content
+
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert b'question_1_1' in response.content
+    assert not [query for query in context.captured_queries if 'FROM "questions_choice"' in query['sql']]
+
+    # choice change bumps question version and fragment is rendered again
+    choice = question.choices.order_by('id')[0]
+    choice.value = 'changed_choice'
+    choice.save()
+    assert b'changed_choice' in client.get(url).content
+
+    Choice.objects.filter(id=choice.id).delete()
+    assert b'changed_choice' not in client.get(url).content
+
+
+def test_allowed_questions_follow_permission_changes(
+    client: Client,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+) -> None:
+    question_1 = create_question('question_1')
+    question_2 = create_question('question_2')
+    assign_perm('questions.view_question', user_1, question_1)
+    url = reverse('all-question-list', args=('allowed',))
+
+    content = client.get(url).content
+    assert b'question_1' in content and b'question_2' not in content
+
+    # permitted ids are read from the snapshot of the user
+    with CaptureQueriesContext(connection) as context:
+        client.get(url)
+    assert not [query for query in context.captured_queries if 'questionaccessentry' in query['sql']]
+
+    assign_perm('questions.view_question', user_1, question_2)
+    assert b'question_2' in client.get(url).content
+
+    remove_perm('questions.view_question', user_1, question_1)
+    content = client.get(url).content
+    assert b'question_1' not in content and b'question_2' in content
+
+
+def test_questions_are_ordered_and_filtered_by_choice_count(client: Client, create_question: CreateQuestion) -> None:
+    create_question('question_1')
+    Choice.objects.create(question=create_question('question_2'), value='extra')
+    url = reverse('all-question-list', args=('all',))
+
+    content = client.get(url, {'ordering': '-choice_count'}).content.decode()
+    assert content.index('question_2_1') < content.index('question_1_1')
+    content = client.get(url, {'min_choices': '4'}).content.decode()
+    assert 'question_2_1' in content and 'question_1_1' not in content
+    # unknown ordering and invalid bounds are ignored
+    content = client.get(url, {'ordering': 'value', 'min_choices': 'many'}).content.decode()
+    assert content.index('question_1_1') < content.index('question_2_1')
+
+
+def test_allowed_questions_are_paginated(
+    client: Client,
+    user_1: ExampleUser,
+    create_question: CreateQuestion,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(QuestionsListView, 'paginate_by', 2)
+    questions = [create_question(f'question_{index}') for index in range(4)]
+    for question in questions[1:]:
+        assign_perm('questions.view_question', user_1, question)
+    url = reverse('all-question-list', args=('allowed',))
+
+    def list_questions(**params: str) -> list[int]:
+        response = client.get(url, params)
+        assert response.status_code == 200
+        return [question.pk for question in response.context['object_list']]
+
+    assert list_questions() == [questions[1].pk, questions[2].pk]
+    response = client.get(url)
+    assert b'Page 1 of 2' in response.content and b'?page_number=2' in response.content
+    assert list_questions(page_number='2') == [questions[3].pk]
+    assert list_questions(ordering='-id') == [questions[3].pk, questions[2].pk]
+    # filtered lists are paginated from the permission filtered queryset
+    assert list_questions(ordering='-id', min_choices='3', page_number='2') == [questions[1].pk]
@@ -0,0 +1,97 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from guardian.shortcuts import assign_perm
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import ExampleUser
+
+from questions.models import Choice, Question
+from questions.search import has_trigram_support
+
+
+@pytest.fixture(autouse=True)
+def model_perms(user_1: ExampleUser) -> None:
+    for perm in ('view_question', 'add_question', 'change_question'):
+        assign_perm(f'questions.{perm}', user_1)
+
+
+def create_questions(client: APIClient, items: list[dict[str, object]]) -> list[int]:
+    response = client.post(reverse('questions-bulk'), items, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    return [result['id'] for result in response.json()]
+
+
+def search(client: APIClient, terms: str) -> list[int]:
+    response = client.get(reverse('questions-list'), {'search': terms})
+    assert response.status_code == status.HTTP_200_OK
+    return [question['id'] for question in response.json()['results']]
+
+
+def test_search_matches_questions_and_choices_ranked_by_relevance(
+    user_1_client: APIClient,
+    user_2: ExampleUser,
+) -> None:
+    in_choice, in_value, unrelated = create_questions(
+        user_1_client,
+        [
+            {'value': 'Favourite colour', 'choices': [{'value': 'Green planets'}, {'value': 'Blue'}]},
+            {'value': 'Which planets have rings?', 'choices': [{'value': 'Saturn'}]},
+            {'value': 'Favourite food', 'choices': [{'value': 'Pizza'}]},
+        ],
+    )
+    # not permitted to user_1
+    Question.objects.create(value='Smallest planet')
+
+    assert search(user_1_client, 'planet') == [in_value, in_choice]
+    assert search(user_1_client, 'saturn') == [in_value]
+    assert search(user_1_client, '"favourite food"') == [unrelated]
+    assert search(user_1_client, 'favourite -pizza') == [in_choice]
+    assert search(user_1_client, ' ') == [in_choice, in_value, unrelated]
+
+
+def test_search_is_filtered_by_permissions_in_one_query(user_1_client: APIClient) -> None:
+    create_questions(user_1_client, [{'value': 'Planets', 'choices': [{'value': 'Mars'}]}])
+
+    with CaptureQueriesContext(connection) as context:
+        search(user_1_client, 'mars')
+    [query] = [query['sql'] for query in context.captured_queries if '@@' in query['sql'] and 'LIMIT' in query['sql']]
+    assert 'questions_questionaccessentry' in query
+    assert 'ORDER BY' in query and 'ts_rank' in query
+
+
+def test_search_vector_follows_question_and_choice_changes(user_1_client: APIClient) -> None:
+    [question_id] = create_questions(user_1_client, [{'value': 'Planets', 'choices': [{'value': 'Mars'}]}])
+    question = Question.objects.get(pk=question_id)
+
+    choice = Choice.objects.create(question=question, value='Jupiter')
+    assert search(user_1_client, 'jupiter') == [question_id]
+    choice.value = 'Neptune'
+    choice.save()
+    assert search(user_1_client, 'jupiter') == []
+    assert search(user_1_client, 'neptune') == [question_id]
+    question.choices.all().delete()
+    assert search(user_1_client, 'mars') == []
+
+    question.value = 'Moons'
+    question.save()
+    assert search(user_1_client, 'moon') == [question_id]
+
+    response = user_1_client.patch(
+        reverse('questions-bulk'),
+        [{'id': question_id, 'value': 'Stars', 'choices': [{'value': 'Sirius'}]}],
+        format='json',
+    )
+    assert response.json()[0]['status'] == status.HTTP_200_OK
+    assert search(user_1_client, 'sirius') == [question_id]
+    assert search(user_1_client, 'moon') == []
+
+
+def test_search_matches_prefixes_and_typos_with_trigrams(user_1_client: APIClient) -> None:
+    if not has_trigram_support(connection.alias):
+        pytest.skip('pg_trgm is not installed')
+    [question_id] = create_questions(user_1_client, [{'value': 'Favourite planet', 'choices': []}])
+
+    assert search(user_1_client, 'plan') == [question_id]
+    assert search(user_1_client, 'favorite') == [question_id]
@@ -0,0 +1,118 @@
+import random
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+from django.contrib.auth.models import Group
+from django.db.models import Count
+from example.celery import app as celery_app
+from guardian.utils import get_anonymous_user
+from users.models import ExampleUser
+
+from questions.models import Question, QuestionAccessEntry
+from questions.tasks import (
+    create_random_question,
+    generate_question_chunk,
+    generate_questions,
+    grant_question_perms_in_bulk,
+    sample_user_ids,
+    seed_questions,
+)
+
+from .conftest import CountQueries, CreateUser
+
+
+def test_create_random_question_grants_random_user(user_1: ExampleUser, count_queries: CountQueries) -> None:
+    queries = count_queries(create_random_question)
+
+    question = Question.objects.get()
+    assert 2 <= question.choices.count() <= 5
+    # random user could be any user including guardian anonymous one
+    assert QuestionAccessEntry.objects.get(question=question).perm_bitmask == 0b111
+    # choices and object permissions are inserted in bulk, the user is found with primary key range lookups
+    assert queries < 17
+
+
+@pytest.fixture
+def eager_celery() -> Iterator[None]:
+    celery_app.conf.task_always_eager = True
+    yield
+    celery_app.conf.task_always_eager = False
+
+
+def test_generate_questions_query_count_does_not_grow(create_user: CreateUser, count_queries: CountQueries) -> None:
+    users = [create_user(f'user_{index}') for index in range(10)]
+
+    queries = count_queries(lambda: generate_questions(200, seed=1))
+    generate_questions(5, seed=1)
+
+    # rows are inserted in bulk, users are sampled with a few primary key lookups
+    assert queries < 20
+    assert Question.objects.count() == 205
+    counts = Question.objects.annotate(count=Count('choices')).values_list('count', flat=True)
+    assert all(2 <= count <= 5 for count in counts)
+    # every question is owned by one of the users
+    entries = QuestionAccessEntry.objects.all()
+    assert entries.count() == 205
+    assert {entry.perm_bitmask for entry in entries} == {0b111}
+    assert {entry.user_id for entry in entries} <= {user.pk for user in users} | {get_anonymous_user().pk}
+
+
+def test_sample_user_ids_skips_deleted_users(create_user: CreateUser) -> None:
+    users = [create_user(f'user_{index}') for index in range(20)]
+    ExampleUser.objects.filter(pk__in=[user.pk for user in users[::2]]).delete()
+
+    sample = sample_user_ids(random.Random(0), 50)
+
+    assert len(sample) == 50
+    assert set(sample) <= set(ExampleUser.objects.values_list('id', flat=True))
+
+
+def test_seed_questions_fans_out_chunks_once(
+    user_1: ExampleUser,
+    eager_celery: None,
+    django_capture_on_commit_callbacks: Any,
+) -> None:
+    with django_capture_on_commit_callbacks(execute=True):
+        run_id = seed_questions.delay(25, chunk_size=10, seed=1).get()
+    assert Question.objects.count() == 25
+    assert QuestionAccessEntry.objects.count() == 25
+
+    # redelivered chunk of the run is skipped
+    with django_capture_on_commit_callbacks(execute=True):
+        assert generate_question_chunk(run_id, 1, 10, seed=1) == 0
+    assert Question.objects.count() == 25
+
+
+def test_grant_question_perms_in_bulk_reports_progress(
+    user_1: ExampleUser,
+    create_user: CreateUser,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    group = Group.objects.create(name='group')
+    group.user_set.add(user_1)
+    questions = Question.objects.bulk_create(Question(value=f'question_{index}') for index in range(7))
+    progress: list[dict[str, int]] = []
+    monkeypatch.setattr('questions.tasks.GRANT_CHUNK_SIZE', 3)
+    monkeypatch.setattr(grant_question_perms_in_bulk, 'update_state', lambda **kwargs: progress.append(kwargs['meta']))
+
+    result = grant_question_perms_in_bulk.apply(
+        kwargs={'perms': ['view_question'], 'group_id': group.pk, 'question_filter': {'value__icontains': 'question'}}
+    ).get()
+
+    assert result == {'done': 7, 'total': 7}
+    assert progress == [{'done': 3, 'total': 7}, {'done': 6, 'total': 7}, {'done': 7, 'total': 7}]
+    assert set(Question.objects.with_permission(user_1, 'view_question')) == set(questions)
+
+    # granted rows are skipped, user grants sync only the user
+    user_2 = create_user('user_2')
+    grant_question_perms_in_bulk(
+        ['view_question', 'change_question'],
+        user_id=user_2.pk,
+        question_ids=[question.pk for question in questions[:2]],
+    )
+    grant_question_perms_in_bulk(['view_question'], user_id=user_2.pk, question_ids=[questions[0].pk])
+    assert set(Question.objects.with_permission(user_2, 'change_question')) == set(questions[:2])
+
+    with pytest.raises(ValueError):
+        grant_question_perms_in_bulk(['view_question'], user_id=user_2.pk, group_id=group.pk, question_ids=[])
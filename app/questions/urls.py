@@ -3,6 +3,7 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 from rest_framework_nested.routers import NestedDefaultRouter
 
+from . import async_views
 from .views import ChoicesViewSet, QuestionsListView, QuestionViewSet
 
 
@@ -16,8 +17,20 @@ api_url_patters = [
     path('', include(choices_router.urls)),
 ]
 
+async_api_url_patterns = [
+    path('questions/', async_views.question_list, name='async-questions-list'),
+    path('questions/<int:pk>/', async_views.question_detail, name='async-questions-detail'),
+    path('questions/<int:question_pk>/choices/', async_views.choice_list, name='async-question-choices-list'),
+    path(
+        'questions/<int:question_pk>/choices/<int:pk>/',
+        async_views.choice_detail,
+        name='async-question-choices-detail',
+    ),
+]
+
 urlpatterns = [
     path('api/', include(api_url_patters)),
+    path('api/async/', include(async_api_url_patterns)),
     path('', lambda *args, **kwargs: redirect('all-question-list', 'all')),
     path('questions/<str:page>', QuestionsListView.as_view(), name='all-question-list'),
     path('api-auth/', include('rest_framework.urls', namespace='rest_framework')),
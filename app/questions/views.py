@@ -1,21 +1,54 @@
+from collections.abc import Sequence
+from functools import partial
 from logging import getLogger
-from typing import Any
+from typing import Any, cast
 
 from django.contrib.auth.mixins import PermissionRequiredMixin
 from django.db.models.query import QuerySet
+from django.http import Http404, StreamingHttpResponse
 from django.views.generic import ListView
-from guardian.shortcuts import assign_perm
-from rest_framework import permissions, viewsets
+from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from rest_framework.serializers import BaseSerializer
 from rest_framework.views import APIView
+from users.models import ExampleUser
 
+from .access import QUESTION_OWNER_PERMS, get_question_access, grant_question_perms
+from .bulk import BulkGrantSerializer, bulk_create_questions, bulk_delete_questions, bulk_update_questions
+from .cache import has_model_perm, render_question_fragments
+from .conditional import conditional_response, get_question_list_validators, get_question_validators
+from .export import EXPORT_CHUNK_SIZE, CSVRenderer, NDJSONRenderer, iter_csv, iter_ndjson, iter_question_chunks
+from .filters import (
+    CHOICE_COUNT_BOUNDS,
+    ChoiceCountFilter,
+    QuestionOrderingFilter,
+    get_choice_count_bounds,
+    order_questions,
+)
 from .models import Choice, Question
-from .serializers import ChoiceSerializer, QuestionSerializer
+from .pagination import OptionalCursorPagination
+from .search import QuestionSearchFilter
+from .serializers import (
+    ChoiceSerializer,
+    QuestionSerializer,
+    get_nested_prefetches,
+    get_requested_fields,
+    represent_questions,
+)
+from .snapshots import AllowedQuestionList
+from .tasks import grant_question_perms_in_bulk
 
 
 logger = getLogger(__name__)
 
+SNAPSHOT_LIST_PARAMS = {'limit', 'offset', 'ordering', 'format'}
+"""Query parameters of question lists which can be served from `AllowedQuestions` snapshots."""
+
+SNAPSHOT_ORDERINGS = (None, 'id', '-id')
+
 
 class QuestionPermission(permissions.BasePermission):
     def has_permission(self, request: Request, view: APIView) -> bool:
@@ -23,31 +56,32 @@ class QuestionPermission(permissions.BasePermission):
             case "OPTIONS":
                 return True
             case "GET":
-                return request.user.has_perm('questions.view_question')
+                return has_model_perm(request.user, 'questions.view_question')
             case "POST":
-                return request.user.has_perm('questions.add_question')
+                return has_model_perm(request.user, 'questions.add_question')
             case "PUT":
-                return request.user.has_perm('questions.change_question')
+                return has_model_perm(request.user, 'questions.change_question')
             case "PATCH":
-                return request.user.has_perm('questions.change_question')
+                return has_model_perm(request.user, 'questions.change_question')
             case "DELETE":
-                return request.user.has_perm('questions.delete_question')
+                return has_model_perm(request.user, 'questions.delete_question')
         return False
 
     def has_object_permission(self, request: Request, view: APIView, obj: Question) -> bool:
+        access = get_question_access(request)
         match request.method:
             case "OPTIONS":
                 return True
             case "GET":
-                return request.user.has_perm('questions.view_question', obj)
+                return access.has_perm('questions.view_question', obj)
             case "POST":
-                return request.user.has_perm('questions.add_question', obj)
+                return access.has_perm('questions.add_question', obj)
             case "PUT":
-                return request.user.has_perm('questions.change_question', obj)
+                return access.has_perm('questions.change_question', obj)
             case "PATCH":
-                return request.user.has_perm('questions.change_question', obj)
+                return access.has_perm('questions.change_question', obj)
             case "DELETE":
-                return request.user.has_perm('questions.delete_question', obj)
+                return access.has_perm('questions.delete_question', obj)
         return False
 
 
@@ -59,24 +93,24 @@ class QuestionChoicePermission(permissions.BasePermission):
         return self.check_question_access(request, view)
 
     def check_question_access(self, request: Request, view: APIView) -> bool:
-        try:
-            question = Question.objects.get(id=view.kwargs.get('question_pk'))
-        except Question.DoesNotExist:
+        access = get_question_access(request)
+        question = access.get_question(view.kwargs.get('question_pk'))
+        if question is None:
             return False
 
         match request.method:
             case "OPTIONS":
                 return True
             case "GET":
-                return request.user.has_perm('questions.view_question', question)
+                return access.has_perm('questions.view_question', question)
             case "POST":
-                return request.user.has_perm('questions.change_question', question)
+                return access.has_perm('questions.change_question', question)
             case "PUT":
-                return request.user.has_perm('questions.change_question', question)
+                return access.has_perm('questions.change_question', question)
             case "PATCH":
-                return request.user.has_perm('questions.change_question', question)
+                return access.has_perm('questions.change_question', question)
             case "DELETE":
-                return request.user.has_perm('questions.change_question', question)
+                return access.has_perm('questions.change_question', question)
         return False
 
 
@@ -84,60 +118,252 @@ class QuestionViewSet(viewsets.ModelViewSet[Question]):
     queryset = Question.objects.none()
     serializer_class = QuestionSerializer
     permission_classes = [permissions.IsAuthenticated & QuestionPermission]
+    pagination_class = OptionalCursorPagination
+    filter_backends = [QuestionSearchFilter, ChoiceCountFilter, QuestionOrderingFilter]
+    replica_actions = ('list', 'retrieve')
+
+    # serve list and retrieve from `.values()` rows instead of field by field serialization
+    use_fast_read = True
+    export_chunk_size = EXPORT_CHUNK_SIZE
+
+    def is_fast_read(self) -> bool:
+        return self.use_fast_read and self.action in ('list', 'retrieve') and get_requested_fields(self.request) is None
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        if (allowed := self.get_allowed_list()) is not None:
+            return self.list_allowed(request, allowed)
+        validators = get_question_list_validators(request, self.filter_queryset(self.get_queryset()))
+        return conditional_response(request, validators, partial(self.list_questions, request, *args, **kwargs))
+
+    def get_allowed_list(self) -> AllowedQuestionList | None:
+        """Permitted questions from the snapshot of the user, unless the list is searched, filtered or by cursor."""
+        user = self.request.user
+        ordering = self.request.query_params.get('ordering')
+        if (
+            not isinstance(user, ExampleUser)
+            or user.is_superuser
+            or not self.is_fast_read()
+            or not self.request.query_params.keys() <= SNAPSHOT_LIST_PARAMS
+            or ordering not in SNAPSHOT_ORDERINGS
+        ):
+            return None
+        queryset = Question.objects.values('id', 'value', 'choice_count')
+        return AllowedQuestionList(user, queryset, descending=ordering == '-id')
+
+    def list_allowed(self, request: Request, allowed: AllowedQuestionList) -> Response:
+        """
+        List a page of the snapshot.
+
+        Validators cover questions of the page, access version of the user and the snapshot length, which is the
+        `count` of the response and decides its `next`/`previous` links.
+        """
+        page = self.paginate_queryset(allowed)
+        rows = page if page is not None else allowed[:]
+        page_questions = Question.objects.filter(id__in=[row['id'] for row in rows])
+        validators = get_question_list_validators(request, page_questions, allowed.count())
+
+        def respond() -> Response:
+            data = represent_questions(rows, request)
+            return self.get_paginated_response(data) if page is not None else Response(data)
+
+        return conditional_response(request, validators, respond)
+
+    def list_questions(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        if not self.is_fast_read():
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset()).values('id', 'value', 'choice_count')
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(represent_questions(page, request))
+        return Response(represent_questions(list(queryset), request))
+
+    def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        question = self.get_object()
+        validators = get_question_validators(request, question)
+        return conditional_response(request, validators, partial(self.retrieve_question, question))
+
+    def retrieve_question(self, question: Question) -> Response:
+        if not self.is_fast_read():
+            return Response(self.get_serializer(question).data)
+        [data] = represent_questions(
+            [{'id': question.id, 'value': question.value, 'choice_count': question.choice_count}], self.request
+        )
+        return Response(data)
+
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request: Request) -> Response:
+        """
+        Create, update or delete a batch of questions in one transaction.
+
+        POST and PATCH accept a list of questions with nested choices (PATCH items need a unique `id`, other fields
+        are optional and given choices replace current ones), DELETE accepts a list of `{"id": ...}` objects.
+        Every item gets its own result.
+        """
+        access = get_question_access(request)
+        match request.method:
+            case "POST":
+                results = bulk_create_questions(cast(ExampleUser, request.user), request.data)
+            case "PATCH":
+                results = bulk_update_questions(access, request.data)
+            case _:
+                results = bulk_delete_questions(access, request.data)
+        return Response(results)
+
+    @action(detail=False, methods=['post'], url_path='grants', permission_classes=[permissions.IsAdminUser])
+    def grants(self, request: Request) -> Response:
+        """
+        Grant object permissions on many questions to a user or a group in a background task, staff only.
+
+        Accepts `perms`, one of `user`/`group` and one of `question_ids`/`question_filter`, responds with id of the
+        task, its progress is available at the `Location` of the response.
+        """
+        serializer = BulkGrantSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        result = grant_question_perms_in_bulk.delay(
+            perms=data['perms'],
+            user_id=data['user'].pk if 'user' in data else None,
+            group_id=data['group'].pk if 'group' in data else None,
+            question_ids=data.get('question_ids'),
+            question_filter=data.get('question_filter'),
+        )
+        location = reverse('questions-grant-status', args=(result.id,), request=request)
+        return Response({'task_id': result.id}, status=status.HTTP_202_ACCEPTED, headers={'Location': location})
+
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path=r'grants/(?P<task_id>[0-9a-f-]+)',
+        permission_classes=[permissions.IsAdminUser],
+    )
+    def grant_status(self, request: Request, task_id: str) -> Response:
+        """State of a grant task with `done` and `total` questions while it's running and after it's finished."""
+        result = grant_question_perms_in_bulk.AsyncResult(task_id)
+        data: dict[str, Any] = {'task_id': task_id, 'state': result.state}
+        if isinstance(result.info, dict):
+            data.update(result.info)
+        elif result.failed():
+            data['error'] = str(result.info)
+        return Response(data)
+
+    @action(detail=False, methods=['get'], url_path='export', renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request: Request) -> StreamingHttpResponse:
+        """Stream every permitted question with choices as NDJSON (default) or CSV with `?format=csv`."""
+        chunks = iter_question_chunks(
+            Question.objects.with_permission(request.user, 'view_question'), self.export_chunk_size
+        )
+        if getattr(request.accepted_renderer, 'format', None) == CSVRenderer.format:
+            response = StreamingHttpResponse(iter_csv(chunks), content_type=CSVRenderer.media_type)
+            response['Content-Disposition'] = 'attachment; filename="questions.csv"'
+        else:
+            response = StreamingHttpResponse(iter_ndjson(chunks), content_type=NDJSONRenderer.media_type)
+            response['Content-Disposition'] = 'attachment; filename="questions.ndjson"'
+        return response
+
+    def paginate_queryset(self, queryset: QuerySet[Question, Any] | Sequence[Any]) -> Sequence[Any] | None:
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            get_question_access(self.request).prefetch(obj for obj in page if isinstance(obj, Question))
+        return page
 
     def perform_create(self, serializer: BaseSerializer[Question]) -> None:
         question = serializer.save()
-        assign_perm('questions.view_question', self.request.user, question)
-        assign_perm('questions.change_question', self.request.user, question)
-        assign_perm('questions.delete_question', self.request.user, question)
+        grant_question_perms(cast(ExampleUser, self.request.user), [question], QUESTION_OWNER_PERMS)
 
     def get_queryset(self) -> QuerySet[Question]:
         match self.action:
             case "list":
-                return Question.objects.with_permission(self.request.user, 'view_question')
+                queryset = Question.objects.with_permission(self.request.user, 'view_question').order_by('id')
             case _:
-                return Question.objects.all()
+                queryset = Question.objects.all()
+        if self.is_fast_read():
+            return queryset
+        return queryset.prefetch_related(*get_nested_prefetches(self.get_serializer()))
 
 
 class ChoicesViewSet(viewsets.ModelViewSet[Choice]):
     queryset = Choice.objects.none()
     serializer_class = ChoiceSerializer
     permission_classes = [permissions.IsAuthenticated & QuestionChoicePermission]
+    pagination_class = OptionalCursorPagination
+    replica_actions = ('list', 'retrieve')
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        validators = get_question_validators(request, self.get_question())
+        return conditional_response(request, validators, partial(super().list, request, *args, **kwargs))
+
+    def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        validators = get_question_validators(request, self.get_question())
+        return conditional_response(request, validators, partial(super().retrieve, request, *args, **kwargs))
+
+    def get_question(self) -> Question:
+        question = get_question_access(self.request).get_question(self.kwargs['question_pk'])
+        if question is None:
+            raise Http404
+        return question
 
     def get_serializer_context(self) -> dict[str, Any]:
         context = super().get_serializer_context()
-        context['question'] = Question.objects.get(id=self.kwargs['question_pk'])
+        context['question'] = get_question_access(self.request).get_question(self.kwargs['question_pk'])
         return context
 
     def get_queryset(self) -> QuerySet[Choice]:
         if not self.request.user.is_authenticated:
             return Choice.objects.none()
-        question = Question.objects.get(id=self.kwargs['question_pk'])
+        access = get_question_access(self.request)
+        question = access.get_question(self.kwargs['question_pk'])
+        if question is None:
+            return Choice.objects.none()
         match self.action:
             case "list":
-                return Choice.objects.with_question_permission(self.request.user, 'view_question').filter(
-                    question=question
-                )
+                if not access.has_perm('questions.view_question', question):
+                    return Choice.objects.none()
+                return Choice.objects.filter(question=question)
             case _:
-                return Choice.objects.all()
+                return Choice.objects.filter(question=question)
 
 
 class QuestionsListView(PermissionRequiredMixin, ListView):  # type: ignore
     model = Question
-    template_name = 'question_list.html'
+    template_name = 'questions/question_list.html'
     permission_required = 'questions.view_question'
+    replica_actions = ('get', 'head')
+    paginate_by = 50
+    # `page` is the tab of the list
+    page_kwarg = 'page_number'
 
-    def get_queryset(self) -> QuerySet[Question]:
+    # paginators of list views accept any sliceable sequence with `count()`
+    def get_queryset(self) -> QuerySet[Question] | AllowedQuestionList:  # type: ignore[override]
+        ordering = self.request.GET.get('ordering')
         queryset = Question.objects.none()
         if page := self.kwargs.get('page'):
             if page == 'all':
                 queryset = Question.objects.all()
             elif page == 'allowed':
+                if (allowed := self.get_allowed_list(ordering)) is not None:
+                    return allowed
                 queryset = Question.objects.with_permission(self.request.user, 'questions.view_question')
-        queryset = queryset.prefetch_related('choices')
-        return queryset
+        try:
+            queryset = queryset.filter(**get_choice_count_bounds(self.request.GET))
+        except ValueError:
+            pass  # invalid bounds of the form are ignored
+        return order_questions(queryset, ordering)
+
+    def get_allowed_list(self, ordering: str | None) -> AllowedQuestionList | None:
+        """Allowed questions from the snapshot of the user when they are ordered by id and not filtered."""
+        user = self.request.user
+        if (
+            not isinstance(user, ExampleUser)
+            or user.is_superuser
+            or ordering not in SNAPSHOT_ORDERINGS
+            or CHOICE_COUNT_BOUNDS.keys() & self.request.GET.keys()
+        ):
+            return None
+        return AllowedQuestionList(user, Question.objects.all(), descending=ordering == '-id')
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
         context['page'] = self.kwargs.get('page')
+        context['ordering'] = self.request.GET.get('ordering', 'id')
+        context['question_fragments'] = render_question_fragments(context['object_list'])
         return context
@@ -0,0 +1,86 @@
+import re
+from typing import Any
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import Permission
+from django.test import AsyncClient, Client
+from django.urls import reverse
+from users.models import ExampleUser
+
+
+METRICS_TOKEN = 'secret'
+
+
+@pytest.fixture(autouse=True)
+def metrics_token(settings: Any) -> None:
+    settings.METRICS_TOKEN = METRICS_TOKEN
+
+
+def get_metrics(client: Client) -> str:
+    return client.get(reverse('metrics'), HTTP_AUTHORIZATION=f'Bearer {METRICS_TOKEN}').content.decode()
+
+
+def get_metric(client: Client, name: str, route: str) -> float:
+    content = get_metrics(client)
+    found = re.search(rf'^{name}{{route="{route}"}} (\S+)$', content, re.MULTILINE)
+    return float(found.group(1)) if found else 0
+
+
+def make_user(username: str) -> ExampleUser:
+    user = ExampleUser.objects.create_user(username=username)
+    user.user_permissions.add(Permission.objects.get(codename='view_question'))
+    return user
+
+
+def test_request_metrics_are_reported(db: Any) -> None:
+    client = Client()
+    client.force_login(make_user('user'))
+    requests = get_metric(client, 'http_request_duration_seconds_count', 'questions-list')
+    queries = get_metric(client, 'db_queries_total', 'questions-list')
+
+    response = client.get(reverse('questions-list'), HTTP_ACCEPT='application/json')
+    server_timing = response['Server-Timing']
+    match = re.fullmatch(
+        r'db;dur=[\d.]+;desc="(\d+) queries", serialize;dur=([\d.]+), render;dur=[\d.]+, total;dur=[\d.]+',
+        server_timing,
+    )
+    assert match is not None
+    assert int(match.group(1)) > 0
+    # list is serialized in the view, before the response is rendered
+    assert float(match.group(2)) > 0
+
+    assert get_metric(client, 'http_request_duration_seconds_count', 'questions-list') == requests + 1
+    assert get_metric(client, 'db_queries_total', 'questions-list') == queries + int(match.group(1))
+    # metrics endpoint doesn't report itself
+    assert 'route="metrics"' not in get_metrics(client)
+
+
+def test_async_request_metrics_are_reported(db: Any) -> None:
+    client = AsyncClient()
+    client.force_login(make_user('user'))
+
+    response = async_to_sync(client.get)(reverse('async-questions-list'))
+    assert response.status_code == 200
+    assert re.match(r'db;dur=[\d.]+;desc="[1-9]\d* queries"', response['Server-Timing'])
+
+
+def test_metrics_endpoint_requires_token(settings: Any) -> None:
+    client = Client()
+    assert client.get(reverse('metrics')).status_code == 401
+    assert client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong').status_code == 401
+    response = client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+
+
+def test_metrics_endpoint_is_closed_without_token(db: Any, settings: Any) -> None:
+    settings.METRICS_TOKEN = ''
+    client = Client()
+    assert client.get(reverse('metrics')).status_code == 401
+    assert client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer ').status_code == 401
+    client.force_login(make_user('user'))
+    assert client.get(reverse('metrics')).status_code == 401
+
+    client.force_login(ExampleUser.objects.create_user(username='staff', is_staff=True))
+    assert client.get(reverse('metrics')).status_code == 200
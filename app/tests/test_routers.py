@@ -0,0 +1,81 @@
+from typing import Any
+
+import pytest
+from django.db import transaction
+from django.urls import reverse
+from example.routers import PRIMARY_COOKIE, ReplicaRouter, RoutingState, current_routing, primary_reads
+from guardian.shortcuts import assign_perm
+from pytest_django.fixtures import SettingsWrapper
+from questions.models import Question
+from rest_framework.test import APIClient
+from users.models import ExampleUser
+
+
+@pytest.fixture
+def api_client(db: Any, settings: SettingsWrapper) -> APIClient:
+    # `default` stands in for a replica, tests check where reads would go
+    settings.DATABASE_REPLICAS = ['default']
+    user = ExampleUser.objects.create_user(username='user')
+    for perm in ('view_question', 'add_question'):
+        assign_perm(f'questions.{perm}', user)
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def test_router_reads_from_replica_of_request() -> None:
+    router = ReplicaRouter()
+    state = RoutingState(replica='replica_0')
+    assert router.db_for_read(Question) is None
+
+    token = current_routing.set(state)
+    try:
+        assert router.db_for_read(Question) == 'replica_0'
+        with primary_reads():
+            assert router.db_for_read(Question) is None
+        assert router.db_for_read(Question) == 'replica_0'
+        assert not state.wrote
+        assert router.db_for_write(Question) == 'default'
+        assert state.wrote
+    finally:
+        current_routing.reset(token)
+
+
+def test_router_reads_from_primary_in_transaction(db: Any) -> None:
+    token = current_routing.set(RoutingState(replica='replica_0'))
+    try:
+        with transaction.atomic():
+            assert ReplicaRouter().db_for_read(Question) is None
+    finally:
+        current_routing.reset(token)
+
+
+def test_safe_actions_read_from_replica_until_client_writes(api_client: APIClient) -> None:
+    response = api_client.get(reverse('questions-list'))
+    assert response.status_code == 200
+    assert response.wsgi_request.db_routing.replica == 'default'  # type: ignore[attr-defined]
+    assert PRIMARY_COOKIE not in response.cookies
+
+    response = api_client.post(reverse('questions-list'), {'value': 'question'}, format='json')
+    assert response.status_code == 201
+    assert response.wsgi_request.db_routing.replica is None  # type: ignore[attr-defined]
+    assert response.cookies[PRIMARY_COOKIE]['max-age'] == 10
+
+    # the cookie keeps reads of the client on the primary
+    response = api_client.get(reverse('questions-detail', args=(response.json()['id'],)))
+    assert response.status_code == 200
+    assert response.wsgi_request.db_routing.replica is None  # type: ignore[attr-defined]
+
+    del api_client.cookies[PRIMARY_COOKIE]
+    response = api_client.get(reverse('questions-export'))
+    assert response.wsgi_request.db_routing.replica is None  # type: ignore[attr-defined]
+
+
+def test_reads_stay_on_primary_without_replicas(api_client: APIClient, settings: SettingsWrapper) -> None:
+    settings.DATABASE_REPLICAS = []
+
+    response = api_client.get(reverse('questions-list'))
+    assert response.wsgi_request.db_routing.replica is None  # type: ignore[attr-defined]
+    response = api_client.post(reverse('questions-list'), {'value': 'question'}, format='json')
+    assert response.status_code == 201
+    assert PRIMARY_COOKIE not in response.cookies
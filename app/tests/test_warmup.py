@@ -0,0 +1,31 @@
+from io import StringIO
+from typing import Any
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from example.warmup import warm_up
+from questions.models import QUESTION_PERM_BITS, Question
+from questions.registry import get_question_permission_ids
+
+
+def test_warm_up_fills_caches_and_closes_connections(transactional_db: Any) -> None:
+    ContentType.objects.clear_cache()
+    warm_up()
+    assert connection.connection is None
+
+    with CaptureQueriesContext(connection) as context:
+        ContentType.objects.get_for_model(Question)
+        get_question_permission_ids(QUESTION_PERM_BITS)
+    assert not context.captured_queries
+
+
+def test_profile_startup_reports_import_times() -> None:
+    output = StringIO()
+    call_command('profile_startup', limit=3, stdout=output)
+
+    lines = output.getvalue().splitlines()
+    assert lines[0].startswith('startup=')
+    assert 'Packages by own import time:' in lines
+    assert any(line.endswith('  django') for line in lines)